@@ -0,0 +1,298 @@
+"""Benchmarks of the hot paths of pycircos on synthetic workloads
+
+    python benchmarks/bench.py --scale small --seed 0 --output small.json
+    python benchmarks/compare.py base.json small.json
+
+Each case prepares its inputs outside of the timed steps. The time of a case
+is the sum of its steps, and its memory is the largest tracemalloc peak of a
+step above the memory allocated before the step.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import importlib
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Optional
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pycircos.pycircos import Garc
+from pycircos.plot_classes import Gcircle, chord_plot
+from pycircos import readers
+
+from workloads import SCALES, Workload
+
+# Name of each case to a function of a Workload, which yields the timed steps
+# as functions without arguments and returns the number of items processed.
+CASES: Dict[str, Callable] = {}
+
+# Name of each case to the optional module it needs, such as Bio.
+REQUIRES: Dict[str, str] = {}
+
+# chord_plot.plot() draws one patch per link, so it is timed on at most this
+# many links.
+PLOT_LINKS: int = 10_000
+
+
+def case(name: str, requires: Optional[str] = None):
+    def decorator(function):
+        CASES[name] = function
+        if requires is not None:
+            REQUIRES[name] = requires
+        return function
+    return decorator
+
+
+def _version(module: str) -> Optional[str]:
+    """Function that returns the version of an optional module, or None if it is not installed"""
+    try:
+        return importlib.import_module(module).__version__
+    except ImportError:
+        return None
+
+
+def _circle(workload: Workload, cls=Gcircle, set_garcs: bool = True):
+    circle = cls(figsize=(8, 8), use_pyplot=False)
+    for arc_id, size in zip(workload.arc_ids, workload.arc_sizes):
+        circle.add_garc(Garc(arc_id=str(arc_id), size=int(size), interspace=0.2, raxis_range=(900, 950)))
+    if set_garcs == True:
+        circle.set_garcs()
+    return circle
+
+
+@case("calc_density")
+def _calc_density(workload: Workload) -> Iterator[Callable]:
+    sizes = dict(zip(workload.arc_ids.tolist(), workload.arc_sizes.tolist()))
+    for arc_id, records in workload.arc_points():
+        garc = Garc(arc_id=arc_id, size=sizes[arc_id])
+        positions = records["start"]
+        yield lambda: garc.calc_density(positions, window_size=workload.window_size)
+
+
+def _composition(workload: Workload, method: str) -> Iterator[Callable]:
+    from Bio.Seq import Seq
+    from Bio.SeqRecord import SeqRecord
+    for i, arc_id in enumerate(workload.arc_ids):
+        garc = Garc(arc_id=str(arc_id), record=SeqRecord(Seq(workload.sequence(i)), id=str(arc_id)))
+        # The composition index is built by the first call, which is timed.
+        yield lambda: getattr(garc, method)("G", "C", window_size=workload.window_size)
+        del garc
+
+
+@case("calc_nnratio", requires="Bio")
+def _calc_nnratio(workload: Workload) -> Iterator[Callable]:
+    return _composition(workload, "calc_nnratio")
+
+
+@case("calc_nnskew", requires="Bio")
+def _calc_nnskew(workload: Workload) -> Iterator[Callable]:
+    return _composition(workload, "calc_nnskew")
+
+
+@case("set_garcs")
+def _set_garcs(workload: Workload) -> Iterator[Callable]:
+    circle = _circle(workload, set_garcs=False)
+    yield circle.set_garcs
+    circle.close()
+
+
+@case("to_theta")
+def _to_theta(workload: Workload) -> Iterator[Callable]:
+    circle = _circle(workload)
+    records = workload.points()
+    yield lambda: circle.to_theta(records["arc_id"], records["start"])
+    circle.close()
+
+
+def _track(workload: Workload, method: str, **kwargs) -> Iterator[Callable]:
+    circle = _circle(workload)
+    tracks = list(workload.arc_points())
+
+    def run():
+        for arc_id, records in tracks:
+            data = records["value"] if method != "heatmap" else np.vstack([records["value"], -records["value"]])
+            getattr(circle, method)(arc_id, data, records["start"], raxis_range=(700, 850), **kwargs)
+    yield run
+    circle.close()
+
+
+@case("lineplot")
+def _lineplot(workload: Workload) -> Iterator[Callable]:
+    return _track(workload, "lineplot")
+
+
+@case("scatterplot")
+def _scatterplot(workload: Workload) -> Iterator[Callable]:
+    return _track(workload, "scatterplot")
+
+
+@case("barplot")
+def _barplot(workload: Workload) -> Iterator[Callable]:
+    return _track(workload, "barplot")
+
+
+@case("heatmap")
+def _heatmap(workload: Workload) -> Iterator[Callable]:
+    return _track(workload, "heatmap")
+
+
+@case("chord.plot")
+def _chord_plot(workload: Workload) -> Iterator[Callable]:
+    circle = _circle(workload, chord_plot)
+    links = workload.links()
+    n = min(PLOT_LINKS, workload.n_links)
+    rows = list(zip(links["arc1"][:n].tolist(), links["start1"][:n].tolist(), links["end1"][:n].tolist(), links["arc2"][:n].tolist(), links["start2"][:n].tolist(), links["end2"][:n].tolist()))
+
+    def run():
+        for arc1, start1, end1, arc2, start2, end2 in rows:
+            circle.plot([arc1, start1, end1, 600], [arc2, start2, end2, 600])
+    yield run
+    circle.close()
+
+
+@case("chord.plot_many")
+def _chord_plot_many(workload: Workload) -> Iterator[Callable]:
+    circle = _circle(workload, chord_plot)
+    links = workload.links()
+    yield lambda: circle.plot_many(links)
+    circle.close()
+
+
+@case("readers.read")
+def _readers_read(workload: Workload) -> Iterator[Callable]:
+    directory = tempfile.mkdtemp(prefix="pycircos-bench-")
+    try:
+        path = os.path.join(directory, "points.bedgraph")
+        workload.write_bedgraph(path)
+        arc_ids = workload.arc_ids[: max(1, workload.n_arcs // 2)]
+        yield lambda: readers.read(path, "bedgraph", arc_ids=arc_ids)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@case("save")
+def _save(workload: Workload) -> Iterator[Callable]:
+    circle = _circle(workload, chord_plot)
+    for arc_id, records in workload.arc_points():
+        circle.scatterplot(arc_id, records["value"], records["start"], raxis_range=(700, 850))
+    circle.plot_many(workload.links())
+    directory = tempfile.mkdtemp(prefix="pycircos-bench-")
+    try:
+        yield lambda: circle.save(os.path.join(directory, "figure"), format="png")
+    finally:
+        circle.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+ITEMS: Dict[str, Callable[[Workload], int]] = {
+    "calc_density": lambda w: w.n_points,
+    "calc_nnratio": lambda w: int(w.arc_sizes.sum()),
+    "calc_nnskew": lambda w: int(w.arc_sizes.sum()),
+    "set_garcs": lambda w: w.n_arcs,
+    "chord.plot": lambda w: min(PLOT_LINKS, w.n_links),
+    "chord.plot_many": lambda w: w.n_links,
+}
+
+
+def run_case(name: str, workload: Workload, memory: bool = False) -> Dict:
+    """Function that runs the steps of a case once and returns their time and memory"""
+    wall_time = 0.0
+    peak_memory = 0
+    for step in CASES[name](workload):
+        if memory == True:
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            else:
+                # Python < 3.9: restarting the trace resets the peak
+                tracemalloc.stop()
+                tracemalloc.start()
+            current = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        step()
+        wall_time += time.perf_counter() - start
+        if memory == True:
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1] - current)
+    return {"wall_time": wall_time, "peak_memory": peak_memory}
+
+
+def _metadata(scale: str, seed: int, repeat: int) -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip() != ""
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    return {"commit": commit, "dirty": dirty, "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "scale": scale, "seed": seed, "repeat": repeat, "sizes": SCALES[scale],
+            "python": platform.python_version(), "numpy": np.__version__, "matplotlib": matplotlib.__version__, "biopython": _version("Bio"),
+            "platform": platform.platform(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def run(scale: str = "small", seed: int = 0, repeat: int = 3, cases: Optional[List[str]] = None, memory: bool = True, log=sys.stderr) -> Dict:
+    """Function that runs the cases and returns the results as a dictionary
+
+    Each case is timed repeat times, and run once more under tracemalloc for
+    its memory if memory is True.
+    """
+    if cases is None:
+        names = [name for name in CASES if name not in REQUIRES or _version(REQUIRES[name]) is not None]
+        if log is not None:
+            for name in CASES:
+                if name not in names:
+                    print("{:<16} skipped, {} is not installed".format(name, REQUIRES[name]), file=log, flush=True)
+    else:
+        names = cases
+        for name in names:
+            if name not in CASES:
+                raise ValueError("Unknown case {}. The cases are {}".format(name, ", ".join(CASES)))
+            if name in REQUIRES and _version(REQUIRES[name]) is None:
+                raise ValueError("Case {} needs {}, which is not installed".format(name, REQUIRES[name]))
+    workload = Workload(scale, seed)
+    results = {}
+    for name in names:
+        times = [run_case(name, workload)["wall_time"] for _ in range(repeat)]
+        result = {"items": ITEMS.get(name, lambda w: w.n_points)(workload), "times": times, "min": min(times), "median": statistics.median(times)}
+        if memory == True:
+            tracemalloc.start()
+            try:
+                result["peak_memory"] = run_case(name, workload, memory=True)["peak_memory"]
+            finally:
+                tracemalloc.stop()
+        results[name] = result
+        if log is not None:
+            print("{:<16} {:>10.4f} s  {:>12} items  {:>14} B".format(name, result["min"], result["items"], result.get("peak_memory", "-")), file=log, flush=True)
+    return {"meta": _metadata(scale, seed, repeat), "results": results}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark pycircos on synthetic workloads.")
+    parser.add_argument("--scale", default="small", choices=list(SCALES), help="size of the workload (default: small)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the workload (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs of each case (default: 3)")
+    parser.add_argument("--cases", default=None, help="comma-separated cases to run (default: all of {}, except the cases whose optional modules are not installed)".format(", ".join(CASES)))
+    parser.add_argument("--no-memory", action="store_true", help="do not trace the memory of the cases")
+    parser.add_argument("-o", "--output", default=None, help="JSON file of the results (default: standard output)")
+    args = parser.parse_args(argv)
+
+    results = run(args.scale, args.seed, args.repeat, None if args.cases is None else args.cases.split(","), args.no_memory == False)
+    text = json.dumps(results, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Comparison of two result files of bench.py
+
+    python benchmarks/compare.py base.json new.json --threshold 0.1
+
+The minimum times and the memory of the cases run in both files are compared,
+and the exit status is 1 if a case became slower than the threshold allows.
+"""
+import sys
+import json
+import argparse
+from typing import Dict, List, Optional
+
+
+def _load(path: str) -> Dict:
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def compare(base: Dict, new: Dict, threshold: float = 0.1) -> List[Dict]:
+    """Function that returns the ratio of new to base for each case in both results"""
+    rows = []
+    for name, result in new["results"].items():
+        if name not in base["results"]:
+            continue
+        before = base["results"][name]
+        ratio = result["min"] / before["min"] if before["min"] > 0 else float("inf")
+        memory = None
+        if before.get("peak_memory") and result.get("peak_memory") is not None:
+            memory = result["peak_memory"] / before["peak_memory"]
+        status = "slower" if ratio > 1 + threshold else "faster" if ratio < 1 / (1 + threshold) else ""
+        rows.append({"case": name, "base": before["min"], "new": result["min"], "ratio": ratio, "memory_ratio": memory, "status": status})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two result files of bench.py.")
+    parser.add_argument("base", help="results of the base commit")
+    parser.add_argument("new", help="results of the new commit")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change of time reported as slower or faster (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    base, new = _load(args.base), _load(args.new)
+    for key in ("scale", "seed"):
+        if base["meta"].get(key) != new["meta"].get(key):
+            print("warning: the {} of the results differ ({} and {})".format(key, base["meta"].get(key), new["meta"].get(key)), file=sys.stderr)
+
+    rows = compare(base, new, args.threshold)
+    print("{:<16} {:>10} {:>10} {:>8} {:>8}  {}".format("case", "base (s)", "new (s)", "time", "memory", ""))
+    for row in rows:
+        memory = "-" if row["memory_ratio"] is None else "{:.2f}x".format(row["memory_ratio"])
+        print("{:<16} {:>10.4f} {:>10.4f} {:>7.2f}x {:>8}  {}".format(row["case"], row["base"], row["new"], row["ratio"], memory, row["status"]))
+    return 1 if any(row["status"] == "slower" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Import-time budget of the modules of pycircos
+
+    python benchmarks/imports.py --repeat 5 --factor 1.0
+
+Each module is imported in fresh interpreters and the fastest import is
+compared with its budget. The modules loaded by the import are also checked,
+so that a module-level import of a heavy dependency is reported even when it
+stays under the budget on a fast machine. The exit status is 1 if a module
+is over its budget or loads a module it should not.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module to (budget in seconds, modules that should not be loaded by it).
+# numpy alone takes about 0.1 s, and matplotlib without pyplot about 0.5 s.
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "pycircos":              (0.05, ("numpy", "matplotlib", "Bio", "requests", "urllib.request")),
+    "pycircos.pycircos":     (0.3,  ("matplotlib", "Bio", "requests", "urllib.request")),
+    "pycircos.readers":      (0.3,  ("matplotlib", "Bio", "requests", "urllib.request")),
+    "pycircos.cli":          (0.3,  ("matplotlib", "Bio", "requests", "urllib.request")),
+    "pycircos.plot_classes": (1.2,  ("matplotlib.pyplot", "Bio", "requests", "urllib.request")),
+}
+
+_SCRIPT: str = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"time": elapsed, "loaded": [name for name in {forbidden!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module: str, forbidden: Tuple[str, ...], repeat: int = 5) -> Dict:
+    """Function that imports the module in repeat fresh interpreters"""
+    times, loaded = [], []
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _SCRIPT.format(module=module, forbidden=forbidden)], env=env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["time"])
+        loaded = result["loaded"]
+    return {"min": min(times), "times": times, "loaded": loaded}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the import time of the modules of pycircos against their budgets.")
+    parser.add_argument("--repeat", type=int, default=5, help="number of fresh interpreters per module (default: 5)")
+    parser.add_argument("--factor", type=float, default=1.0, help="factor applied to the budgets on slower machines (default: 1.0)")
+    parser.add_argument("-o", "--output", default=None, help="JSON file of the results (default: standard output)")
+    args = parser.parse_args(argv)
+
+    results, failed = {}, False
+    for module, (budget, forbidden) in BUDGETS.items():
+        result = measure(module, forbidden, args.repeat)
+        result["budget"] = budget * args.factor
+        result["ok"] = result["min"] <= result["budget"] and len(result["loaded"]) == 0
+        failed = failed or result["ok"] == False
+        results[module] = result
+        print("{:<24} {:>8.3f} s  budget {:>6.3f} s  {}{}".format(module, result["min"], result["budget"], "ok" if result["ok"] == True else "FAILED",
+                                                                  "" if len(result["loaded"]) == 0 else "  loads " + ", ".join(result["loaded"])), file=sys.stderr)
+
+    text = json.dumps({"python": sys.version.split()[0], "results": results}, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    return 1 if failed == True else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
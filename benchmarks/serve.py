@@ -0,0 +1,110 @@
+"""Latency of serving plots rendered in memory over HTTP
+
+    python benchmarks/serve.py --requests 50 --concurrency 4 --format png --dpi 150
+
+A local ThreadingHTTPServer builds and renders a figure of the synthetic
+workload for each request with Gcircle.render() on its handler thread, and
+the same script sends the requests and reports the latencies as JSON.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+import urllib.request
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import matplotlib
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pycircos.pycircos import Garc
+from pycircos.plot_classes import chord_plot
+
+from workloads import SCALES, Workload
+
+CONTENT_TYPES: Dict[str, str] = {"png": "image/png", "jpg": "image/jpeg", "svg": "image/svg+xml", "pdf": "application/pdf"}
+
+
+def make_handler(workload: Workload, reuse_canvas: bool):
+    tracks = list(workload.arc_points())
+    links = workload.links()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            format = os.path.splitext(url.path)[1].lstrip(".") or "png"
+            dpi = int(query.get("dpi", ["150"])[0])
+            with chord_plot((8, 8), use_pyplot=False) as circle:
+                for arc_id, size in zip(workload.arc_ids, workload.arc_sizes):
+                    circle.add_garc(Garc(arc_id=str(arc_id), size=int(size), interspace=0.5, raxis_range=(900, 950)))
+                circle.set_garcs()
+                for arc_id, records in tracks:
+                    circle.scatterplot(arc_id, records["value"], records["start"], raxis_range=(700, 850))
+                circle.plot_many(links)
+                body = circle.render(format, dpi=dpi, reuse_canvas=reuse_canvas)
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPES.get(format, "application/octet-stream"))
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the latency of plots rendered in memory and served over HTTP.")
+    parser.add_argument("--scale", default="small", choices=list(SCALES), help="size of the workload (default: small)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the workload (default: 0)")
+    parser.add_argument("--requests", type=int, default=20, help="number of requests (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=2, help="number of concurrent requests (default: 2)")
+    parser.add_argument("--format", default="png", help="format of the plots (default: png)")
+    parser.add_argument("--dpi", type=int, default=150, help="resolution of the plots (default: 150)")
+    parser.add_argument("--no-reuse", action="store_true", help="allocate a new Agg canvas for each request")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(Workload(args.scale, args.seed), args.no_reuse == False))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = "http://127.0.0.1:{}/plot.{}?dpi={}".format(server.server_address[1], args.format, args.dpi)
+
+    def fetch(_) -> Dict:
+        start = time.perf_counter()
+        with urllib.request.urlopen(url) as response:
+            size = len(response.read())
+        return {"latency": time.perf_counter() - start, "bytes": size}
+
+    try:
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(fetch, range(args.requests)))
+        wall_time = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    latencies = [result["latency"] for result in results]
+    report = {"scale": args.scale, "seed": args.seed, "format": args.format, "dpi": args.dpi, "requests": args.requests, "concurrency": args.concurrency, "reuse_canvas": args.no_reuse == False,
+              "throughput": args.requests / wall_time, "bytes": statistics.median(result["bytes"] for result in results),
+              "latency": {"mean": statistics.mean(latencies), "p50": _percentile(latencies, 0.5), "p95": _percentile(latencies, 0.95), "p99": _percentile(latencies, 0.99), "max": max(latencies)}}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
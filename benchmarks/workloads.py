@@ -0,0 +1,113 @@
+import numpy as np
+from typing import Dict, Iterator, Tuple
+
+# Sizes of the synthetic workloads. genome_size is the total length of the
+# arcs, links the number of chord links and points the number of track
+# values, spread over the arcs in proportion to their sizes.
+SCALES: Dict[str, Dict[str, int]] = {
+    "small":  {"genome_size": 10_000_000,    "arcs": 24,   "links": 1_000,     "points": 10_000},
+    "medium": {"genome_size": 100_000_000,   "arcs": 100,  "links": 10_000,    "points": 100_000},
+    "large":  {"genome_size": 1_000_000_000, "arcs": 1000, "links": 100_000,   "points": 1_000_000},
+    "genome": {"genome_size": 3_000_000_000, "arcs": 24,   "links": 1_000_000, "points": 1_000_000},
+}
+
+_LETTERS: np.ndarray = np.frombuffer(b"ACGT", dtype=np.uint8)
+
+
+class Workload:
+    """Class for a synthetic genome and its tracks and links generated from a seed
+
+    The same scale and seed always give the same arcs, values and sequences,
+    so results of different commits measure the same work.
+
+    Parameters
+    __________
+    scale : str
+        One of the keys of SCALES.
+    seed : int
+        Seed of the random generators.
+    """
+
+    def __init__(self, scale: str = "small", seed: int = 0) -> None:
+        if scale not in SCALES:
+            raise ValueError("scale should be one of {}".format(", ".join(SCALES)))
+        self.scale: str = scale
+        self.seed: int = seed
+        params = SCALES[scale]
+        self.genome_size: int = params["genome_size"]
+        self.n_arcs: int = params["arcs"]
+        self.n_links: int = params["links"]
+        self.n_points: int = params["points"]
+        self.window_size: int = max(1000, self.genome_size // 20000)
+
+        rng = np.random.default_rng([seed, 0])
+        # Chromosome-like sizes: a few long arcs and many short ones.
+        weights = np.sort(rng.lognormal(0.0, 1.0, self.n_arcs))[::-1]
+        sizes = np.maximum(1000, np.floor(weights / weights.sum() * self.genome_size)).astype(np.int64)
+        self.arc_ids: np.ndarray = np.array(["chr{}".format(i + 1) for i in range(self.n_arcs)])
+        self.arc_sizes: np.ndarray = sizes
+
+    def _rng(self, stream: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, stream])
+
+    def _positions(self, rng: np.random.Generator, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        arcs = np.sort(rng.choice(self.n_arcs, size=n, p=self.arc_sizes / self.arc_sizes.sum()))
+        starts = (rng.random(n) * (self.arc_sizes[arcs] - 1)).astype(np.int64)
+        return arcs, starts
+
+    def points(self) -> np.ndarray:
+        """Function that returns the track values sorted by arc and start
+
+        Returns
+        _______
+        numpy.ndarray
+            Structured array with the fields "arc_id", "start", "end" and
+            "value", the layout of pycircos.readers.read_bedgraph().
+        """
+        rng = self._rng(1)
+        arcs, starts = self._positions(rng, self.n_points)
+        order = np.lexsort((starts, arcs))
+        arcs, starts = arcs[order], starts[order]
+        records = np.zeros(self.n_points, dtype=[("arc_id", self.arc_ids.dtype), ("start", "i8"), ("end", "i8"), ("value", "f8")])
+        records["arc_id"] = self.arc_ids[arcs]
+        records["start"] = starts
+        records["end"] = np.minimum(starts + 1 + rng.integers(0, self.window_size, self.n_points), self.arc_sizes[arcs])
+        records["value"] = np.sin(starts / self.window_size) + rng.normal(0.0, 0.5, self.n_points)
+        return records
+
+    def arc_points(self) -> Iterator[Tuple[str, np.ndarray]]:
+        """Function that yields (arc_id, records) of the points on each arc that has points"""
+        records = self.points()
+        # The rows of each arc are contiguous, in the order of the arcs.
+        _, firsts = np.unique(records["arc_id"], return_index=True)
+        bounds = np.append(np.sort(firsts), len(records))
+        for i in range(len(bounds) - 1):
+            yield str(records["arc_id"][bounds[i]]), records[bounds[i]:bounds[i + 1]]
+
+    def links(self) -> Dict[str, np.ndarray]:
+        """Function that returns the links as columns of chord_plot.plot_many()"""
+        rng = self._rng(2)
+        arcs1, starts1 = self._positions(rng, self.n_links)
+        arcs2, starts2 = self._positions(rng, self.n_links)
+        arcs2, starts2 = arcs2[rng.permutation(self.n_links)], starts2[rng.permutation(self.n_links)]
+        starts2 = np.minimum(starts2, self.arc_sizes[arcs2] - 2)
+        lengths = rng.integers(1, self.window_size * 10, self.n_links)
+        return {"arc1": self.arc_ids[arcs1], "start1": starts1, "end1": np.minimum(starts1 + lengths, self.arc_sizes[arcs1] - 1), "r1": np.full(self.n_links, 600.0),
+                "arc2": self.arc_ids[arcs2], "start2": starts2, "end2": np.minimum(starts2 + lengths, self.arc_sizes[arcs2] - 1), "r2": np.full(self.n_links, 600.0)}
+
+    def sequence(self, index: int) -> bytes:
+        """Function that returns the random ACGT sequence of the arc at index, with a run of N every 10 Mb"""
+        rng = self._rng(100 + index)
+        size = int(self.arc_sizes[index])
+        codes = _LETTERS[rng.integers(0, 4, size, dtype=np.uint8)]
+        for start in range(0, size, 10_000_000):
+            codes[start:start + min(1000, size // 100)] = ord("N")
+        return codes.tobytes()
+
+    def write_bedgraph(self, path: str) -> None:
+        """Function that writes the points as a bedGraph file"""
+        records = self.points()
+        with open(path, "w") as handle:
+            for start in range(0, len(records), 1 << 16):
+                chunk = records[start:start + (1 << 16)]
+                handle.write("".join("{}\t{}\t{}\t{:.4f}\n".format(*row) for row in chunk.tolist()))
@@ -1,2 +1,22 @@
-from .plot_classes import chord_plot
-from pycircos import Garc
\ No newline at end of file
+# The classes are imported on first access, so that importing a submodule
+# such as pycircos.pycircos or pycircos.readers does not load matplotlib.
+_EXPORTS = {
+    "chord_plot": ".plot_classes",
+    "Garc": ".pycircos",
+    "load_garcs": ".loader",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
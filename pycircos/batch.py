@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import time
+import collections
+import concurrent.futures
+from typing import Dict, Iterator, List, Optional
+
+from . import spec as plot_spec
+from . import profiling
+
+# Records loaded by this process, keyed by the record of their arc
+# specification, so that records and composition indexes are reused by the
+# following jobs. Each entry is [Garc holding the record and its indexes,
+# last Garc built from it]. The least recently used records are dropped above
+# GARC_CACHE_SIZE.
+GARC_CACHE_SIZE: int = 64
+_garc_cache: "collections.OrderedDict[str, list]" = collections.OrderedDict()
+
+# Attributes of a Garc computed from its record, which are shared by the Garc
+# objects built from the same record.
+_SHARED_ATTRIBUTES = ("record_path", "_composition_index", "_feature_table", "_checksum")
+
+
+class RenderResult:
+    """Class that holds the output, timing and failure of rendering one plot specification"""
+
+    def __init__(self, name: str, paths: Optional[List[str]] = None, wall_time: float = 0.0, peak_rss: int = 0, error: Optional[str] = None, profile: Optional[Dict] = None, index: Optional[int] = None) -> None:
+        self.name: str = name
+        self.index: Optional[int] = index
+        self.paths: List[str] = [] if paths is None else paths
+        self.wall_time: float = wall_time
+        self.peak_rss: int = peak_rss
+        self.error: Optional[str] = error
+        self.profile: Optional[Dict] = profile
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict:
+        result = {"name": self.name, "index": self.index, "paths": self.paths, "wall_time": self.wall_time, "peak_rss": self.peak_rss, "error": self.error}
+        if self.profile is not None:
+            result["profile"] = self.profile
+        return result
+
+    def __repr__(self) -> str:
+        return "RenderResult({})".format(", ".join("{}={!r}".format(k, v) for k, v in self.to_dict().items()))
+
+
+def _peak_rss() -> int:
+    """Function that returns the peak resident set size of this process in bytes, or 0 where the resource module is missing"""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _load_garc(arc: Dict, index: int):
+    """Function that returns a new Garc object of an arc specification
+
+    Every figure gets its own Garc objects, as a Garc belongs to one Gcircle,
+    while the records they read are cached with the indexes built on them.
+    """
+    from .pycircos import Garc
+
+    kwargs = dict(arc)
+    kwargs.setdefault("facecolor", Garc.colorlist[index % len(Garc.colorlist)])
+    if isinstance(kwargs.get("record"), str) == False:
+        return Garc(**kwargs)
+
+    key = json.dumps([kwargs["record"], kwargs.get("cache")], default=str)
+    if key in _garc_cache:
+        _garc_cache.move_to_end(key)
+        source, last = _garc_cache[key]
+        # indexes built on the last Garc are kept for the following ones
+        for name in _SHARED_ATTRIBUTES:
+            if getattr(source, name) is None:
+                setattr(source, name, getattr(last, name))
+    else:
+        source = Garc(arc_id=kwargs["arc_id"], record=kwargs["record"], cache=kwargs.get("cache"))
+        while len(_garc_cache) >= GARC_CACHE_SIZE:
+            _garc_cache.popitem(last=False)
+
+    kwargs.pop("cache", None)
+    kwargs["record"] = source.record if source.sequence is None else source.sequence
+    garc = Garc(**kwargs)
+    for name in _SHARED_ATTRIBUTES:
+        setattr(garc, name, getattr(source, name))
+    garc._interval_indexes = source._interval_indexes
+    _garc_cache[key] = [source, garc]
+    return garc
+
+
+def render_spec(spec: Dict) -> List[str]:
+    """Function that renders one plot specification and saves the figure
+
+    Parameters
+    __________
+    spec : dict
+        Plot specification with the keys:
+        "name": name of the plot.
+        "figsize": figure size (default: (8, 8)).
+        "arcs": list of keyword arguments of Garc(), or of a "file" with one
+        arc per row.
+        "tracks": list of keyword arguments of the track methods of Gcircle
+        with a "type" key, which is one of spec.TRACK_TYPES. "data" can be a
+        dict with a "metric" key (one of spec.METRICS) and the parameters of
+        the metric, which is then computed on the Garc object given by
+        "garc_id". A track with a "file" is drawn on every arc in the file.
+        "chords": list of keyword arguments of chord_plot.plot_many(), or of
+        a "file" of links.
+        "output": keyword arguments of Gcircle.save().
+        Data files are read only here, see pycircos.spec.
+
+    Returns
+    _______
+    list of str
+        Paths of the saved files.
+    """
+    from .plot_classes import chord_plot
+
+    with chord_plot(tuple(spec.get("figsize", (8, 8))), use_pyplot=False) as circle:
+        for i, arc in enumerate(plot_spec.arc_kwargs(spec.get("arcs", []))):
+            circle.add_garc(_load_garc(arc, i))
+        circle.set_garcs()
+
+        for track in spec.get("tracks", []):
+            if track.get("type") not in plot_spec.TRACK_TYPES:
+                raise ValueError("Unknown track type {!r}. It should be one of {}".format(track.get("type"), ", ".join(plot_spec.TRACK_TYPES)))
+            for method, kwargs in plot_spec.track_calls(circle, track):
+                getattr(circle, method)(**kwargs)
+
+        for chord in spec.get("chords", []):
+            circle.plot_many(**plot_spec.chord_kwargs(circle, chord))
+
+        output = dict(spec.get("output", {}))
+        output.setdefault("file_name", spec.get("name", "pycircos"))
+        directory = os.path.dirname(output["file_name"])
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        return circle.save(**output)
+
+
+def _render_job(spec: Dict, profile: bool = False, index: Optional[int] = None) -> RenderResult:
+    name = spec.get("name", "pycircos")
+    profiler = profiling.Profiler() if profile == True else None
+    start = time.perf_counter()
+    try:
+        if profiler is None:
+            paths = render_spec(spec)
+        else:
+            with profiler:
+                paths = render_spec(spec)
+    except Exception as e:
+        return RenderResult(name, wall_time=time.perf_counter() - start, peak_rss=_peak_rss(), error="{}: {}".format(type(e).__name__, e), profile=None if profiler is None else profiler.report(), index=index)
+    return RenderResult(name, paths, wall_time=time.perf_counter() - start, peak_rss=_peak_rss(), profile=None if profiler is None else profiler.report(), index=index)
+
+
+def _init_worker() -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def iter_render_batch(specs: List[Dict], processes: Optional[int] = None, profile: bool = False) -> Iterator[RenderResult]:
+    """Function that renders plot specifications on a process pool
+
+    Each worker process uses the Agg backend without pyplot and keeps the Garc
+    objects it has loaded for the following jobs. Results are yielded as
+    soon as each figure is written, in the order of completion, and
+    RenderResult.index is the position of their specification in specs.
+
+    Parameters
+    __________
+    specs : list of dict
+        Plot specifications of render_spec().
+    processes : int, optional
+        Number of worker processes. If processes is 0, the specifications are
+        rendered in this process. If processes is not given, the number of
+        CPUs is used.
+    profile : bool
+        If True, the stages of each figure are recorded with
+        pycircos.profiling.Profiler and stored in RenderResult.profile.
+
+    Yields
+    ______
+    RenderResult
+    """
+    if processes == 0:
+        _init_worker()
+        for i, spec in enumerate(specs):
+            yield _render_job(spec, profile, i)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+        futures = [pool.submit(_render_job, spec, profile, i) for i, spec in enumerate(specs)]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def render_batch(specs: List[Dict], processes: Optional[int] = None, report: Optional[str] = None, profile: bool = False) -> List[RenderResult]:
+    """Function that renders plot specifications on a process pool
+
+    Parameters
+    __________
+    specs : list of dict
+        Plot specifications of render_spec().
+    processes : int, optional
+        Same parameter with processes of iter_render_batch().
+    report : str, optional
+        Path of a JSON lines file to which the result of each figure is
+        appended as soon as it is written.
+    profile : bool
+        Same parameter with profile of iter_render_batch().
+
+    Returns
+    _______
+    list of RenderResult
+        Results in the order of specs.
+    """
+    results = []
+    handle = None if report is None else open(report, "a")
+    try:
+        for result in iter_render_batch(specs, processes, profile):
+            results.append(result)
+            if handle is not None:
+                handle.write(json.dumps(result.to_dict()) + "\n")
+                handle.flush()
+    finally:
+        if handle is not None:
+            handle.close()
+    return sorted(results, key=lambda result: result.index)
+
+
+if __name__ == "__main__":
+    from .cli import main
+    sys.exit(main(["batch"] + sys.argv[1:]))
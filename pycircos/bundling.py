@@ -0,0 +1,213 @@
+import os
+import numpy as np
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+SUFFIX: str = ".links.npz"
+COLUMNS: Tuple[str, ...] = ("arc1", "bin1", "arc2", "bin2", "count")
+
+# Binned rows of chunks are merged into the level once they are at least
+# this many, or as many as the rows of the level.
+MERGE_ROWS: int = 1 << 20
+
+
+def _aggregate(arc1: np.ndarray, bin1: np.ndarray, arc2: np.ndarray, bin2: np.ndarray, count: np.ndarray) -> Dict[str, np.ndarray]:
+    """Function that merges the rows between the same pair of bins and sums their counts
+
+    The two ends of each row are ordered first, so a link and its reverse
+    fall into the same row.
+    """
+    swap = (arc1 > arc2) | ((arc1 == arc2) & (bin1 > bin2))
+    arc1, arc2 = np.where(swap, arc2, arc1), np.where(swap, arc1, arc2)
+    bin1, bin2 = np.where(swap, bin2, bin1), np.where(swap, bin1, bin2)
+    if len(arc1) == 0:
+        return {"arc1": arc1.astype(np.int32), "bin1": bin1.astype(np.int64), "arc2": arc2.astype(np.int32), "bin2": bin2.astype(np.int64), "count": count.astype(np.float64)}
+
+    order = np.lexsort((bin2, arc2, bin1, arc1))
+    arc1, bin1, arc2, bin2 = arc1[order], bin1[order], arc2[order], bin2[order]
+    new = np.ones(len(order), dtype=bool)
+    new[1:] = (arc1[1:] != arc1[:-1]) | (bin1[1:] != bin1[:-1]) | (arc2[1:] != arc2[:-1]) | (bin2[1:] != bin2[:-1])
+    starts = np.flatnonzero(new)
+    return {"arc1":  arc1[starts].astype(np.int32),
+            "bin1":  bin1[starts].astype(np.int64),
+            "arc2":  arc2[starts].astype(np.int32),
+            "bin2":  bin2[starts].astype(np.int64),
+            "count": np.add.reduceat(np.asarray(count, dtype=np.float64)[order], starts)}
+
+
+class LinkPyramid:
+    """Class for links summed into bins of the arcs at several resolutions
+
+    Each level holds one row per pair of bins that are linked, with the number
+    of links (or the sum of their weights) between them. Links are binned by
+    the midpoints of their ends. The finest level is built from the links and
+    each coarser level from the finer one, so every resolution should be a
+    multiple of the next finer one.
+
+    Parameters
+    __________
+    arc_ids : list of str
+        Arc ids. The "arc1" and "arc2" columns of the levels are indices into
+        arc_ids.
+    sizes : array-like
+        Sizes of the arcs.
+    levels : dict
+        Resolutions (bin sizes) to dicts of the "arc1", "bin1", "arc2", "bin2"
+        and "count" columns.
+    """
+
+    def __init__(self, arc_ids: Sequence[str], sizes, levels: Dict[int, Dict[str, np.ndarray]]) -> None:
+        self.arc_ids: np.ndarray = np.asarray(arc_ids, dtype=str)
+        self.sizes: np.ndarray   = np.asarray(sizes, dtype=np.int64)
+        self.levels: Dict[int, Dict[str, np.ndarray]] = {int(key): levels[key] for key in sorted(levels)}
+
+    @property
+    def resolutions(self) -> Tuple[int, ...]:
+        return tuple(self.levels)
+
+    @staticmethod
+    def _check_resolutions(resolutions: Sequence[int]) -> Tuple[int, ...]:
+        resolutions = tuple(sorted(set(int(value) for value in resolutions)))
+        if len(resolutions) == 0 or resolutions[0] < 1:
+            raise ValueError("resolutions should be positive integers")
+        for fine, coarse in zip(resolutions[:-1], resolutions[1:]):
+            if coarse % fine != 0:
+                raise ValueError("each resolution should be a multiple of the next finer one, {} is not a multiple of {}".format(coarse, fine))
+        return resolutions
+
+    @staticmethod
+    def _arc_sizes(sizes) -> Tuple[np.ndarray, np.ndarray]:
+        """Function that returns the arc ids and sizes of a dict or a Gcircle"""
+        if hasattr(sizes, "garc_dict"):
+            sizes = {key: garc.size for key, garc in sizes.garc_dict.items()}
+        return np.array(list(sizes.keys()), dtype=str), np.array(list(sizes.values()), dtype=np.int64)
+
+    @staticmethod
+    def _bin_chunk(links, arc_ids: np.ndarray, resolution: int, weights=None) -> Dict[str, np.ndarray]:
+        """Function that bins the links of a chunk at resolution, dropping links on other arcs"""
+        order = np.argsort(arc_ids)
+        ends  = []
+        for arc, start, end in (("arc1", "start1", "end1"), ("arc2", "start2", "end2")):
+            ids   = np.asarray(links[arc]).astype(str)
+            index = np.searchsorted(arc_ids[order], ids).clip(0, len(arc_ids) - 1)
+            found = arc_ids[order][index] == ids
+            middle = (np.asarray(links[start], dtype=np.int64) + np.asarray(links[end], dtype=np.int64)) // 2
+            ends.append((order[index], middle // resolution, found))
+        keep  = ends[0][2] & ends[1][2]
+        count = np.ones(len(keep)) if weights is None else np.asarray(weights, dtype=np.float64)
+        return _aggregate(ends[0][0][keep], ends[0][1][keep], ends[1][0][keep], ends[1][1][keep], count[keep])
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable, sizes, resolutions: Sequence[int] = (1000000, 100000, 10000), weight: Optional[str] = None) -> "LinkPyramid":
+        """Function that builds the pyramid from chunks of links
+
+        Each chunk is binned at the finest resolution and aggregated, and the
+        aggregates of the chunks are merged into the level once they have as
+        many rows as the level (and at least MERGE_ROWS), so only binned rows
+        are held in memory and each row is merged a logarithmic number of
+        times.
+
+        Parameters
+        __________
+        chunks : iterable
+            Structured arrays, dicts or DataFrames with the "arc1", "start1",
+            "end1", "arc2", "start2" and "end2" columns, as yielded by
+            pycircos.readers.iter_chunks().
+        sizes : dict or Gcircle
+            Arc ids to sizes, or a Gcircle whose Garc objects give them. Links
+            on other arcs are dropped.
+        resolutions : list of int
+            Bin sizes of the levels.
+        weight : str, optional
+            Column summed instead of counting the links.
+
+        Returns
+        _______
+        LinkPyramid
+        """
+        resolutions = cls._check_resolutions(resolutions)
+        arc_ids, arc_sizes = cls._arc_sizes(sizes)
+        finest = resolutions[0]
+        level  = _aggregate(*(np.zeros(0, dtype=np.int64) for _ in COLUMNS))
+        parts  = []
+        rows   = 0
+        for chunk in chunks:
+            if weight is not None and weight not in (chunk.dtype.names if hasattr(chunk, "dtype") else chunk):
+                raise ValueError("weight should be a column of the links, {} is not".format(weight))
+            parts.append(cls._bin_chunk(chunk, arc_ids, finest, None if weight is None else chunk[weight]))
+            rows += len(parts[-1]["count"])
+            if rows >= max(MERGE_ROWS, len(level["count"])):
+                level = _aggregate(*(np.concatenate([level[key]] + [part[key] for part in parts]) for key in COLUMNS))
+                parts, rows = [], 0
+        if len(parts) > 0:
+            level = _aggregate(*(np.concatenate([level[key]] + [part[key] for part in parts]) for key in COLUMNS))
+
+        levels = {finest: level}
+        for fine, coarse in zip(resolutions[:-1], resolutions[1:]):
+            factor = coarse // fine
+            level  = levels[fine]
+            levels[coarse] = _aggregate(level["arc1"], level["bin1"] // factor, level["arc2"], level["bin2"] // factor, level["count"])
+        return cls(arc_ids, arc_sizes, levels)
+
+    @classmethod
+    def from_links(cls, links, sizes, resolutions: Sequence[int] = (1000000, 100000, 10000), weight: Optional[str] = None) -> "LinkPyramid":
+        """Function that builds the pyramid from one table of links, see from_chunks()"""
+        return cls.from_chunks([links], sizes, resolutions, weight)
+
+    @classmethod
+    def from_file(cls, path: str, sizes, resolutions: Sequence[int] = (1000000, 100000, 10000), format: Optional[str] = None, chunk_size: int = 1 << 16, weight: Optional[str] = None, **kwargs) -> "LinkPyramid":
+        """Function that streams a BEDPE or link file into the pyramid
+
+        The file is read with pycircos.readers.iter_chunks(), to which format,
+        chunk_size and the other keyword arguments are passed. weight names a
+        value column of a BEDPE file, such as "value2" for the score of a file
+        without header, summed instead of counting the links.
+        """
+        from . import readers
+        arc_ids, _ = cls._arc_sizes(sizes)
+        return cls.from_chunks(readers.iter_chunks(path, format, arc_ids=arc_ids.tolist(), chunk_size=chunk_size, **kwargs), sizes, resolutions, weight)
+
+    def select(self, max_links: int) -> int:
+        """Function that returns the finest resolution with at most max_links rows
+
+        The coarsest resolution is returned if every level has more rows.
+        """
+        for resolution in self.levels:
+            if len(self.levels[resolution]["count"]) <= max_links:
+                return resolution
+        return self.resolutions[-1]
+
+    def links(self, resolution: int, min_count: float = 0) -> Dict[str, np.ndarray]:
+        """Function that returns the rows of a level as link columns
+
+        Returns
+        _______
+        dict
+            "arc1", "start1", "end1", "arc2", "start2", "end2" and "count"
+            arrays. The ends of a row span its bins, clipped to the arcs.
+        """
+        if resolution not in self.levels:
+            raise ValueError("resolution should be one of {}".format(", ".join(str(value) for value in self.levels)))
+        level = self.levels[resolution]
+        rows  = np.flatnonzero(level["count"] >= min_count)
+        columns = {"count": level["count"][rows]}
+        for n in ("1", "2"):
+            arc = level["arc" + n][rows]
+            start = level["bin" + n][rows] * resolution
+            columns["arc" + n]   = self.arc_ids[arc]
+            columns["start" + n] = start
+            columns["end" + n]   = np.minimum(start + resolution, self.sizes[arc])
+        return columns
+
+    def save(self, path: str) -> None:
+        """Function that writes the pyramid into an .npz file"""
+        columns = {"{}_{}".format(key, resolution): level[key] for resolution, level in self.levels.items() for key in COLUMNS}
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, arc_ids=self.arc_ids, sizes=self.sizes, resolutions=np.array(self.resolutions, dtype=np.int64), **columns)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LinkPyramid":
+        """Function that reads a pyramid written by save()"""
+        with np.load(path) as data:
+            levels = {int(resolution): {key: data["{}_{}".format(key, resolution)] for key in COLUMNS} for resolution in data["resolutions"]}
+            return cls(data["arc_ids"], data["sizes"], levels)
@@ -0,0 +1,73 @@
+import sys
+import json
+import argparse
+from typing import List, Optional
+
+from . import spec as plot_spec
+from . import batch
+
+
+def _load(paths: List[str]) -> List:
+    specs = []
+    for path in paths:
+        specs.extend(plot_spec.load_specs(path))
+    return specs
+
+
+def _run(specs: List, processes: Optional[int], report: Optional[str], profile: bool = False) -> int:
+    failed = 0
+    handle = None if report is None else open(report, "a")
+    try:
+        for result in batch.iter_render_batch(specs, processes, profile):
+            line = json.dumps(result.to_dict())
+            print(line, flush=True)
+            if handle is not None:
+                handle.write(line + "\n")
+                handle.flush()
+            failed += result.ok == False
+    finally:
+        if handle is not None:
+            handle.close()
+    return 1 if failed > 0 else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Function of the pycircos command
+
+    pycircos render SPEC...    validates and renders the spec files in this process
+    pycircos batch SPEC...     renders the spec files on a process pool
+    pycircos validate SPEC...  only validates the spec files
+    """
+    parser = argparse.ArgumentParser(prog="pycircos", description="Render circos plots from YAML, TOML or JSON plot specifications.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render = commands.add_parser("render", help="render spec files")
+    render.add_argument("specs", nargs="+", help="spec files (.yaml, .toml, .json or JSON lines)")
+    render.add_argument("-j", "--processes", type=int, default=0, help="number of worker processes (default: 0, render in this process)")
+    render.add_argument("--report", default=None, help="JSON lines file to which the result of each figure is appended")
+    render.add_argument("--profile", action="store_true", help="record the time, artists and memory of each rendering stage in the results")
+
+    pool = commands.add_parser("batch", help="render spec files on a process pool")
+    pool.add_argument("specs", nargs="+", help="spec files (.yaml, .toml, .json or JSON lines)")
+    pool.add_argument("-j", "--processes", type=int, default=None, help="number of worker processes (default: number of CPUs)")
+    pool.add_argument("--report", default=None, help="JSON lines file to which the result of each figure is appended")
+    pool.add_argument("--profile", action="store_true", help="record the time, artists and memory of each rendering stage in the results")
+
+    validate = commands.add_parser("validate", help="validate spec files without rendering")
+    validate.add_argument("specs", nargs="+", help="spec files (.yaml, .toml, .json or JSON lines)")
+
+    args = parser.parse_args(argv)
+    try:
+        specs = _load(args.specs)
+    except (plot_spec.SpecError, OSError, ValueError, ImportError) as e:
+        print("pycircos: {}".format(e), file=sys.stderr)
+        return 2
+
+    if args.command == "validate":
+        print("{} spec(s) are valid".format(len(specs)))
+        return 0
+    return _run(specs, args.processes, args.report, args.profile)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
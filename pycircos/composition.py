@@ -0,0 +1,217 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+BASES: str = "ACGTN"
+
+# Base counts of a sequence store are kept at every CHECKPOINT letters.
+CHECKPOINT: int = 1 << 16
+
+_CODE_TABLE: np.ndarray = np.full(256, BASES.index("N"), dtype=np.uint8)
+for _code, _base in enumerate("ACGT"):
+    _CODE_TABLE[ord(_base)] = _code
+    _CODE_TABLE[ord(_base.lower())] = _code
+
+
+def encode(seq) -> np.ndarray:
+    """Function that encodes a nucleotide sequence into a uint8 array
+
+    A, C, G and T (in upper or lower case) are encoded to 0, 1, 2 and 3, and
+    any other letter is encoded to 4 (N).
+
+    Parameters
+    __________
+    seq : str, bytes or Bio.Seq.Seq
+        Nucleotide sequence.
+
+    Returns
+    _______
+    numpy.ndarray
+        uint8 codes of the sequence.
+    """
+    if isinstance(seq, str):
+        seq = seq.encode("ascii")
+    elif not isinstance(seq, (bytes, bytearray, memoryview)):
+        seq = bytes(seq)
+    return _CODE_TABLE[np.frombuffer(seq, dtype=np.uint8)]
+
+
+def _base_code(base: str) -> int:
+    if not isinstance(base, str) or len(base) != 1 or base.upper() not in BASES:
+        raise ValueError("Nucleotide base should be one of the letters of '{}'".format(BASES))
+    return BASES.index(base.upper())
+
+
+class CompositionIndex:
+    """Class that holds cumulative nucleotide counts of a sequence
+
+    The codes can be an array made by encode() or a seqstore.SequenceStore.
+    For an array, the cumulative count of each base is built on the first
+    request and kept, so the count of any window is a difference of two
+    lookups. For a store, only the counts at every CHECKPOINT letters are
+    kept, a few bytes per 64 kb, and the counts up to a position inside a
+    block are completed from the codes of that block, each block being
+    unpacked once per call of count().
+    """
+
+    def __init__(self, codes) -> None:
+        self.codes = codes
+        self._cumulative: Dict[int, np.ndarray] = {}
+        self._checkpoints: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_sequence(cls, seq) -> "CompositionIndex":
+        """Function that builds the index from a nucleotide sequence"""
+        return cls(encode(seq))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def cumulative(self, base: str) -> np.ndarray:
+        """Function that returns the cumulative count of the base
+
+        Returns
+        _______
+        numpy.ndarray
+            Array of length len(self) + 1 whose i-th value is the number of
+            the base in the first i letters.
+        """
+        code = _base_code(base)
+        if code not in self._cumulative:
+            dtype = np.uint32 if len(self) < 2 ** 32 else np.uint64
+            cumulative = np.zeros(len(self) + 1, dtype=dtype)
+            if isinstance(self.codes, np.ndarray):
+                np.cumsum(self.codes == code, dtype=dtype, out=cumulative[1:])
+            else:
+                for start, codes in self.codes.iter_codes():
+                    part = cumulative[start + 1:start + 1 + len(codes)]
+                    np.cumsum(codes == code, dtype=dtype, out=part)
+                    part += cumulative[start]
+            self._cumulative[code] = cumulative
+        return self._cumulative[code]
+
+    def checkpoints(self) -> np.ndarray:
+        """Function that returns the counts of the bases before each block of CHECKPOINT letters
+
+        Returns
+        _______
+        numpy.ndarray
+            Array of the shape (blocks + 1, len(BASES)) whose row b holds the
+            number of each base in the first b * CHECKPOINT letters.
+        """
+        if self._checkpoints is None:
+            n_blocks = -(-len(self) // CHECKPOINT)
+            checkpoints = np.zeros((n_blocks + 1, len(BASES)), dtype=np.int64)
+            for start, codes in self.codes.iter_codes(chunk_size=CHECKPOINT * 16):
+                first = start // CHECKPOINT
+                edges = np.arange(0, len(codes), CHECKPOINT)
+                for code in range(len(BASES)):
+                    checkpoints[first + 1:first + 1 + len(edges), code] = np.add.reduceat((codes == code).view(np.int8), edges, dtype=np.int64)
+            np.cumsum(checkpoints, axis=0, out=checkpoints)
+            self._checkpoints = checkpoints
+        return self._checkpoints
+
+    def _prefix(self, codes: List[int], positions: np.ndarray) -> np.ndarray:
+        """Function that counts the codes in the first positions[k] letters of a sequence store, a code given twice being counted twice"""
+        block  = positions // CHECKPOINT
+        rest   = positions - block * CHECKPOINT
+        counts = self.checkpoints()[block][:, codes].sum(axis=1)
+
+        table = np.bincount(codes, minlength=len(BASES)).astype(np.int64)
+        partial = np.flatnonzero(rest > 0)
+        partial = partial[np.argsort(block[partial], kind="stable")]
+        blocks, first = np.unique(block[partial], return_index=True)
+        last = np.append(first[1:], len(partial))
+        for b, lo, hi in zip(blocks.tolist(), first.tolist(), last.tolist()):
+            cumulative = np.cumsum(table[self.codes.codes(b * CHECKPOINT, (b + 1) * CHECKPOINT)], dtype=np.int64)
+            rows = partial[lo:hi]
+            counts[rows] += cumulative[rest[rows] - 1]
+        return counts
+
+    def count(self, bases: str, starts, ends) -> np.ndarray:
+        """Function that counts the bases in the windows starts[k]:ends[k]
+
+        Each letter of bases is counted, so a letter given twice is counted
+        twice, for an array as for a sequence store.
+
+        Parameters
+        __________
+        bases : str
+            Letters of the bases to be counted, e.g. "GC".
+        starts : numpy.ndarray
+            Start positions of the windows.
+        ends : numpy.ndarray
+            End positions (exclusive) of the windows.
+
+        Returns
+        _______
+        numpy.ndarray
+            Counts for each window.
+
+        Examples
+        ________
+        >>> CompositionIndex.from_sequence("GGCA").count("GG", [0, 1], [4, 3])
+        array([4, 2])
+        """
+        starts = np.clip(np.asarray(starts, dtype=np.int64), 0, len(self))
+        ends = np.clip(np.asarray(ends, dtype=np.int64), 0, len(self))
+        if isinstance(self.codes, np.ndarray) == False:
+            codes = [_base_code(base) for base in bases]
+            positions, inverse = np.unique(np.concatenate((starts, ends)), return_inverse=True)
+            prefix = self._prefix(codes, positions)[inverse]
+            return prefix[len(starts):] - prefix[:len(starts)]
+        counts = np.zeros(len(starts), dtype=np.int64)
+        for base in bases:
+            cumulative = self.cumulative(base)
+            counts += cumulative[ends].astype(np.int64) - cumulative[starts].astype(np.int64)
+        return counts
+
+    def windows(self, window_size: int, step_size: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Function that returns the windows scanned by ratio() and skew()
+
+        Windows start at every step_size along the sequence and one more
+        window from the last start to the end of the sequence is appended.
+
+        Returns
+        _______
+        tuple
+            (starts, ends) arrays of the windows.
+        """
+        if step_size is None:
+            step_size = window_size
+        if window_size <= 0 or step_size <= 0:
+            raise ValueError("window_size and step_size should be positive values")
+
+        starts = np.arange(0, len(self), step_size, dtype=np.int64)
+        if len(starts) == 0:
+            return starts, starts.copy()
+        ends = np.minimum(starts + window_size, len(self))
+        return np.append(starts, starts[-1]), np.append(ends, len(self))
+
+    def ratio(self, n1: str = "G", n2: Optional[str] = "C", window_size: int = 1000, step_size: Optional[int] = None) -> np.ndarray:
+        """Function that calculates the n1+n2 ratio for sliding windows
+
+        The amount of each window is divided by window_size, while the
+        amount of the appended last window is divided by its real length.
+        """
+        starts, ends = self.windows(window_size, step_size)
+        bases = n1 if n2 is None else n1 + n2
+        amounts = self.count(bases, starts, ends).astype(np.float64)
+        lengths = np.full(len(starts), window_size, dtype=np.float64)
+        if len(starts) > 0:
+            lengths[-1] = ends[-1] - starts[-1]
+        return amounts / lengths
+
+    def skew(self, n1: str = "G", n2: str = "C", window_size: int = 1000, step_size: Optional[int] = None, cumulative: bool = False) -> np.ndarray:
+        """Function that calculates the (n1-n2)/(n1+n2) skew for sliding windows
+
+        Windows containing neither n1 nor n2 get a skew of 0. If cumulative is
+        True, the cumulative sum of the skews is returned.
+        """
+        starts, ends = self.windows(window_size, step_size)
+        amounts1 = self.count(n1, starts, ends).astype(np.float64)
+        amounts2 = self.count(n2, starts, ends).astype(np.float64)
+        total = amounts1 + amounts2
+        skews = np.divide(amounts1 - amounts2, total, out=np.zeros(len(total), dtype=np.float64), where=total > 0)
+        if cumulative == True:
+            skews = np.cumsum(skews)
+        return skews
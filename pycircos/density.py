@@ -0,0 +1,159 @@
+import numpy as np
+from typing import Optional, Tuple
+
+
+def split_positions(positions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Function that splits positions into point and interval arrays
+
+    Parameters
+    __________
+    positions : list or numpy.ndarray
+        List of int positions and/or tuples of (start, end) positions. A one
+        dimensional array is taken as points and an array of shape (n, 2) is
+        taken as intervals.
+
+    Returns
+    _______
+    tuple
+        (points, point_order, intervals, interval_order). The order arrays
+        hold the indices of the items in *positions* so that weights can be
+        matched to them.
+    """
+    if isinstance(positions, np.ndarray):
+        if positions.ndim == 1:
+            return positions.astype(np.int64), np.arange(len(positions)), np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=np.int64)
+        elif positions.ndim == 2 and positions.shape[1] == 2:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), positions.astype(np.int64), np.arange(len(positions))
+        else:
+            raise ValueError("positions array should be one dimensional or have the shape (n, 2)")
+
+    points, point_order, intervals, interval_order = [], [], [], []
+    for i, pos in enumerate(positions):
+        if isinstance(pos, (int, np.integer)):
+            points.append(pos)
+            point_order.append(i)
+        elif type(pos) == tuple and len(pos) == 2:
+            intervals.append(pos)
+            interval_order.append(i)
+        else:
+            raise ValueError("List elements should be int type or tuple consiting of two int values")
+
+    points = np.array(points, dtype=np.int64)
+    intervals = np.array(intervals, dtype=np.int64).reshape(-1, 2)
+    return points, np.array(point_order, dtype=np.int64), intervals, np.array(interval_order, dtype=np.int64)
+
+
+def _weighted_rank(values: np.ndarray, weights: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Function that sorts values and returns them with the cumulative weights
+
+    The cumulative weights start with 0 so that the weight of the values in
+    sorted[a:b] is cumulative[b] - cumulative[a].
+    """
+    order = np.argsort(values, kind="stable")
+    cumulative = np.zeros(len(values) + 1, dtype=np.float64)
+    if weights is None:
+        cumulative[1:] = np.arange(1, len(values) + 1)
+    else:
+        np.cumsum(weights[order], out=cumulative[1:])
+    return values[order], cumulative
+
+
+def count_in_windows(positions, window_starts, window_ends, weights=None) -> np.ndarray:
+    """Function that counts positions overlapping each window
+
+    A window covers window_starts[k] <= x < window_ends[k]. An int position
+    is counted when it lies in the window and a (start, end) interval is
+    counted when it overlaps the window, both ends of the interval being
+    inclusive.
+
+    Parameters
+    __________
+    positions : list or numpy.ndarray
+        Same value with the positions of calc_density().
+    window_starts : numpy.ndarray
+        Start coordinates of the windows.
+    window_ends : numpy.ndarray
+        End coordinates (exclusive) of the windows.
+    weights : list or numpy.ndarray, optional
+        Weight of each position. If weights is not given, every position
+        counts as 1.
+
+    Returns
+    _______
+    numpy.ndarray
+        Counts (or summed weights) for each window.
+    """
+    window_starts = np.asarray(window_starts, dtype=np.int64)
+    window_ends = np.asarray(window_ends, dtype=np.int64)
+    points, point_order, intervals, interval_order = split_positions(positions)
+
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) != len(point_order) + len(interval_order):
+            raise ValueError("weights should have the same length as positions")
+
+    counts = np.zeros(len(window_starts), dtype=np.float64)
+    if len(points) > 0:
+        values, cumulative = _weighted_rank(points, None if weights is None else weights[point_order])
+        lo = np.searchsorted(values, window_starts, side="left")
+        hi = np.searchsorted(values, window_ends, side="left")
+        counts += cumulative[hi] - cumulative[lo]
+
+    if len(intervals) > 0:
+        starts = np.minimum(intervals[:, 0], intervals[:, 1])
+        ends = np.maximum(intervals[:, 0], intervals[:, 1])
+        interval_weights = None if weights is None else weights[interval_order]
+        # Intervals starting before the window end minus the ones that are
+        # already closed before the window start.
+        sorted_starts, cumulative_starts = _weighted_rank(starts, interval_weights)
+        sorted_ends, cumulative_ends = _weighted_rank(ends, interval_weights)
+        opened = cumulative_starts[np.searchsorted(sorted_starts, window_ends - 1, side="right")]
+        closed = cumulative_ends[np.searchsorted(sorted_ends, window_starts, side="left")]
+        counts += opened - closed
+
+    return counts
+
+
+def calc_density(positions, size: int, window_size: int = 1000, step_size: Optional[int] = None, weights=None) -> np.ndarray:
+    """Function that converts positions into density values of sliding windows
+
+    Windows start at every step_size from 0 to size. As the last window
+    usually runs off the end of the sequence, one more value is appended that
+    counts the positions from the last window start to size and scales the
+    count by the covered fraction of a window.
+
+    Parameters
+    __________
+    positions : list or numpy.ndarray
+        Same value with the positions of count_in_windows().
+    size : int
+        Length of the sequence.
+    window_size : int
+        Size of the sliding window.
+    step_size : int, optional
+        Step of the sliding window. If step_size is smaller than window_size,
+        the windows overlap. If step_size is not given, window_size is used.
+    weights : list or numpy.ndarray, optional
+        Weight of each position.
+
+    Returns
+    _______
+    numpy.ndarray
+        Density values for each window.
+    """
+    if step_size is None:
+        step_size = window_size
+
+    if window_size <= 0 or step_size <= 0:
+        raise ValueError("window_size and step_size should be positive values")
+
+    window_starts = np.arange(0, size, step_size, dtype=np.int64)
+    if len(window_starts) == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    last = window_starts[-1]
+    starts = np.append(window_starts, last)
+    ends = np.append(window_starts + window_size, size)
+    densities = count_in_windows(positions, starts, ends, weights=weights)
+    densities[-1] *= (size - last) / window_size
+    return densities
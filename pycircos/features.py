@@ -0,0 +1,143 @@
+import os
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+from .intervals import IntervalIndex
+
+QUALIFIERS: Tuple[str, ...] = ("gene", "locus_tag", "product")
+SUFFIX: str = ".features.npz"
+
+
+class FeatureTable:
+    """Class for the features of a record stored as NumPy columns
+
+    Row i holds record.features[i], so rows can be used to go back to the
+    Bio.SeqFeature objects. Strands are 1, -1 or 0 (unknown), and each
+    qualifier column holds the first value of the qualifier or "".
+
+    Parameters
+    __________
+    types : numpy.ndarray
+        Feature types, e.g. "CDS".
+    starts : numpy.ndarray
+        Start positions (0-based) of the features.
+    ends : numpy.ndarray
+        End positions (exclusive) of the features.
+    strands : numpy.ndarray
+        Strands of the features.
+    qualifiers : dict, optional
+        Qualifier names to numpy.ndarray of their values.
+    """
+
+    def __init__(self, types, starts, ends, strands, qualifiers: Optional[Dict[str, np.ndarray]] = None) -> None:
+        self.types: np.ndarray   = np.asarray(types, dtype=str)
+        self.starts: np.ndarray  = np.asarray(starts, dtype=np.int64)
+        self.ends: np.ndarray    = np.asarray(ends, dtype=np.int64)
+        self.strands: np.ndarray = np.asarray(strands, dtype=np.int8)
+        self.qualifiers: Dict[str, np.ndarray] = {} if qualifiers is None else {key: np.asarray(value, dtype=str) for key, value in qualifiers.items()}
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def from_features(cls, features, qualifiers: Sequence[str] = QUALIFIERS) -> "FeatureTable":
+        """Function that extracts the columns of Bio.SeqFeature objects in one pass"""
+        n = len(features)
+        types   = []
+        starts  = np.empty(n, dtype=np.int64)
+        ends    = np.empty(n, dtype=np.int64)
+        strands = np.zeros(n, dtype=np.int8)
+        values  = {key: [] for key in qualifiers}
+        for i, feat in enumerate(features):
+            location   = feat.location
+            types.append(feat.type)
+            starts[i]  = int(location.start)
+            ends[i]    = int(location.end)
+            strands[i] = location.strand or 0
+            for key in qualifiers:
+                value = feat.qualifiers.get(key)
+                values[key].append(value[0] if value else "")
+        return cls(np.array(types, dtype=str), starts, ends, strands, {key: np.array(value, dtype=str) for key, value in values.items()})
+
+    def save(self, path: str, source: Optional[str] = None) -> None:
+        """Function that writes the table into an .npz file
+
+        If source is given, its size and modification time are stored so that
+        load() can detect a changed source file.
+        """
+        stamp = np.array([-1, -1], dtype=np.int64)
+        if source is not None:
+            stat  = os.stat(source)
+            stamp = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+        columns = {"qualifier_" + key: value for key, value in self.qualifiers.items()}
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, types=self.types, starts=self.starts, ends=self.ends, strands=self.strands, source=stamp, **columns)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, source: Optional[str] = None) -> Optional["FeatureTable"]:
+        """Function that reads a table written by save()
+
+        None is returned if the file does not exist or source has changed
+        since the table was written.
+        """
+        try:
+            data = np.load(path)
+        except (OSError, ValueError):
+            return None
+        with data:
+            if source is not None:
+                stat = os.stat(source)
+                if data["source"].tolist() != [stat.st_size, stat.st_mtime_ns]:
+                    return None
+            qualifiers = {key[len("qualifier_"):]: data[key] for key in data.files if key.startswith("qualifier_")}
+            return cls(data["types"], data["starts"], data["ends"], data["strands"], qualifiers)
+
+    @classmethod
+    def cached(cls, source: str, features=None, qualifiers: Sequence[str] = QUALIFIERS, path: Optional[str] = None) -> "FeatureTable":
+        """Function that returns the table of a GenBank file, cached next to it
+
+        The table is read from path (default: source + ".features.npz") if it
+        is up to date and holds the qualifiers, and is otherwise built from
+        features (or the record parsed from source) and written to path. A
+        directory that cannot be written only disables the cache.
+        """
+        if path is None:
+            path = source + SUFFIX
+        table = cls.load(path, source)
+        if table is not None and all(key in table.qualifiers for key in qualifiers):
+            return table
+
+        if features is None:
+            from Bio import SeqIO
+            features = SeqIO.read(source, "genbank").features
+        table = cls.from_features(features, qualifiers)
+        try:
+            table.save(path, source)
+        except OSError:
+            pass
+        return table
+
+    def mask(self, feature_type: Optional[str] = None, strand: Optional[int] = None) -> np.ndarray:
+        """Function that returns the boolean mask of the features of feature_type on strand
+
+        feature_type can also be a list of types.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if feature_type is not None:
+            mask &= np.isin(self.types, [feature_type] if isinstance(feature_type, str) else list(feature_type))
+        if strand is not None:
+            mask &= self.strands == strand
+        return mask
+
+    def select(self, mask: np.ndarray) -> "FeatureTable":
+        """Function that returns the rows of the mask as a new table"""
+        return FeatureTable(self.types[mask], self.starts[mask], self.ends[mask], self.strands[mask], {key: value[mask] for key, value in self.qualifiers.items()})
+
+    def interval_index(self, feature_type: Optional[str] = None, strand: Optional[int] = None) -> IntervalIndex:
+        """Function that builds the interval index of the features of feature_type on strand
+
+        The ids of the index are the rows of the table.
+        """
+        rows = np.flatnonzero(self.mask(feature_type, strand))
+        return IntervalIndex(self.starts[rows], self.ends[rows], rows)
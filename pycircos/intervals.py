@@ -0,0 +1,148 @@
+import numpy as np
+from typing import List, Optional, Tuple
+
+
+class IntervalIndex:
+    """Class for an index of half-open intervals [start, end) on one arc
+
+    The intervals are sorted by start and split into layers, as in a nested
+    containment list: the intervals not contained in an earlier interval
+    form the first layer, those contained in the first layer only the second
+    one, and so on. No interval of a layer contains another, so both the
+    starts and the ends of a layer are sorted, and the intervals of a layer
+    overlapping a query lie between two binary searches. A query costs
+    O(d log n + k) for d layers, and d is the nesting depth of the features,
+    e.g. a source feature, genes and their CDSs, not the number of intervals
+    under a long one.
+
+    Parameters
+    __________
+    starts : array-like
+        Start positions of the intervals.
+    ends : array-like
+        End positions (exclusive) of the intervals.
+    ids : array-like, optional
+        Value returned for each interval by the queries, e.g. its row in a
+        table. If ids is not given, the positions of the intervals in starts
+        are returned.
+    """
+
+    def __init__(self, starts, ends, ids=None) -> None:
+        starts = np.asarray(starts, dtype=np.int64)
+        ends   = np.asarray(ends, dtype=np.int64)
+        if starts.shape != ends.shape or starts.ndim != 1:
+            raise ValueError("starts and ends should be one dimensional arrays of the same length")
+        # containing intervals before the intervals they contain
+        order = np.lexsort((-ends, starts))
+        self.starts: np.ndarray  = starts[order]
+        self.ends: np.ndarray    = ends[order]
+        self.ids: np.ndarray     = order if ids is None else np.asarray(ids)[order]
+        self.layers: List[np.ndarray] = self._nest()
+
+    def _nest(self) -> List[np.ndarray]:
+        """Function that splits the sorted intervals into layers without contained intervals
+
+        Returns
+        _______
+        list of numpy.ndarray
+            Positions of the intervals of each layer in the sorted arrays.
+        """
+        layers = []
+        rest = np.arange(len(self.starts))
+        while len(rest) > 0:
+            ends = self.ends[rest]
+            top  = np.ones(len(rest), dtype=bool)
+            top[1:] = ends[1:] > np.maximum.accumulate(ends)[:-1]
+            layers.append(rest[top])
+            rest = rest[~top]
+        return layers
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def from_features(cls, features, feature_type: Optional[str] = None) -> "IntervalIndex":
+        """Function that builds the index of Bio.SeqFeature objects
+
+        The ids of the index are the positions of the features in features.
+        """
+        rows = [i for i, feat in enumerate(features) if feature_type is None or feat.type == feature_type]
+        starts = np.fromiter((int(features[i].location.start) for i in rows), dtype=np.int64, count=len(rows))
+        ends   = np.fromiter((int(features[i].location.end) for i in rows), dtype=np.int64, count=len(rows))
+        return cls(starts, ends, np.array(rows, dtype=np.int64))
+
+    @classmethod
+    def from_records(cls, records: np.ndarray, arc_id: Optional[str] = None) -> "IntervalIndex":
+        """Function that builds the index of a structured array of pycircos.readers
+
+        If arc_id is given, only the rows on the arc are indexed. The ids of
+        the index are the rows of records.
+        """
+        rows = np.arange(len(records)) if arc_id is None else np.flatnonzero(records["arc_id"] == arc_id)
+        return cls(records["start"][rows], records["end"][rows], rows)
+
+    def _overlaps(self, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Function that returns (region, position) pairs of the overlapping intervals, sorted by region and start"""
+        regions, positions = [], []
+        for layer in self.layers:
+            lo = np.searchsorted(self.ends[layer], starts, side="right")
+            hi = np.maximum(np.searchsorted(self.starts[layer], ends, side="left"), lo)
+            counts = hi - lo
+            total  = int(counts.sum())
+            if total == 0:
+                continue
+            first = np.repeat(lo - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+            regions.append(np.repeat(np.arange(len(starts)), counts))
+            positions.append(layer[first + np.arange(total)])
+        if len(regions) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        regions   = np.concatenate(regions)
+        positions = np.concatenate(positions)
+        order     = np.lexsort((positions, regions))
+        return regions[order], positions[order]
+
+    def query_many(self, starts, ends) -> Tuple[np.ndarray, np.ndarray]:
+        """Function that finds the intervals overlapping each of many regions
+
+        Parameters
+        __________
+        starts : array-like
+            Start positions of the regions.
+        ends : array-like
+            End positions (exclusive) of the regions.
+
+        Returns
+        _______
+        tuple
+            (offsets, ids). The ids of the intervals overlapping region k are
+            ids[offsets[k]:offsets[k + 1]], in the order of their starts.
+        """
+        starts = np.atleast_1d(np.asarray(starts, dtype=np.int64))
+        ends   = np.atleast_1d(np.asarray(ends, dtype=np.int64))
+        regions, positions = self._overlaps(starts, ends)
+        offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(regions, minlength=len(starts)), out=offsets[1:])
+        return offsets, self.ids[positions]
+
+    def count_many(self, starts, ends) -> np.ndarray:
+        """Function that counts the intervals overlapping each of many regions
+
+        Returns
+        _______
+        numpy.ndarray
+        """
+        offsets, _ = self.query_many(starts, ends)
+        return np.diff(offsets)
+
+    def query(self, start: int, end: int) -> np.ndarray:
+        """Function that returns the ids of the intervals overlapping [start, end)"""
+        return self.intervals(start, end)[2]
+
+    def intervals(self, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Function that returns (starts, ends, ids) of the intervals overlapping [start, end), or of all intervals"""
+        if start is None and end is None:
+            return self.starts, self.ends, self.ids
+        start  = np.iinfo(np.int64).min if start is None else start
+        end    = np.iinfo(np.int64).max if end is None else end
+        _, index = self._overlaps(np.array([start], dtype=np.int64), np.array([end], dtype=np.int64))
+        return self.starts[index], self.ends[index], self.ids[index]
@@ -0,0 +1,162 @@
+import os
+import time
+import multiprocessing
+import concurrent.futures
+from typing import List, Optional
+
+from . import ncbi
+from .pycircos import Garc
+
+
+class LoadReport:
+    """Class that holds the timing and the failure of loading one source"""
+
+    def __init__(self, source: str, arc_id: Optional[str] = None) -> None:
+        self.source: str = source
+        self.arc_id: Optional[str] = arc_id
+        self.path: Optional[str] = None
+        self.fetch_time: float = 0.0
+        self.parse_time: float = 0.0
+        self.error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else "{}: {}".format(type(self.error).__name__, self.error)
+        return "LoadReport(source={!r}, fetch_time={:.3f}, parse_time={:.3f}, {})".format(self.source, self.fetch_time, self.parse_time, status)
+
+
+class LoadResult:
+    """Class that holds the loaded Garc objects and the reports of all sources
+
+    garcs keeps the order of the sources, and a failed source is kept as None.
+    """
+
+    def __init__(self, garcs: List[Optional[Garc]], reports: List[LoadReport]) -> None:
+        self.garcs: List[Optional[Garc]] = garcs
+        self.reports: List[LoadReport] = reports
+
+    @property
+    def failures(self) -> List[LoadReport]:
+        return [report for report in self.reports if report.ok == False]
+
+    def __iter__(self):
+        return iter(self.garcs)
+
+    def __len__(self) -> int:
+        return len(self.garcs)
+
+
+def _fetch(source: str, cache: ncbi.AccessionCache) -> str:
+    if os.path.exists(source):
+        return source
+    return cache.get(source)
+
+
+def _parse(path: str):
+    from Bio import SeqIO
+    start = time.perf_counter()
+    record = SeqIO.read(path, "genbank")
+    return record, time.perf_counter() - start
+
+
+def load_garcs(sources: List[str], arc_ids: Optional[List[str]] = None, gcircle=None, cache: Optional[ncbi.AccessionCache] = None, fetch_workers: int = 8, parse_workers: Optional[int] = None, raise_errors: bool = False, **garc_kwargs) -> LoadResult:
+    """Function that loads many GenBank records into Garc objects concurrently
+
+    Accession numbers are downloaded through the cache on a thread pool and
+    every file is parsed on a process pool as soon as it is available. The
+    Garc objects are created in the order of sources, so their default ids
+    and colors do not depend on which download finishes first.
+
+    Parameters
+    __________
+    sources : list of str
+        NCBI accession numbers or paths of GenBank files.
+    arc_ids : list of str, optional
+        arc_id of each Garc object. If arc_ids is not given, the default ids
+        of Garc are used.
+    gcircle : Gcircle, optional
+        If gcircle is given, the loaded Garc objects are added to it with
+        add_garc() in the order of sources.
+    cache : pycircos.ncbi.AccessionCache, optional
+        Cache used for accession numbers. If cache is not given,
+        ncbi.default_cache() is used.
+    fetch_workers : int
+        Number of download threads.
+    parse_workers : int, optional
+        Number of parser processes. If parse_workers is 0, files are parsed
+        in the download threads. If parse_workers is not given, the number of
+        CPUs is used. The processes are started with the "forkserver" (or
+        "spawn") method, so a script calling load_garcs() should do so under
+        if __name__ == "__main__".
+    raise_errors : bool
+        If True, the first failure is raised after all sources have been
+        tried.
+    **garc_kwargs
+        Other parameters passed to Garc().
+
+    Returns
+    _______
+    LoadResult
+    """
+    if arc_ids is not None and len(arc_ids) != len(sources):
+        raise ValueError("arc_ids should have the same length as sources")
+    if cache is None:
+        cache = ncbi.default_cache()
+
+    reports = [LoadReport(source, None if arc_ids is None else arc_ids[i]) for i, source in enumerate(sources)]
+    records = [None] * len(sources)
+
+    def fetch(i):
+        start = time.perf_counter()
+        try:
+            return _fetch(sources[i], cache)
+        finally:
+            reports[i].fetch_time = time.perf_counter() - start
+
+    if parse_workers == 0:
+        parse_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, fetch_workers))
+    else:
+        # parsers are started from a server process, not forked from this
+        # process while its download threads run
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        parse_pool = concurrent.futures.ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context(method))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, fetch_workers)) as fetch_pool, parse_pool:
+        fetches = {fetch_pool.submit(fetch, i): i for i in range(len(sources))}
+        parses = {}
+        for future in concurrent.futures.as_completed(fetches):
+            i = fetches[future]
+            try:
+                reports[i].path = future.result()
+            except Exception as e:
+                reports[i].error = e
+                continue
+            parses[parse_pool.submit(_parse, reports[i].path)] = i
+
+        for future in concurrent.futures.as_completed(parses):
+            i = parses[future]
+            try:
+                records[i], reports[i].parse_time = future.result()
+            except Exception as e:
+                reports[i].error = e
+
+    garcs = []
+    for i, record in enumerate(records):
+        if record is None:
+            garcs.append(None)
+            continue
+        garc = Garc(arc_id=reports[i].arc_id, record=record, **garc_kwargs)
+        # the feature table of the record is cached under its source path
+        garc.record_path = reports[i].path
+        reports[i].arc_id = garc.arc_id
+        garcs.append(garc)
+        if gcircle is not None:
+            gcircle.add_garc(garc)
+
+    result = LoadResult(garcs, reports)
+    if raise_errors == True and len(result.failures) > 0:
+        raise result.failures[0].error
+    return result
@@ -0,0 +1,105 @@
+import numpy as np
+from typing import Tuple
+
+
+def pixel_bins(theta: np.ndarray, lo: float, hi: float, n_bins: int) -> np.ndarray:
+    """Function that returns the pixel bin of each angle in the range lo to hi"""
+    if hi <= lo:
+        return np.zeros(len(theta), dtype=np.int64)
+    bins = np.floor((np.asarray(theta, dtype=np.float64) - lo) * (n_bins / (hi - lo)))
+    return np.clip(bins, 0, n_bins - 1).astype(np.int64)
+
+
+def _groups(bins: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Function that sorts bins and returns (order, group starts, group bins)"""
+    order = np.argsort(bins, kind="stable")
+    sorted_bins = bins[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_bins[1:] != sorted_bins[:-1])))
+    return order, starts, sorted_bins[starts]
+
+
+def envelope(theta: np.ndarray, values: np.ma.MaskedArray, lo: float, hi: float, n_bins: int) -> Tuple[np.ndarray, np.ma.MaskedArray]:
+    """Function that reduces a line to the min/max envelope of each pixel bin
+
+    Each bin is replaced with two points, its minimum and its maximum, at the
+    center angle of the bin, which draws the same column of pixels as the
+    original line. Bins whose values are all masked stay masked, so breaks of
+    the line are kept at the bin resolution.
+
+    Returns
+    _______
+    tuple
+        (theta, values) of the reduced line.
+    """
+    values = np.ma.asarray(values)
+    bins = pixel_bins(theta, lo, hi, n_bins)
+    order, starts, group_bins = _groups(bins)
+    data = np.ma.getdata(values).astype(np.float64)[order]
+    mask = np.ma.getmaskarray(values)[order]
+
+    mins = np.minimum.reduceat(np.where(mask, np.inf, data), starts)
+    maxs = np.maximum.reduceat(np.where(mask, -np.inf, data), starts)
+    empty = np.isinf(mins)
+
+    centers = lo + (group_bins + 0.5) * ((hi - lo) / n_bins)
+    new_theta = np.repeat(centers, 2)
+    new_values = np.column_stack((mins, maxs)).reshape(-1)
+    new_mask = np.repeat(empty, 2)
+    return new_theta, np.ma.array(np.where(new_mask, 0.0, new_values), mask=new_mask)
+
+
+def grid_sample(theta: np.ndarray, r: np.ndarray, lo: float, hi: float, n_theta: int, bottom: float, top: float, n_r: int) -> np.ndarray:
+    """Function that keeps one point for each occupied pixel of a scatter track
+
+    Returns
+    _______
+    numpy.ndarray
+        Sorted indices of the kept points.
+    """
+    cells = pixel_bins(theta, lo, hi, n_theta) * max(1, n_r) + pixel_bins(r, min(bottom, top), max(bottom, top), max(1, n_r))
+    _, kept = np.unique(cells, return_index=True)
+    return np.sort(kept)
+
+
+def bin_intervals(theta: np.ndarray, widths: np.ndarray, lo: float, hi: float, n_bins: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Function that groups bars or cells falling into the same pixel bin
+
+    Returns
+    _______
+    tuple
+        (order, group starts, theta, widths). order sorts the items by group
+        so that np.ufunc.reduceat(values[order], starts) aggregates them, and
+        theta and widths span the items of each group.
+    """
+    bins = pixel_bins(theta + widths * 0.5, lo, hi, n_bins)
+    order, starts, _ = _groups(bins)
+    lefts = np.minimum.reduceat(theta[order], starts)
+    rights = np.maximum.reduceat((theta + widths)[order], starts)
+    return order, starts, lefts, rights - lefts
+
+
+def group_argmax(values: np.ndarray, order: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Function that returns the index of the largest value of each group made by bin_intervals()"""
+    group = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(order))))
+    ranked = np.lexsort((values[order], group))
+    ends = np.append(starts[1:], len(order)) - 1
+    return order[ranked[ends]]
+
+
+def merge_intervals(theta: np.ndarray, widths: np.ndarray, min_gap: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Function that merges intervals separated by less than min_gap
+
+    Returns
+    _______
+    tuple
+        (theta, widths) of the merged intervals.
+    """
+    if len(theta) == 0:
+        return theta, widths
+    order = np.argsort(theta, kind="stable")
+    lefts = theta[order]
+    rights = np.maximum.accumulate((theta + widths)[order])
+    new = np.concatenate(([True], lefts[1:] - rights[:-1] >= min_gap))
+    starts = np.flatnonzero(new)
+    merged_rights = np.maximum.reduceat(rights, starts)
+    return lefts[starts], merged_rights - lefts[starts]
@@ -0,0 +1,283 @@
+import io
+import os
+import re
+import time
+import shutil
+import hashlib
+import threading
+from typing import Callable, Dict, Optional
+
+URL: str = "https://www.ncbi.nlm.nih.gov/sviewer/viewer.cgi?tool=portal&save=file&log$=seqview&db=nuccore&report=gbwithparts&id={}&withparts=on"
+HEADERS: Dict[str, str] = {"User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:47.0) Gecko/20100101 Firefox/47.0"}
+ACCESSION_PATTERN: str = "[a-zA-Z]{1,2}_?[0-9]{5,6}(\\.[0-9]+)?"
+
+
+def is_accession(value: str) -> bool:
+    """Function that checks if the value is an NCBI accession number (with an optional version)"""
+    return re.fullmatch(ACCESSION_PATTERN, value) is not None
+
+
+def is_pinned(accession: str) -> bool:
+    """Function that checks if the accession number pins a version, e.g. NC_000913.3"""
+    return "." in accession
+
+
+class URLFetcher:
+    """Class that downloads GenBank flat files over HTTP
+
+    The url should contain "{}", which is replaced with the accession number.
+    Giving the url of a local server lets the cache run without NCBI.
+    """
+
+    def __init__(self, url: str = URL, headers: Optional[Dict[str, str]] = None, timeout: float = 60.0) -> None:
+        self.url: str = url
+        self.headers: Dict[str, str] = HEADERS if headers is None else headers
+        self.timeout: float = timeout
+
+    def __call__(self, accession: str, out) -> None:
+        """Function that streams the GenBank flat file of the accession into out"""
+        import urllib.request
+        request = urllib.request.Request(self.url.format(accession), headers=self.headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as u:
+            shutil.copyfileobj(u, out)
+
+
+class _HashingWriter:
+    def __init__(self, out) -> None:
+        self.out = out
+        self.sha256 = hashlib.sha256()
+        self.size: int = 0
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.out.write(data)
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+    except OSError:
+        return False
+    return True
+
+
+class AccessionCache:
+    """Class for a local content-addressed cache of GenBank flat files
+
+    Downloaded files are stored under objects/ by the SHA-256 of their
+    content, and refs/ maps each accession number to its object, so an
+    unversioned accession and its pinned version share one file. The
+    modification time of a ref is the time of the download and is used for
+    the TTL, while the access time of an object is set on every hit and is
+    used for the LRU eviction.
+
+    Parameters
+    __________
+    directory : str, optional
+        Cache directory. If directory is not given, $PYCIRCOS_CACHE_DIR or
+        ~/.cache/pycircos is used.
+    ttl : float, optional
+        Seconds until an unversioned accession is downloaded again. Versioned
+        accessions never expire. If ttl is not given, entries never expire.
+    max_bytes : int, optional
+        Maximum total size of the cached files. The least recently used files
+        are removed beyond this size.
+    fetcher : callable, optional
+        fetcher(accession, out) writes the GenBank flat file into the binary
+        file object out. If fetcher is not given, URLFetcher() is used.
+    offline : bool
+        If True, accessions missing in the cache raise KeyError instead of
+        being downloaded.
+    """
+
+    def __init__(self, directory: Optional[str] = None, ttl: Optional[float] = None, max_bytes: Optional[int] = None, fetcher: Optional[Callable] = None, offline: bool = False) -> None:
+        if directory is None:
+            directory = os.environ.get("PYCIRCOS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pycircos"))
+        self.directory: str = directory
+        self.ttl: Optional[float] = ttl
+        self.max_bytes: Optional[int] = max_bytes
+        self.fetcher: Callable = URLFetcher() if fetcher is None else fetcher
+        self.offline: bool = offline
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _ref_path(self, accession: str) -> str:
+        return os.path.join(self.directory, "refs", accession.upper())
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest + ".gbk")
+
+    def _lookup(self, accession: str) -> Optional[str]:
+        ref_path = self._ref_path(accession)
+        try:
+            with open(ref_path) as ref:
+                digest = ref.read().strip()
+            fetched = os.path.getmtime(ref_path)
+        except OSError:
+            return None
+
+        if self.ttl is not None and is_pinned(accession) == False and time.time() - fetched > self.ttl:
+            return None
+
+        path = self._object_path(digest)
+        try:
+            os.utime(path, (time.time(), os.path.getmtime(path)))
+        except OSError:
+            return None
+        return path
+
+    def _store(self, accession: str, write: Callable) -> str:
+        import tempfile
+        os.makedirs(os.path.join(self.directory, "refs"), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                writer = _HashingWriter(out)
+                write(writer)
+            digest = writer.sha256.hexdigest()
+            path = self._object_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        fd, tmp_ref = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as ref:
+            ref.write(digest)
+        os.replace(tmp_ref, self._ref_path(accession))
+        self.evict(keep=path)
+        return path
+
+    def get(self, accession: str, fetcher: Optional[Callable] = None) -> str:
+        """Function that returns the path of the cached GenBank file of the accession
+
+        The file is downloaded with fetcher, or the fetcher of the cache if
+        fetcher is not given, if it is not cached or has expired.
+        """
+        if is_accession(accession) == False:
+            raise ValueError("Incorrect value for NCBI accession number.")
+
+        with self._lock:
+            lock = self._locks.setdefault(accession.upper(), threading.Lock())
+
+        with lock:
+            path = self._lookup(accession)
+            if path is not None:
+                return path
+            if self.offline == True:
+                raise KeyError("{} is not in the cache {}".format(accession, self.directory))
+            fetcher = self.fetcher if fetcher is None else fetcher
+            return self._store(accession, lambda out: fetcher(accession, out))
+
+    def add(self, accession: str, path: str) -> str:
+        """Function that puts a local GenBank file into the cache as the accession"""
+        if is_accession(accession) == False:
+            raise ValueError("Incorrect value for NCBI accession number.")
+        with open(path, "rb") as source:
+            return self._store(accession, lambda out: shutil.copyfileobj(source, out))
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Function that removes the least recently used files beyond max_bytes
+
+        Only the GenBank objects count towards max_bytes. Side files written
+        next to an object, such as the feature table of FeatureTable.cached(),
+        are removed with their object, or when their object is gone.
+        """
+        if self.max_bytes is None:
+            return
+
+        entries = []
+        for root, dirs, files in os.walk(os.path.join(self.directory, "objects")):
+            objects = set(name for name in files if name.endswith(".gbk"))
+            sides = {}
+            for name in files:
+                if name in objects:
+                    continue
+                owner = name.split(".", 1)[0] + ".gbk"
+                if owner in objects:
+                    sides.setdefault(owner, []).append(os.path.join(root, name))
+                else:
+                    _remove(os.path.join(root, name))
+            for name in objects:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path, sides.get(name, [])))
+
+        total = sum(entry[1] for entry in entries)
+        for atime, size, path, side_paths in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            if _remove(path) == False:
+                continue
+            for side_path in side_paths:
+                _remove(side_path)
+            total -= size
+
+    def clear(self) -> None:
+        """Function that removes all cached files"""
+        for name in ("refs", "objects"):
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+
+_default_cache: Optional[AccessionCache] = None
+
+
+def default_cache() -> AccessionCache:
+    """Function that returns the cache used by Garc for accession numbers"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AccessionCache()
+    return _default_cache
+
+
+def set_default_cache(cache: Optional[AccessionCache]) -> None:
+    """Function that replaces the cache used by Garc for accession numbers"""
+    global _default_cache
+    _default_cache = cache
+
+
+def read_genbank(accession: str, cache=None, fetcher: Optional[Callable] = None):
+    """Function that returns the Bio.SeqRecord of the accession
+
+    Parameters
+    __________
+    accession : str
+        NCBI accession number, optionally with a version.
+    cache : AccessionCache or bool, optional
+        Cache used for the download. If cache is not given, default_cache() is
+        used. If cache is False, the file is downloaded into a temporary file
+        without caching.
+    fetcher : callable, optional
+        fetcher(accession, out) writes the GenBank flat file into the binary
+        file object out. If fetcher is not given, the fetcher of the cache is
+        used, or without caching the fetcher of the default cache if one was
+        set with set_default_cache(), and URLFetcher() otherwise.
+
+    Returns
+    _______
+    Bio.SeqRecord
+    """
+    from Bio import SeqIO
+    if is_accession(accession) == False:
+        raise ValueError("Incorrect value for NCBI accession number.")
+
+    if cache is False:
+        import tempfile
+        if fetcher is None:
+            fetcher = URLFetcher() if _default_cache is None else _default_cache.fetcher
+        with tempfile.TemporaryFile() as o:
+            fetcher(accession, o)
+            o.seek(0)
+            return SeqIO.read(io.TextIOWrapper(o), "genbank")
+
+    if cache is None:
+        cache = default_cache()
+    return SeqIO.read(cache.get(accession, fetcher), "genbank")
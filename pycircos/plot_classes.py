@@ -1,163 +1,1106 @@
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib import cm
+from matplotlib.figure import Figure
 import matplotlib.path as mpath
 import matplotlib.patches as mpatches
+import matplotlib.collections as mcollections
+import matplotlib.colors as mcolors
+import matplotlib.lines as mlines
+import matplotlib.text as mtext
+import matplotlib.image as mimage
+from matplotlib.transforms import Affine2D, Bbox
 from typing import List, Dict, Tuple, Optional
 import numpy as np
 import math
+import bisect
+import io
+import threading
+import functools
+
+from . import lod
+from .profiling import profiled
+from .intervals import IntervalIndex
+from .features import FeatureTable
+from .registry import ArcRegistry
+
+
+# Fonts of the labels of pycircos, the first installed one is used. The
+# style is set on the artists and the savefig options are passed to savefig,
+# so the rcParams of the process are never changed.
+FONT_FAMILIES: List[str] = ["Arial","Lucida Sans","DejaVu Sans","Lucida Grande","Verdana"]
+FONT_SIZE: float = 10.0
+
+# Embed TrueType (Type 42) fonts in PDF and PostScript files, so the text can
+# be edited. The backends only read these from rcParams.
+FONTTYPE_PARAMS: Dict = {"ps.fonttype": 42, "pdf.fonttype": 42}
+VECTOR_FORMATS: Tuple[str, ...] = ("pdf", "ps", "eps")
+SAVEFIG_OPTIONS: Dict = {"transparent": False, "facecolor": "auto", "edgecolor": "auto"}
+_rc_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _font_family() -> str:
+    """Function that returns the first installed font of FONT_FAMILIES"""
+    from matplotlib import font_manager
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    for family in FONT_FAMILIES:
+        if family in installed:
+            return family
+    return "sans-serif"
+
+
+# Formats written from one Agg draw by Gcircle.save().
+RASTER_FORMATS: Tuple[str, ...] = ("png", "jpg", "jpeg", "tif", "tiff", "webp")
+
+# (key, RendererAgg) of the last draw of each thread with reuse_canvas=True.
+_renderers = threading.local()
+
+
+def _colormap(name: str):
+    """Function that returns the registered colormap of name
+
+    matplotlib.colormaps is new in matplotlib 3.5 and cm.get_cmap() was
+    removed in 3.9, so the registry is used where it exists.
+    """
+    if hasattr(matplotlib, "colormaps"):
+        return matplotlib.colormaps[name]
+    return cm.get_cmap(name)
+
+
+def _sector_verts(theta: np.ndarray, width: np.ndarray, bottom: np.ndarray, top: np.ndarray, step: float = np.pi / 180) -> np.ndarray:
+    """Function that returns polygon vertices of annular sectors in (theta, r)
+
+    The outer and inner edges are divided into the same number of segments so
+    that the widest sector has no segment longer than step radians.
+
+    Returns
+    _______
+    numpy.ndarray
+        Array of the shape (n, vertices, 2).
+    """
+    n = len(theta)
+    steps = 1
+    if n > 0:
+        steps = int(np.clip(np.ceil(np.max(np.abs(width)) / step), 1, 100))
+    t = np.linspace(0.0, 1.0, steps + 1)
+    edge = theta[:, None] + width[:, None] * t[None, :]
+    verts = np.empty((n, 2 * (steps + 1), 2), dtype=np.float64)
+    verts[:, :steps + 1, 0] = edge
+    verts[:, steps + 1:, 0] = edge[:, ::-1]
+    verts[:, :steps + 1, 1] = np.broadcast_to(top, (n,))[:, None]
+    verts[:, steps + 1:, 1] = np.broadcast_to(bottom, (n,))[:, None]
+    return verts
+
+
+def _default_rlim(data: np.ndarray) -> Tuple[float, float]:
+    """Function that returns the default rlim which leaves a 5% margin around the data"""
+    min_value = np.nanmin(data)
+    max_value = np.nanmax(data)
+    if min_value == max_value:
+        return (min_value, max_value)
+    return (min_value - 0.05 * abs(min_value), max_value + 0.05 * abs(max_value))
+
+
+def _link_verts(sstart: np.ndarray, send: np.ndarray, stop: np.ndarray, ostart: np.ndarray, oend: np.ndarray, etop: np.ndarray) -> np.ndarray:
+    """Function that returns the Bezier vertices of links in (theta, r)
+
+    Each link is a MOVETO and eight CURVE3 vertices, which run from the first
+    end through the center to the second end and back.
+
+    Returns
+    _______
+    numpy.ndarray
+        Array of the shape (n, 9, 2).
+    """
+    z1 = stop - stop * np.cos(np.abs((send - sstart) * 0.5))
+    z2 = etop - etop * np.cos(np.abs((oend - ostart) * 0.5))
+    center = np.zeros(len(sstart))
+    verts = np.empty((len(sstart), 9, 2), dtype=np.float64)
+    verts[:, :, 0] = np.column_stack((sstart, sstart, oend, (ostart + oend) * 0.5, ostart, ostart, send, (sstart + send) * 0.5, sstart))
+    verts[:, :, 1] = np.column_stack((stop, center, etop, etop + z2, etop, center, stop, stop + z1, stop))
+    return verts
+
+
+_LINK_CODES: np.ndarray = np.array([mpath.Path.MOVETO] + [mpath.Path.CURVE3] * 8, dtype=mpath.Path.code_type)
 
 
 class Gcircle:
     colors: List[str] = ["#f44336","#e91e63","#9c27b0","#673ab7","#3f51b5","#2196f3","#00bcd4","#009688","#4caf50","#8bc34a","#cddc39","#ffeb3b","#ffc107","#ff9800","#ff5722","#795548","#9e9e9e","#607d8b"]
     #colors = ["#4E79A7","#F2BE2B","#E15759","#76B7B2","#59A14F","#EDC948","#B07AA1","#FF9DA7","#9C755F","#BAB0AC"]
-    cmaps: List  = [plt.cm.Reds, plt.cm.Blues, plt.cm.Greens, plt.cm.Greys]  
+    cmaps: List  = [cm.Reds, cm.Blues, cm.Greens, cm.Greys]  
+    rasterize_threshold: int = 1000
+    other_color: str = "#bdbdbd"
     
     def __getattr__(self, name):
         if name == "garc_dict":
             return self._garc_dict
+        raise AttributeError("{!r} object has no attribute {!r}".format(type(self).__name__, name))
     
-    def __init__(self, figsize: Tuple[int, int] =(8,8), cmap: plt.cm =plt.cm.Reds) -> None:
+    def __init__(self, figsize: Tuple[int, int] =(8,8), cmap=cm.Reds, lod: bool = True, lod_dpi: int = 600, use_pyplot: bool = True, min_arc_pixels: Optional[float] = None, small_arcs: str = "merge") -> None:
+        if small_arcs not in ("merge", "hide"):
+            raise ValueError("small_arcs should be 'merge' or 'hide', not {!r}".format(small_arcs))
         self._garc_dict: Dict = {} 
+        self._arcs: ArcRegistry = ArcRegistry()
         self.figsize: Tuple[int, int]  = figsize
-        self.figure: plt.Figure  = plt.figure(figsize=figsize)
+        self.use_pyplot: bool = use_pyplot
+        self._figure: Optional[Figure] = None
+        self.ax = None
         self.color_cycle: int = 0 
+        self.cmap_cycle: int = 0 
+        self.lod: bool = lod
+        self.lod_dpi: int = lod_dpi
+        self.lod_report: List[Dict] = []
+        self.min_arc_pixels: Optional[float] = min_arc_pixels
+        self.small_arcs: str = small_arcs
+        self.arc_report: Dict = {}
+        self._arc_lookup: Optional[Dict[str, int]] = None
+        self._arc_offsets: Optional[np.ndarray] = None
+        self._arc_scales: Optional[np.ndarray] = None
+        self._arc_transforms: Dict[str, Affine2D] = {}
+        self._arc_artists: Dict[str, Tuple] = {}
+        self._arc_collection: Optional[mcollections.PolyCollection] = None
+        self._arc_labels: List[mtext.Text] = []
+        self._links: List[Tuple] = []
+        self._dirty_arcs: set = set()
+        self._layout_dirty: bool = True
+
+    def __enter__(self) -> "Gcircle":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def figure(self) -> Figure:
+        """Figure of the circular map, which is created on the first access
+
+        If use_pyplot is False, the figure is a plain matplotlib.figure.Figure
+        with an Agg canvas that is not registered in pyplot.
+        """
+        if self._figure is None:
+            if self.use_pyplot == True:
+                import matplotlib.pyplot as plt
+                self._figure = plt.figure(figsize=self.figsize)
+            else:
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                self._figure = Figure(figsize=self.figsize)
+                FigureCanvasAgg(self._figure)
+        return self._figure
+
+    def close(self) -> None:
+        """Function that releases the figure and the axes
+
+        The figure is created again by the next set_garcs().
+        """
+        if self._figure is not None and self.use_pyplot == True:
+            import matplotlib.pyplot as plt
+            plt.close(self._figure)
+        self._figure = None
+        self.ax = None
+        self._arc_transforms = {}
+        self._arc_artists = {}
+        self._arc_collection = None
+        self._arc_labels = []
+        self._links = []
+        self._layout_dirty = True
 
     def add_garc(self, garc) -> None:
         """Function that adds the Garc object ot the _garc_dict dictionary for the specific id"""
         self._garc_dict[garc.arc_id] = garc
+        self._arcs.set(garc.arc_id, garc.size, garc.interspace, garc.raxis_range)
+        garc._parental_gcircle = self
+        self._dirty_arcs.add(garc.arc_id)
+        self._layout_dirty = True
+
+    def _mark_dirty(self, garc_id: str, layout: bool) -> None:
+        """Function that is called by a Garc object when one of its drawn attributes is changed"""
+        if garc_id in self._garc_dict:
+            garc = self._garc_dict[garc_id]
+            self._arcs.set(garc_id, garc.size, garc.interspace, garc.raxis_range)
+            self._dirty_arcs.add(garc_id)
+            self._layout_dirty = self._layout_dirty or layout
+
+    def _set_coordinates(self) -> List[str]:
+        """Function that will set the coordinates of the Garc objects in the arc registry
 
-    def _determine_sum_length(self) -> int:
-        """Function to determine the total length of all the sizes for all the categories
         Returns
         _______
-        int
-            returns the sum 
+        list of str
+            Ids of the Garc objects whose coordinates have changed.
         """
-        
-        return sum(list(map(lambda x:  self._garc_dict[x]["size"], list(self._garc_dict.keys()))))
 
-    def _determine_sum_interspace(self) -> int:
-        """Function to determine the total sum of all the interspaces between the blocks of all the sizes for all the categories
+        changed = self._arcs.layout()
+        self._arc_lookup  = self._arcs.lookup
+        self._arc_offsets = self._arcs.start.copy()
+        self._arc_scales  = (self._arcs.end - self._arcs.start) / (self._arcs.size - 1)
+        return [self._arcs.ids[i] for i in changed.tolist()]
+
+    def _arc_span(self, garc_id: str) -> Optional[List[float]]:
+        """Function that returns the [start, end] angles of an arc, or None if it was not placed yet"""
+
+        i = self._arcs.lookup.get(garc_id)
+        if i is None or np.isnan(self._arcs.start[i]):
+            return None
+        return [float(self._arcs.start[i]), float(self._arcs.end[i])]
+
+    def _arc_index(self, garc_ids) -> np.ndarray:
+        """Function that converts Garc ids into indices of the transform arrays"""
+
+        if self._arc_lookup is None:
+            raise ValueError("set_garcs() should be called before converting positions")
+        if np.ndim(garc_ids) == 0:
+            return np.array(self._arc_lookup[garc_ids])
+        keys, inverse = np.unique(np.asarray(garc_ids), return_inverse=True)
+        return np.array([self._arc_lookup[key] for key in keys.tolist()], dtype=np.int64)[inverse.reshape(-1)].reshape(np.shape(garc_ids))
+
+    def to_theta(self, garc_ids, positions) -> np.ndarray:
+        """Function that converts positions on Garc objects into angles
+
+        Parameters
+        __________
+        garc_ids : str or array-like
+            ID of the Garc object, or one ID per position.
+        positions : float or array-like
+            Positions from 0 to size-1 of the Garc objects.
+
         Returns
         _______
-        int
-            returns the sum 
+        numpy.ndarray
+            Angles in radians.
         """
-        
-        return sum(list(map(lambda x:  self._garc_dict[x]["interspace"], list(self._garc_dict.keys()))))
+        index = self._arc_index(garc_ids)
+        return self._arc_offsets[index] + self._arc_scales[index] * np.asarray(positions, dtype=np.float64)
 
-    def _set_coordinates(self, start: float, end: float, sum_length: int, sum_interspace: float) -> None:
-        """Function that will set the coordinates for the specific key"""
+    def to_radius(self, values, rlim: Tuple[float, float], raxis_range: Tuple[float, float]) -> np.ndarray:
+        """Function that converts data values into radial positions
 
-        s: int = 0
-        sum_interspace: int = 0 
-        
-        for key in self._garc_dict.keys():
-            size: int = self._garc_dict[key].size
-            self._garc_dict[key].coordinates = [None, None]
+        Parameters
+        __________
+        values : float or array-like
+            Data values.
+        rlim : tuple
+            (bottom, top) data values mapped to the ends of raxis_range. If the
+            two values are the same, every value is mapped to the top.
+        raxis_range : tuple
+            (bottom, top) radial range.
 
-            # next two lines give the total length of the interspace for the specific key
+        Returns
+        _______
+        numpy.ndarray
+            Radial positions.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        bottom, top = raxis_range
+        if rlim[1] == rlim[0]:
+            return np.full(values.shape, top, dtype=np.float64)
+        return bottom + (values - rlim[0]) * ((top - bottom) / (rlim[1] - rlim[0]))
 
-            self._garc_dict[key].coordinates[1] = sum_interspace + start + ((end-start) * (s+size)/sum_length)
-            
-            s = s + size
+    def transform(self, garc_ids, positions, values=None, rlim: Optional[Tuple[float, float]] = None, raxis_range: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Function that converts (Garc id, position, value) data into polar coordinates
 
-            sum_interspace += self._garc_dict[key].interspace
+        Returns
+        _______
+        tuple
+            (theta, r) arrays. r is None if values is not given.
+        """
+        theta = self.to_theta(garc_ids, positions)
+        if values is None:
+            return theta, None
+        return theta, self.to_radius(values, rlim, raxis_range)
 
     def _set_init_params(self) -> None:
         """Function to just set initial parameters for the plot"""
 
-        self.figure = plt.figure(figsize=self.figsize)
-        self.ax  = plt.subplot(111, polar=True)
+        self.ax = self.figure.add_subplot(111, polar=True)
         self.ax.set_theta_zero_location("N")
         self.ax.set_theta_direction(-1)
+        self.ax.set_xlim(0, 2 * np.pi)
         self.ax.set_ylim(0,1000)
+        self.ax.set_autoscale_on(False)
         self.ax.spines['polar'].set_visible(False)
         self.ax.xaxis.set_ticks([])
         self.ax.xaxis.set_ticklabels([])
         self.ax.yaxis.set_ticks([])
         self.ax.yaxis.set_ticklabels([]) 
 
+    def _to_local(self, garc_id: str, theta) -> np.ndarray:
+        """Function that converts angles into positions on the Garc object, the inverse of to_theta()"""
+        i = self._arc_lookup[garc_id]
+        return (np.asarray(theta, dtype=np.float64) - self._arc_offsets[i]) / self._arc_scales[i]
+
+    def _track_transform(self, garc_id: str):
+        """Function that returns the transform of artists drawn in positions on the Garc object
+
+        The transform is the Affine2D of the arc, which maps positions to
+        angles, followed by ax.transData. set_garcs() only updates the Affine2D
+        when the arc moves, so the tracks follow it without being redrawn.
+        """
+        if garc_id not in self._arc_transforms:
+            self._set_arc_transform(garc_id)
+        return self._arc_transforms[garc_id] + self.ax.transData
+
+    def _set_arc_transform(self, garc_id: str) -> None:
+        """Function that creates or updates the Affine2D of an arc from its offset and scale"""
+
+        i = self._arc_lookup[garc_id]
+        if garc_id not in self._arc_transforms:
+            self._arc_transforms[garc_id] = Affine2D()
+        self._arc_transforms[garc_id].clear().scale(self._arc_scales[i], 1.0).translate(self._arc_offsets[i], 0.0)
+
+    def _update_arc(self, garc_id: str) -> None:
+        """Function that creates or updates the transform, the rectangle and the label of an arc"""
+
+        garc  = self._garc_dict[garc_id]
+        i     = self._arc_lookup[garc_id]
+        self._set_arc_transform(garc_id)
+
+        start, end = self._arcs.start[i], self._arcs.end[i]
+        pos: float = start
+        width: float = end - start
+        height: float = abs(self._arcs.raxis_range[i, 1] - self._arcs.raxis_range[i, 0])
+        bottom: float = self._arcs.raxis_range[i, 0]
+        if garc_id not in self._arc_artists:
+            bar = self.ax.bar([0], [height], bottom=bottom, width=garc.size - 1, align="edge", transform=self._track_transform(garc_id))[0]
+            text = self.ax.text(0, 0, "", ha="center", va="center", fontfamily=_font_family())
+            self._arc_artists[garc_id] = (bar, text)
+        bar, text = self._arc_artists[garc_id]
+        bar.set_y(bottom)
+        bar.set_height(height)
+        bar.set_width(garc.size - 1)
+        bar.set_facecolor(garc.facecolor)
+        bar.set_edgecolor(garc.edgecolor)
+        bar.set_linewidth(garc.linewidth)
+
+        rot = (start + end) / 2
+        rot = rot*360/(2*np.pi)
+        if 90 < rot < 270:
+            rot = 180-rot
+        else:
+            rot = -1 * rot 
+        text.set_position((pos + width/2, bottom + height/2 + garc.labelposition))
+        text.set_rotation(rot)
+        text.set_text(garc.label)
+        text.set_fontsize(garc.labelsize)
+        text.set_visible(garc.label_visible == True)
+
+    def _pixels_per_unit(self) -> float:
+        """Function that returns the number of pixels of one radial unit at lod_dpi"""
+
+        bbox = self.ax.get_position()
+        return 0.5 * min(bbox.width * self.figsize[0], bbox.height * self.figsize[1]) * self.lod_dpi / self.ax.get_ylim()[1]
+
+    def _compact_arcs(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Function that merges or hides the arcs narrower than min_arc_pixels
+
+        With small_arcs="merge", a run of consecutive small arcs is drawn as
+        one "other" sector from the start of its first arc to the end of its
+        last arc, so the other arcs and the tracks keep their positions. With
+        small_arcs="hide", the small arcs are not drawn.
+
+        Returns
+        _______
+        tuple
+            (first, last, merged) arrays with the first and the last rows of
+            the arcs of each sector to be drawn, and whether it is merged.
+        """
+        arcs  = self._arcs
+        small = (arcs.end - arcs.start) * arcs.raxis_range.max(axis=1) * self._pixels_per_unit() < self.min_arc_pixels
+        keep  = np.flatnonzero(~small)
+        self.arc_report = {"arcs": len(arcs), "drawn": len(keep), "merged": 0, "hidden": 0}
+        if self.small_arcs == "hide":
+            self.arc_report["hidden"] = int(small.sum())
+            return keep, keep, np.zeros(len(keep), dtype=bool)
+
+        # rows where the runs of small arcs begin and end
+        edges     = np.diff(np.concatenate(([0], small.astype(np.int8), [0])))
+        run_start = np.flatnonzero(edges == 1)
+        run_end   = np.flatnonzero(edges == -1) - 1
+        first     = np.concatenate((keep, run_start))
+        order     = np.argsort(first, kind="stable")
+        self.arc_report["drawn"]  = len(first)
+        self.arc_report["merged"] = int(small.sum())
+        return first[order], np.concatenate((keep, run_end))[order], np.concatenate((np.zeros(len(keep), dtype=bool), np.ones(len(run_start), dtype=bool)))[order]
+
+    def _cull_labels(self, theta: np.ndarray, width: np.ndarray, radius: np.ndarray, labels: List[str], sizes: np.ndarray) -> np.ndarray:
+        """Function that selects the labels which can be drawn without overlapping
+
+        The extent of each label along the circle is estimated from the number
+        of its characters and its font size. The labels are taken from the
+        widest sector to the narrowest one, and a label is kept if its
+        angular extent does not overlap a label kept before.
+
+        Returns
+        _______
+        numpy.ndarray
+            Indices of the kept labels.
+        """
+        if len(labels) == 0:
+            return np.zeros(0, dtype=np.int64)
+        chars  = np.fromiter((len(str(label)) for label in labels), dtype=np.float64, count=len(labels))
+        # about 0.7 em per character with the spacing, font sizes in points
+        extent = chars * sizes * 0.7 * self.lod_dpi / 72 / np.maximum(radius * self._pixels_per_unit(), 1e-9)
+        lower  = theta + width / 2 - extent / 2
+        upper  = theta + width / 2 + extent / 2
+
+        kept_lower: List[float] = []
+        kept_upper: List[float] = []
+        kept = []
+        for i in np.argsort(-width, kind="stable").tolist():
+            j = bisect.bisect_left(kept_lower, lower[i])
+            if j > 0 and kept_upper[j - 1] > lower[i]:
+                continue
+            if j < len(kept_lower) and kept_lower[j] < upper[i]:
+                continue
+            kept_lower.insert(j, lower[i])
+            kept_upper.insert(j, upper[i])
+            kept.append(i)
+        return np.sort(np.array(kept, dtype=np.int64))
+
+    def _draw_compact_arcs(self) -> None:
+        """Function that draws the arcs as one collection with culled labels"""
+
+        first, last, merged = self._compact_arcs()
+        garcs  = [self._garc_dict[self._arcs.ids[i]] for i in first.tolist()]
+        starts = self._arcs.start[first]
+        widths = self._arcs.end[last] - starts
+        raxis  = self._arcs.raxis_range
+        bottom = np.minimum.reduceat(raxis[:, 0], first) if len(first) > 0 else np.zeros(0)
+        top    = np.maximum.reduceat(raxis[:, 1], first) if len(first) > 0 else np.zeros(0)
+        verts  = _sector_verts(starts, widths, bottom, top)
+        if self._arc_collection is None:
+            self._arc_collection = mcollections.PolyCollection(verts, transform=self.ax.transData)
+            self.ax.add_collection(self._arc_collection, autolim=False)
+        else:
+            self._arc_collection.set_verts(verts)
+        self._arc_collection.set_facecolor([self.other_color if other else garc.facecolor for garc, other in zip(garcs, merged.tolist())])
+        self._arc_collection.set_edgecolor([garc.edgecolor for garc in garcs])
+        self._arc_collection.set_linewidth([garc.linewidth for garc in garcs])
+
+        for text in self._arc_labels:
+            text.remove()
+        self._arc_labels = []
+
+        # a merged sector is labeled if one of its arcs is
+        visible = np.fromiter((self._garc_dict[key].label_visible == True for key in self._arcs.ids), dtype=bool, count=len(self._arcs))
+        counts  = np.concatenate(([0], np.cumsum(visible)))
+        rows    = np.flatnonzero(counts[last + 1] > counts[first])
+        labels  = ["other ({})".format(last[i] - first[i] + 1) if merged[i] else garcs[i].label for i in rows.tolist()]
+        sizes   = np.array([garcs[i].labelsize for i in rows.tolist()], dtype=np.float64)
+        radius  = (bottom[rows] + top[rows]) / 2 + np.array([garcs[i].labelposition for i in rows.tolist()], dtype=np.float64)
+        kept    = self._cull_labels(starts[rows], widths[rows], radius, labels, sizes)
+        for j in kept.tolist():
+            i   = rows[j]
+            rot = (starts[i] + widths[i] / 2) * 360 / (2 * np.pi)
+            rot = 180 - rot if 90 < rot < 270 else -1 * rot
+            self._arc_labels.append(self.ax.text(starts[i] + widths[i] / 2, radius[j], labels[j], ha="center", va="center", rotation=rot, fontsize=sizes[j], fontfamily=_font_family()))
+        self.arc_report["labels"] = len(kept)
+
+    def _update_links(self, garc_ids: List[str]) -> None:
+        """Function that recomputes the vertices of the links touching the Garc objects"""
+
+        if len(self._links) == 0 or len(garc_ids) == 0:
+            return
+        for artist, links in self._links:
+            moved = np.flatnonzero(np.isin(links["arc1"], garc_ids) | np.isin(links["arc2"], garc_ids))
+            if len(moved) == 0:
+                continue
+            verts = _link_verts(self.to_theta(links["arc1"][moved], links["start1"][moved]), self.to_theta(links["arc1"][moved], links["end1"][moved]), links["r1"][moved],
+                                self.to_theta(links["arc2"][moved], links["start2"][moved]), self.to_theta(links["arc2"][moved], links["end2"][moved]), links["r2"][moved])
+            if isinstance(artist, mpatches.PathPatch):
+                artist.set_path(mpath.Path(verts[0], _LINK_CODES))
+                continue
+            paths = artist.get_paths()
+            for j, i in enumerate(moved):
+                paths[i] = mpath.Path(verts[j], _LINK_CODES)
+            artist.set_paths(paths)
+
+    @profiled("set_garcs")
     def set_garcs(self) -> None:
+        """Function that places the Garc objects on the circular map
 
-        sum_length: int  = self._determine_sum_length()
-        
-        sum_interspace: float = self._determine_sum_interspace()
-
-        start: float = 0.0 
-
-        # This value is taking the total cirle in terms of radians (2*pi) and subtracting all of the interspace values
-        end: float = 2 * np.pi - sum_interspace
-
-        self._set_coordinates(start, end, sum_length, sum_interspace)
-
-        self._set_init_params()
-                
-        for key, value in self._garc_dict.items():
-
-            pos: float = value.coordinates[0] 
-            width: float = value.coordinates[-1] - value.coordinates[0]
-            height: int = abs(value.raxis_range[1] - value.raxis_range[0])
-            bottom: int = value.raxis_range[0]
-            facecolor: Optional[str] = value.facecolor
-            edgecolor: Optional[str] = value.edgecolor
-            linewidth: float = value.linewidth
-            #print(key, pos, pos+width) 
-            self.ax.bar([pos], [height], bottom=bottom, width=width, facecolor=facecolor, linewidth=linewidth, edgecolor=edgecolor, align="edge")
-
-            if self._garc_dict[key].label_visible == True:
-                rot = (self._garc_dict[key].coordinates[0] + self._garc_dict[key].coordinates[1]) / 2
-                rot = rot*360/(2*np.pi)
-                if 90 < rot < 270:
-                    rot = 180-rot
-                else:
-                    rot = -1 * rot 
-                height = bottom + height/2 + self._garc_dict[key].labelposition
-                self.ax.text(pos + width/2, height, self._garc_dict[key].label, rotation=rot, ha="center", va="center", fontsize=self._garc_dict[key].labelsize)
+        The first call creates the axes and the arcs. Later calls only update
+        what has changed since the previous call: the coordinates are computed
+        again if an arc was added or the size or interspace of an arc was
+        changed, and only the arcs that moved or whose drawn attributes were
+        changed are updated. Tracks follow their arcs through the transforms
+        of the arcs, and only the links touching moved arcs are recomputed.
+
+        If min_arc_pixels is given, the arcs are drawn as one collection, arcs
+        narrower than min_arc_pixels at lod_dpi are merged or hidden as set by
+        small_arcs, and overlapping labels are dropped before their text
+        artists are created. The counts are stored in arc_report.
+        """
+
+        first = self.ax is None
+        if first == True:
+            self._set_init_params()
+        elif self._layout_dirty == False and len(self._dirty_arcs) == 0:
+            return
+
+        moved = []
+        if self._layout_dirty == True:
+            moved = self._set_coordinates()
+            if first == True:
+                moved = list(self._arcs.ids)
+
+        if self.min_arc_pixels is None:
+            for key in set(moved) | (self._dirty_arcs & set(self._garc_dict.keys())):
+                self._update_arc(key)
+        else:
+            for key in moved:
+                if key in self._arc_transforms:
+                    self._set_arc_transform(key)
+            self._draw_compact_arcs()
+        self._update_links(moved)
+        self._layout_dirty = False
+        self._dirty_arcs = set()
     
     def setspine(self, garc_id, raxis_range=None, facecolor="#30303000", edgecolor="#303030", linewidth=0.75):
-        pos     = self._garc_dict[garc_id].coordinates[0] 
-        width   = self._garc_dict[garc_id].coordinates[-1] - self._garc_dict[garc_id].coordinates[0]
+        width   = self._garc_dict[garc_id].size - 1
         height  = abs(raxis_range[1] - raxis_range[0])
         bottom  = raxis_range[0]
-        self.ax.bar([pos], [height], bottom=bottom, width=width, facecolor=facecolor, linewidth=linewidth, edgecolor=edgecolor, align="edge", zorder=0)
+        self.ax.bar([0], [height], bottom=bottom, width=width, facecolor=facecolor, linewidth=linewidth, edgecolor=edgecolor, align="edge", zorder=0, transform=self._track_transform(garc_id))
 
-    def save(self, file_name="test", format="png", dpi=None) -> None:
+    def _track_positions(self, garc_id: str, data: np.ndarray, positions) -> np.ndarray:
+        """Function that converts positions of a track into angles
 
+        If positions is not given, the data points are placed at even
+        intervals from the start to the end of the arc.
+        """
+        if positions is None:
+            start, end = self._arc_span(garc_id)
+            return np.linspace(start, end, len(data), endpoint=True)
+        return self.to_theta(garc_id, positions)
+
+    def _track_widths(self, garc_id: str, theta: np.ndarray, width) -> np.ndarray:
+        """Function that converts widths of bars on the arc into angular widths"""
+        if width is None:
+            width = theta[1] - theta[0] if len(theta) > 1 else self._arc_scales[self._arc_index(garc_id)] * (self._garc_dict[garc_id].size - 1)
+            return np.full(len(theta), width, dtype=np.float64)
+        scale = self._arc_scales[self._arc_index(garc_id)]
+        return np.broadcast_to(scale * np.asarray(width, dtype=np.float64), theta.shape)
+
+    def _lod_pixels(self, garc_id: str, raxis_range: Tuple[float, float]) -> Optional[Tuple[int, int]]:
+        """Function that returns the pixel budget of a track for the level-of-detail reduction
+
+        The budget is computed from figsize, lod_dpi and the arc width as
+        (pixels along the outer edge of the track, pixels across the track).
+        None is returned if lod is False.
+        """
+        if self.lod == False:
+            return None
+        scale     = self._pixels_per_unit()
+        start, end = self._arc_span(garc_id)
+        width     = end - start
+        n_theta   = int(np.ceil(width * scale * max(raxis_range)))
+        n_r       = int(np.ceil(scale * abs(raxis_range[1] - raxis_range[0])))
+        return max(1, n_theta), max(1, n_r)
+
+    def _record_lod(self, track: str, garc_id: str, points: int, drawn: int) -> None:
+        self.lod_report.append({"track": track, "garc_id": garc_id, "points": int(points), "drawn": int(drawn), "dropped": int(points - drawn)})
+
+    def _next_color(self) -> str:
+        color = Gcircle.colors[self.color_cycle % len(Gcircle.colors)]
+        self.color_cycle += 1
+        return color
+
+    def _next_cmap(self):
+        cmap = Gcircle.cmaps[self.cmap_cycle % len(Gcircle.cmaps)]
+        self.cmap_cycle += 1
+        return cmap
+
+    @profiled("lineplot", track=True)
+    def lineplot(self, garc_id: str, data, positions=None, raxis_range: Tuple[float, float] = (550, 600), rlim: Optional[Tuple[float, float]] = None, linestyle: str = "solid", linecolor=None, linewidth: float = 1.0, spine: bool = False):
+        """Function that plots a line in the sector of the Garc object
+
+        Values outside rlim are masked, which breaks the line at them.
+
+        Returns
+        _______
+        matplotlib.lines.Line2D
+        """
+        data  = np.asarray(data, dtype=np.float64)
+        theta = self._track_positions(garc_id, data, positions)
+        if rlim is None:
+            rlim = _default_rlim(data)
+        if linecolor is None:
+            linecolor = self._next_color()
+
+        values = np.ma.masked_invalid(np.ma.masked_outside(data, rlim[0], rlim[1]))
+        pixels = self._lod_pixels(garc_id, raxis_range)
+        if pixels is not None and len(data) > 2 * pixels[0]:
+            coordinates = self._arc_span(garc_id)
+            theta, values = lod.envelope(theta, values, coordinates[0], coordinates[-1], pixels[0])
+        self._record_lod("lineplot", garc_id, len(data), len(theta))
+        r = np.ma.array(self.to_radius(values.filled(rlim[0]), rlim, raxis_range), mask=np.ma.getmaskarray(values))
+        line, = self.ax.plot(self._to_local(garc_id, theta), r, color=linecolor, linewidth=linewidth, linestyle=linestyle, transform=self._track_transform(garc_id))
+
+        if spine == True:
+            self.setspine(garc_id, raxis_range)
+        return line
+
+    @profiled("fillplot", track=True)
+    def fillplot(self, garc_id: str, data, positions=None, raxis_range: Tuple[float, float] = (550, 600), rlim: Optional[Tuple[float, float]] = None, base_value: Optional[float] = None, facecolor=None, edgecolor="#303030", linewidth: float = 0.0, spine: bool = False):
+        """Function that fills the area between the data and base_value in the sector of the Garc object
+
+        Values outside rlim are masked, which breaks the filled area at them.
+
+        Returns
+        _______
+        matplotlib.collections.PolyCollection
+        """
+        data  = np.asarray(data, dtype=np.float64)
+        theta = self._track_positions(garc_id, data, positions)
+        if rlim is None:
+            rlim = _default_rlim(data)
+        if base_value is None:
+            base_value = rlim[0]
+        if facecolor is None:
+            facecolor = self._next_color()
+
+        values = np.ma.masked_invalid(np.ma.masked_outside(data, rlim[0], rlim[1]))
+        pixels = self._lod_pixels(garc_id, raxis_range)
+        if pixels is not None and len(data) > 2 * pixels[0]:
+            coordinates = self._arc_span(garc_id)
+            theta, values = lod.envelope(theta, values, coordinates[0], coordinates[-1], pixels[0])
+        self._record_lod("fillplot", garc_id, len(data), len(theta))
+        mask = np.ma.getmaskarray(values)
+        r    = self.to_radius(values.filled(base_value), rlim, raxis_range)
+        base = self.to_radius(base_value, rlim, raxis_range)
+        collection = self.ax.fill_between(self._to_local(garc_id, theta), r, base, where=~mask, facecolor=facecolor, linewidth=linewidth, edgecolor=edgecolor, transform=self._track_transform(garc_id))
+
+        if spine == True:
+            self.setspine(garc_id, raxis_range)
+        return collection
+
+    @profiled("scatterplot", track=True)
+    def scatterplot(self, garc_id: str, data, positions=None, raxis_range: Tuple[float, float] = (550, 600), rlim: Optional[Tuple[float, float]] = None, markershape: str = "o", markersize=5, facecolor=None, edgecolor="#303030", linewidth: float = 0.0, spine: bool = False):
+        """Function that plots markers in the sector of the Garc object
+
+        Values outside rlim are not drawn.
+
+        Returns
+        _______
+        matplotlib.collections.PathCollection
+        """
+        data  = np.asarray(data, dtype=np.float64)
+        theta = self._track_positions(garc_id, data, positions)
+        if rlim is None:
+            rlim = _default_rlim(data)
+        if facecolor is None:
+            facecolor = self._next_color()
+
+        keep = np.flatnonzero((data >= rlim[0]) & (data <= rlim[1]))
+        r    = self.to_radius(data[keep], rlim, raxis_range)
+        pixels = self._lod_pixels(garc_id, raxis_range)
+        if pixels is not None and len(keep) > pixels[0]:
+            coordinates = self._arc_span(garc_id)
+            kept = lod.grid_sample(theta[keep], r, coordinates[0], coordinates[-1], pixels[0], raxis_range[0], raxis_range[1], pixels[1])
+            keep, r = keep[kept], r[kept]
+        self._record_lod("scatterplot", garc_id, len(data), len(keep))
+        if np.ndim(markersize) > 0:
+            markersize = np.asarray(markersize)[keep]
+        if not isinstance(facecolor, str) and np.ndim(facecolor) > 0 and len(facecolor) == len(data):
+            facecolor = np.asarray(facecolor)[keep]
+
+        collection = self.ax.scatter(self._to_local(garc_id, theta[keep]), r, c=facecolor, s=markersize, linewidth=linewidth, edgecolor=edgecolor, marker=markershape, transform=self._track_transform(garc_id))
+
+        if spine == True:
+            self.setspine(garc_id, raxis_range)
+        return collection
+
+    @profiled("barplot", track=True)
+    def barplot(self, garc_id: str, data, positions=None, width=None, raxis_range: Tuple[float, float] = (550, 600), rlim: Optional[Tuple[float, float]] = None, base_value: Optional[float] = None, facecolor=None, edgecolor="#303030", linewidth: float = 0.0, spine: bool = False):
+        """Function that plots bars in the sector of the Garc object
+
+        The bars start at positions and are drawn as one PolyCollection. Values
+        outside rlim are not drawn.
+
+        Returns
+        _______
+        matplotlib.collections.PolyCollection
+        """
+        data   = np.asarray(data, dtype=np.float64)
+        theta  = self._track_positions(garc_id, data, positions)
+        widths = self._track_widths(garc_id, theta, width)
+        if rlim is None:
+            rlim = _default_rlim(data)
+        if base_value is None:
+            base_value = rlim[0]
+        if facecolor is None:
+            facecolor = self._next_color()
+
+        keep = (data >= rlim[0]) & (data <= rlim[1])
+        if rlim[0] == rlim[1]:
+            bottom = np.full(len(data), raxis_range[0], dtype=np.float64)
+        else:
+            bottom = np.full(len(data), self.to_radius(base_value, rlim, raxis_range), dtype=np.float64)
+        top = self.to_radius(data, rlim, raxis_range)
+
+        facecolors = mcolors.to_rgba_array(facecolor)
+        keep = np.flatnonzero(keep)
+        theta, widths = theta[keep], widths[keep]
+        pixels = self._lod_pixels(garc_id, raxis_range)
+        if pixels is not None and len(keep) > pixels[0]:
+            coordinates = self._arc_span(garc_id)
+            order, starts, theta, widths = lod.bin_intervals(theta, widths, coordinates[0], coordinates[-1], pixels[0])
+            keep = keep[lod.group_argmax(np.abs(top - bottom)[keep], order, starts)]
+        self._record_lod("barplot", garc_id, len(data), len(keep))
+        if len(facecolors) == len(data) and len(data) > 1:
+            facecolors = facecolors[keep]
+        verts = _sector_verts(theta, widths, bottom[keep], top[keep])
+        verts[:, :, 0] = self._to_local(garc_id, verts[:, :, 0])
+        collection = mcollections.PolyCollection(verts, facecolors=facecolors, edgecolors=edgecolor, linewidths=linewidth, transform=self._track_transform(garc_id))
+        self.ax.add_collection(collection, autolim=False)
+
+        if spine == True:
+            self.setspine(garc_id, raxis_range)
+        return collection
+
+    @profiled("heatmap", track=True)
+    def heatmap(self, garc_id: str, data, positions=None, width=None, raxis_range: Tuple[float, float] = (550, 600), cmap=None, vmin: Optional[float] = None, vmax: Optional[float] = None, edgecolor="#303030", linewidth: float = 0.0, spine: bool = False):
+        """Function that visualizes data values by a color scale in the sector of the Garc object
+
+        A two dimensional data array is drawn as rows stacked from the bottom
+        to the top of raxis_range. All cells are colored with a single
+        cmap(norm(data)) call and drawn as one PolyCollection.
+
+        Returns
+        _______
+        matplotlib.collections.PolyCollection
+        """
+        data = np.asarray(data, dtype=np.float64)
+        rows = np.atleast_2d(data)
+        theta  = self._track_positions(garc_id, rows[0], positions)
+        widths = self._track_widths(garc_id, theta, width)
+
+        if cmap is None:
+            cmap = self._next_cmap()
+        elif isinstance(cmap, str):
+            cmap = _colormap(cmap)
+        norm = mcolors.Normalize(vmin=np.nanmin(data) if vmin is None else vmin, vmax=np.nanmax(data) if vmax is None else vmax)
+
+        n_cells = rows.shape[1]
+        pixels  = self._lod_pixels(garc_id, raxis_range)
+        if pixels is not None and n_cells > pixels[0]:
+            coordinates = self._arc_span(garc_id)
+            order, starts, theta, widths = lod.bin_intervals(theta, widths, coordinates[0], coordinates[-1], pixels[0])
+            valid  = ~np.isnan(rows[:, order])
+            counts = np.add.reduceat(valid, starts, axis=1)
+            sums   = np.add.reduceat(np.where(valid, rows[:, order], 0.0), starts, axis=1)
+            rows   = np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+        self._record_lod("heatmap", garc_id, n_cells, rows.shape[1])
+        facecolors = cmap(norm(rows.reshape(-1)))
+
+        n_rows, n_cols = rows.shape
+        edges  = np.linspace(raxis_range[0], raxis_range[1], n_rows + 1)
+        verts  = _sector_verts(np.tile(theta, n_rows), np.tile(widths, n_rows), np.repeat(edges[:-1], n_cols), np.repeat(edges[1:], n_cols))
+        verts[:, :, 0] = self._to_local(garc_id, verts[:, :, 0])
+        collection = mcollections.PolyCollection(verts, facecolors=facecolors, edgecolors=edgecolor, linewidths=linewidth, transform=self._track_transform(garc_id))
+        self.ax.add_collection(collection, autolim=False)
+
+        if spine == True:
+            self.setspine(garc_id, raxis_range)
+        return collection
+
+    @profiled("featureplot", track=True)
+    def featureplot(self, garc_id: str, feature_type: Optional[str] = None, source=None, raxis_range: Tuple[float, float] = (550, 600), facecolor=None, edgecolor="#303030", linewidth: float = 0.0, spine: bool = False, region: Optional[Tuple[int, int]] = None, strand: Optional[int] = None):
+        """Function that visualizes sequence features with bars in the sector of the Garc object
+
+        If source is not given, the feature table of the Garc object is used,
+        which is extracted from record.features once, and its interval index
+        is built once per feature type and strand. source can also be a list
+        of Bio.SeqFeature objects, a FeatureTable or an IntervalIndex. If
+        region is given, only the features overlapping it are drawn, clipped
+        to it, and they are found with the interval index instead of a scan.
+
+        Returns
+        _______
+        matplotlib.collections.PolyCollection
+        """
+        if source is None:
+            index = self._garc_dict[garc_id].interval_index(feature_type, strand)
+        elif isinstance(source, IntervalIndex):
+            index = source
+        elif isinstance(source, FeatureTable):
+            index = source.interval_index(feature_type, strand)
+        else:
+            index = FeatureTable.from_features(source, ()).interval_index(feature_type, strand)
+
+        if region is None:
+            starts, ends, _ = index.intervals()
+        else:
+            starts, ends, _ = index.intervals(region[0], region[1])
+            starts, ends = np.maximum(starts, region[0]), np.minimum(ends, region[1])
+        starts = starts.astype(np.float64)
+        theta  = self.to_theta(garc_id, starts)
+        widths = self.to_theta(garc_id, ends.astype(np.float64)) - theta
+        pixels = self._lod_pixels(garc_id, raxis_range)
+        if pixels is not None:
+            coordinates = self._arc_span(garc_id)
+            theta, widths = lod.merge_intervals(theta, widths, (coordinates[-1] - coordinates[0]) / pixels[0])
+        self._record_lod("featureplot", garc_id, len(starts), len(theta))
+
+        if facecolor is None:
+            facecolor = self._next_color()
+        verts = _sector_verts(theta, widths, np.full(len(theta), raxis_range[0]), np.full(len(theta), raxis_range[1]))
+        verts[:, :, 0] = self._to_local(garc_id, verts[:, :, 0])
+        collection = mcollections.PolyCollection(verts, facecolors=facecolor, edgecolors=edgecolor, linewidths=linewidth, transform=self._track_transform(garc_id))
+        self.ax.add_collection(collection, autolim=False)
+
+        if spine == True:
+            self.setspine(garc_id, raxis_range)
+        return collection
+
+    def _dense_artists(self, rasterize: Optional[bool]) -> List:
+        """Function that returns the artists to be rasterized in vector formats
+
+        If rasterize is None, the collections and lines with at least
+        rasterize_threshold elements and the links of chord_plot.plot(), if
+        there are as many of them, are returned. If rasterize is True, all
+        artists except the arcs and the labels are returned.
+        """
+        if rasterize == False:
+            return []
+        kept = set()
+        for bar, text in self._arc_artists.values():
+            kept.update((id(bar), id(text)))
+        if self._arc_collection is not None:
+            kept.add(id(self._arc_collection))
+        patches = [artist for artist, _ in self._links if isinstance(artist, mpatches.PathPatch)]
+        dense = []
+        for artist in self.ax.get_children():
+            if id(artist) in kept or artist is self.ax.patch or isinstance(artist, mtext.Text):
+                continue
+            if rasterize == True:
+                if isinstance(artist, (mcollections.Collection, mlines.Line2D, mpatches.Patch)):
+                    dense.append(artist)
+            elif isinstance(artist, mcollections.Collection):
+                if max(len(artist.get_paths()), len(artist.get_offsets())) >= self.rasterize_threshold:
+                    dense.append(artist)
+            elif isinstance(artist, mlines.Line2D):
+                if len(artist.get_xdata()) >= self.rasterize_threshold:
+                    dense.append(artist)
+        if rasterize is None and len(patches) >= self.rasterize_threshold:
+            dense.extend(patches)
+        return dense
+
+    def _layout_bbox(self, renderer, pad: float = 0.1) -> Bbox:
+        """Function that returns the bounding box of the plot in inches without drawing it
+
+        The tracks and links are clipped to the circle of the polar axes, so
+        only texts such as the labels can lie outside of it, and their extents
+        are computed by the renderer without a draw.
+        """
+        self.ax.apply_aspect()
+        bboxes = [self.ax.bbox]
+        for text in self.ax.texts + self.figure.texts:
+            if text.get_visible() == True and text.get_text() != "":
+                bboxes.append(text.get_window_extent(renderer))
+        return Bbox.union(bboxes).transformed(self.figure.dpi_scale_trans.inverted()).padded(pad)
+
+    def _draw_raster(self, dpi: float, bbox: Optional[Bbox], reuse_canvas: bool = False) -> Optional[np.ndarray]:
+        """Function that draws the figure once with Agg and returns the RGBA pixels in bbox
+
+        None is returned if bbox does not fit in the figure. If reuse_canvas
+        is True, the Agg renderer of the previous draw of this thread is used
+        again if it has the same size, instead of allocating a new buffer.
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        width, height = self.figure.get_size_inches() * dpi
+        if bbox is not None and (bbox.x0 < 0 or bbox.y0 < 0 or bbox.x1 * dpi > width or bbox.y1 * dpi > height):
+            return None
+        canvas, original_dpi = self.figure.canvas, self.figure.dpi
+        agg = canvas if isinstance(canvas, FigureCanvasAgg) else FigureCanvasAgg(self.figure)
+        try:
+            self.figure.dpi = dpi
+            try:
+                key = agg.get_width_height(physical=True) + (self.figure.dpi,)
+            except TypeError:
+                # matplotlib < 3.5 keys the renderer with the size of the figure bbox
+                key = tuple(self.figure.bbox.size) + (self.figure.dpi,)
+            cached = getattr(_renderers, "cached", None)
+            if reuse_canvas == True and cached is not None and cached[0] == key:
+                agg.renderer, agg._lastKey = cached[1], key
+            agg.draw()
+            image = np.asarray(agg.buffer_rgba())
+            if bbox is not None:
+                rows = image.shape[0]
+                x0, y0 = int(math.floor(bbox.x0 * dpi)), int(math.floor(bbox.y0 * dpi))
+                x1, y1 = int(math.ceil(bbox.x1 * dpi)), int(math.ceil(bbox.y1 * dpi))
+                image = image[rows - y1:rows - y0, x0:x1]
+            image = image.copy()
+            if reuse_canvas == True:
+                _renderers.cached = (key, agg.renderer)
+        finally:
+            self.figure.dpi = original_dpi
+            if agg is not canvas:
+                self.figure.set_canvas(canvas)
+        return image
+
+    def _bbox_inches(self, bbox: Optional[str]):
+        if bbox == "tight":
+            return "tight"
+        elif bbox == "layout":
+            get_renderer = getattr(self.figure.canvas, "get_renderer", None)
+            return "tight" if get_renderer is None else self._layout_bbox(get_renderer())
+        elif bbox is not None:
+            raise ValueError("bbox should be 'layout', 'tight' or None")
+        return None
+
+    def _export(self, targets: List[Tuple], dpi=None, rasterize: Optional[bool] = None, bbox: Optional[str] = "layout", reuse_canvas: bool = False) -> None:
+        """Function that writes the figure to (path or file object, format) targets
+
+        Raster formats share one draw of the figure with Agg, and each vector
+        format is drawn with its dense layers rasterized.
+        """
         self.figure.patch.set_alpha(0.0) 
         
         if dpi is None:
             dpi = 600
+        bbox_inches = self._bbox_inches(bbox)
+
+        raster = [(target, fmt) for target, fmt in targets if fmt.lower() in RASTER_FORMATS]
+        if len(raster) > 0:
+            image = None if bbox_inches == "tight" else self._draw_raster(dpi, bbox_inches, reuse_canvas)
+            for target, fmt in raster:
+                if image is None:
+                    self.figure.savefig(target, bbox_inches=bbox_inches, dpi=dpi, format=fmt, **SAVEFIG_OPTIONS)
+                else:
+                    mimage.imsave(target, image, format=fmt, dpi=dpi)
+
+        vector = [(target, fmt) for target, fmt in targets if fmt.lower() not in RASTER_FORMATS]
+        if len(vector) > 0:
+            dense = self._dense_artists(rasterize)
+            rasterized = [artist.get_rasterized() for artist in dense]
+            try:
+                for artist in dense:
+                    artist.set_rasterized(True)
+                for target, fmt in vector:
+                    if fmt.lower() in VECTOR_FORMATS:
+                        # The lock keeps the save and restore of the rcParams of
+                        # concurrent saves nested, so they are always restored.
+                        with _rc_lock, matplotlib.rc_context(FONTTYPE_PARAMS):
+                            self.figure.savefig(target, bbox_inches=bbox_inches, dpi=dpi, format=fmt, **SAVEFIG_OPTIONS)
+                    else:
+                        self.figure.savefig(target, bbox_inches=bbox_inches, dpi=dpi, format=fmt, **SAVEFIG_OPTIONS)
+            finally:
+                for artist, value in zip(dense, rasterized):
+                    artist.set_rasterized(value)
+
+    @profiled("save")
+    def save(self, file_name="test", format="png", dpi=None, rasterize: Optional[bool] = None, bbox: Optional[str] = "layout") -> List[str]:
+        """Function that saves the figure in one or more formats
+
+        Raster formats (png, jpg, tif, webp) share one draw of the figure with
+        Agg. Each vector format (pdf, svg, eps) needs its own draw, in which
+        the dense layers are rasterized at dpi while the arcs and labels stay
+        vector, keeping large files small and quick to open.
+
+        Parameters
+        __________
+        file_name : str
+            Path of the files without the extension.
+        format : str or list of str
+            Format, or formats, of the files.
+        dpi : int, optional
+            Resolution of raster formats and of the rasterized layers
+            (default: 600).
+        rasterize : bool, optional
+            If None, the collections and lines with at least
+            rasterize_threshold elements are rasterized in vector formats. If
+            True, all tracks and links are rasterized and if False, nothing is.
+        bbox : str, optional
+            "layout" crops the figure to the circle and the labels, which is
+            computed from the layout without a draw. "tight" uses the tight
+            bounding box of matplotlib, which draws the figure once more. If
+            bbox is None, the whole figure is saved.
+
+        Returns
+        _______
+        list of str
+            Paths of the saved files.
+        """
+        formats = [format] if isinstance(format, str) else list(format)
+        paths = [file_name + "." + fmt for fmt in formats]
+        self._export(list(zip(paths, formats)), dpi, rasterize, bbox)
+        return paths
 
-        self.figure.savefig(file_name + "." + format, bbox_inches="tight", dpi=dpi)
+    @profiled("render")
+    def render(self, format: str = "png", file=None, dpi=None, rasterize: Optional[bool] = None, bbox: Optional[str] = "layout", reuse_canvas: bool = False) -> Optional[bytes]:
+        """Function that renders the figure into bytes or a file object without writing a file
 
-        # return self.figure 
+        With use_pyplot=False, the figure is drawn on its own Agg canvas
+        without the global state of pyplot, so figures can be rendered on
+        worker threads, one figure per thread at a time.
+
+        Parameters
+        __________
+        format : str
+            Format of the output, e.g. "png", "svg" or "pdf".
+        file : file object, optional
+            Binary file object, e.g. io.BytesIO or a socket file, to which the
+            output is written. If file is not given, the output is returned.
+        dpi, rasterize, bbox
+            Same parameters with save().
+        reuse_canvas : bool
+            If True, the Agg buffer of raster formats is kept for the thread
+            and reused by the next render of the same pixel size, which saves
+            allocating and clearing a large buffer per render.
+
+        Returns
+        _______
+        bytes or None
+            The output, or None if file is given.
+        """
+        buffer = io.BytesIO() if file is None else file
+        self._export([(buffer, format)], dpi, rasterize, bbox, reuse_canvas)
+        if file is None:
+            return buffer.getvalue()
+        return None
 
 class Lineplot(Gcircle):
     """Class for a lineplot object"""
-    def __init__(self,figsize: Tuple[int, int]=(8,8)) -> None:
-
+    def __init__(self,figsize: Tuple[int, int]=(8,8), **kwargs) -> None:
+        super().__init__(figsize, **kwargs)
         self.linestyle: str = "solid"
 
+    def plot(self, garc_id: str, data, positions=None, **kwargs):
+        kwargs.setdefault("linestyle", self.linestyle)
+        return self.lineplot(garc_id, data, positions, **kwargs)
+
 class fillplot(Gcircle):
-    pass
+    """Class for a fillplot object"""
+    def plot(self, garc_id: str, data, positions=None, **kwargs):
+        return self.fillplot(garc_id, data, positions, **kwargs)
 
 class scatterplot(Gcircle):
-    pass
+    """Class for a scatterplot object"""
+    def plot(self, garc_id: str, data, positions=None, **kwargs):
+        return self.scatterplot(garc_id, data, positions, **kwargs)
 
 class barplot(Gcircle):
-    pass
+    """Class for a barplot object"""
+    def plot(self, garc_id: str, data, positions=None, **kwargs):
+        return self.barplot(garc_id, data, positions, **kwargs)
 
 class heatmap(Gcircle):
-    pass
+    """Class for a heatmap object"""
+    def plot(self, garc_id: str, data, positions=None, **kwargs):
+        return self.heatmap(garc_id, data, positions, **kwargs)
 
 class featureplot(Gcircle):
-    pass
+    """Class for a featureplot object"""
+    def plot(self, garc_id: str, feature_type: Optional[str] = None, source=None, **kwargs):
+        return self.featureplot(garc_id, feature_type, source, **kwargs)
 
 class chord_plot(Gcircle):
 
-    def __init__(self, figsize: Tuple[int, int] = (8,8)) -> None:
-        super().__init__(figsize)
+    def __init__(self, figsize: Tuple[int, int] = (8,8), **kwargs) -> None:
+        super().__init__(figsize, **kwargs)
 
+    @profiled("chord.plot")
     def plot(self, start_list: List, end_list: List, facecolor: str = None, linewidth: float = 0.0) -> None:
 
         garc_id1: str = start_list[0]
@@ -165,18 +1108,10 @@ class chord_plot(Gcircle):
 
         center: int = 0 
 
-        start1 = self._garc_dict[garc_id1].coordinates[0] 
-        end1   = self._garc_dict[garc_id1].coordinates[-1] 
-        size1  = self._garc_dict[garc_id1].size - 1
-        sstart = start1 + ((end1-start1) * start_list[1]/size1) 
-        send   = start1 + ((end1-start1) * start_list[2]/size1)
+        sstart, send = self.to_theta(garc_id1, start_list[1:3])
         stop   = start_list[3] 
         
-        start2 = self._garc_dict[garc_id2].coordinates[0] 
-        end2   = self._garc_dict[garc_id2].coordinates[-1] 
-        size2  = self._garc_dict[garc_id2].size - 1
-        ostart = start2 + ((end2-start2) * end_list[1]/size2) 
-        oend   = start2 + ((end2-start2) * end_list[2]/size2)
+        ostart, oend = self.to_theta(garc_id2, end_list[1:3])
         etop   = end_list[3] 
 
         if facecolor is None:
@@ -202,399 +1137,139 @@ class chord_plot(Gcircle):
             path  = mpath.Path(verts, codes)
             patch = mpatches.PathPatch(path, facecolor=facecolor, linewidth=linewidth, zorder=0)
             self.ax.add_patch(patch)
+            self._links.append((patch, {"arc1": np.array([garc_id1]), "start1": np.array([start_list[1]], dtype=np.float64), "end1": np.array([start_list[2]], dtype=np.float64), "r1": np.array([stop], dtype=np.float64),
+                                        "arc2": np.array([garc_id2]), "start2": np.array([end_list[1]], dtype=np.float64), "end2": np.array([end_list[2]], dtype=np.float64), "r2": np.array([etop], dtype=np.float64)}))
+
+    @profiled("chord.plot_many")
+    def plot_many(self, arc1, start1=None, end1=None, r1=None, arc2=None, start2=None, end2=None, r2=None, facecolor=None, alpha: Optional[float] = None, edgecolor=None, linewidth: float = 0.0):
+        """Function that draws many links at once as one PathCollection
+
+        The Bezier vertices of all links are computed with NumPy arrays and
+        drawn with a single artist, which scales to hundreds of thousands of
+        links. Each link is drawn in the same shape as plot().
+
+        Parameters
+        __________
+        arc1 : array-like, pandas.DataFrame or dict
+            Garc ids of the first ends of the links. If a DataFrame or dict is
+            given, the arrays are taken from its "arc1", "start1", "end1",
+            "r1", "arc2", "start2", "end2", "r2" and, if present, "color"
+            columns.
+        start1, end1 : array-like
+            Edge positions of the first ends on their Garc objects.
+        r1 : array-like or float
+            Base heights of the first ends.
+        arc2, start2, end2, r2 : array-like
+            Same values for the second ends.
+        facecolor : str, tuple or list, optional
+            Face color of all links, or one color per link. If facecolor is
+            not given, the default colors are cycled as in plot().
+        alpha : float or array-like, optional
+            Opacity of all links, or one value per link.
+        edgecolor : str or tuple, optional
+            Edge color of the links.
+        linewidth : float
+            Edge line width of the links.
 
+        Returns
+        _______
+        matplotlib.collections.PathCollection
+        """
+        if start1 is None:
+            columns = arc1
+            arc1, start1, end1, r1 = columns["arc1"], columns["start1"], columns["end1"], columns["r1"]
+            arc2, start2, end2, r2 = columns["arc2"], columns["start2"], columns["end2"], columns["r2"]
+            if facecolor is None and "color" in columns:
+                facecolor = columns["color"]
+
+        arc1 = np.asarray(arc1).astype(str)
+        arc2 = np.asarray(arc2).astype(str)
+        n = len(arc1)
+        links = {"arc1": arc1, "start1": np.asarray(start1, dtype=np.float64), "end1": np.asarray(end1, dtype=np.float64), "r1": np.broadcast_to(np.asarray(r1, dtype=np.float64), (n,)),
+                 "arc2": arc2, "start2": np.asarray(start2, dtype=np.float64), "end2": np.asarray(end2, dtype=np.float64), "r2": np.broadcast_to(np.asarray(r2, dtype=np.float64), (n,))}
+        sstart = self.to_theta(arc1, links["start1"])
+        send = self.to_theta(arc1, links["end1"])
+        ostart = self.to_theta(arc2, links["start2"])
+        oend = self.to_theta(arc2, links["end2"])
+
+        if facecolor is None:
+            cycle = (self.color_cycle + np.arange(n)) % len(Gcircle.colors)
+            facecolor = [Gcircle.colors[i] + "80" for i in cycle]
+            self.color_cycle += n
+        facecolors = mcolors.to_rgba_array(facecolor)
+        if len(facecolors) == 1:
+            facecolors = np.repeat(facecolors, n, axis=0)
+        if alpha is not None:
+            facecolors[:, 3] = alpha
+
+        keep = sstart != ostart
+        links = {key: value[keep] for key, value in links.items()}
+        verts = _link_verts(sstart[keep], send[keep], links["r1"], ostart[keep], oend[keep], links["r2"])
+
+        paths = [mpath.Path(v, _LINK_CODES) for v in verts]
+        collection = mcollections.PathCollection(paths, facecolors=facecolors[keep], edgecolors="none" if edgecolor is None else edgecolor, linewidths=linewidth, zorder=0, transform=self.ax.transData)
+        self.ax.add_collection(collection, autolim=False)
+        self._links.append((collection, links))
+        return collection
+
+
+    def plot_bundles(self, pyramid, resolution: Optional[int] = None, max_links: int = 20000, r1: float = 900, r2: Optional[float] = None, min_count: float = 1, encode: str = "alpha", alpha: Tuple[float, float] = (0.1, 0.8), facecolor=None, edgecolor=None, linewidth: float = 0.0):
+        """Function that draws the links of a LinkPyramid as one weighted ribbon per pair of bins
+
+        Parameters
+        __________
+        pyramid : pycircos.bundling.LinkPyramid
+            Links summed into bins of the arcs.
+        resolution : int, optional
+            Level to be drawn. If resolution is not given, the finest level
+            with at most max_links rows is drawn.
+        max_links : int
+            Largest number of ribbons drawn when resolution is not given.
+        r1, r2 : float
+            Base heights of the two ends (r2 defaults to r1).
+        min_count : float
+            Ribbons with smaller counts are not drawn.
+        encode : str
+            "alpha" maps the logarithm of the counts onto the alpha range, and
+            "width" narrows the ends of each ribbon around the center of its
+            bins in proportion to the square root of the count.
+        alpha : tuple
+            (lowest, highest) opacity of the ribbons.
+        facecolor : str, tuple or list, optional
+            Face color of the ribbons. If facecolor is not given, each ribbon
+            takes the color of the Garc object of its first end.
+
+        Returns
+        _______
+        matplotlib.collections.PathCollection
+        """
+        if encode not in ("alpha", "width"):
+            raise ValueError("encode should be 'alpha' or 'width', not {!r}".format(encode))
+        if resolution is None:
+            resolution = pyramid.select(max_links)
+        links = pyramid.links(resolution, min_count)
+        keep  = np.isin(links["arc1"], list(self._garc_dict)) & np.isin(links["arc2"], list(self._garc_dict))
+        links = {key: value[keep] for key, value in links.items()}
+        count = links.pop("count")
+        if len(count) == 0:
+            return None
+
+        scale = np.log1p(count) / np.log1p(count.max())
+        if encode == "width":
+            fraction = np.sqrt(count / count.max())
+            for n in ("1", "2"):
+                start, end = links["start" + n].astype(np.float64), links["end" + n].astype(np.float64)
+                center, half = (start + end) / 2, (end - start) / 2 * fraction
+                links["start" + n], links["end" + n] = center - half, center + half
+            opacity = alpha[1]
+        else:
+            opacity = alpha[0] + (alpha[1] - alpha[0]) * scale
+
+        if facecolor is None:
+            facecolor = [self._garc_dict[arc_id].facecolor for arc_id in links["arc1"].tolist()]
+        links["r1"] = r1
+        links["r2"] = r1 if r2 is None else r2
+        return self.plot_many(links, facecolor=facecolor, alpha=opacity, edgecolor=edgecolor, linewidth=linewidth)
 
 class tickplot(Gcircle):
     pass
-    # def lineplot(self, garc_id, data, positions=None, raxis_range=(550, 600), rlim=None, linestyle="solid", linecolor=None, linewidth=1.0, spine=False):
-    #     start = self._garc_dict[garc_id].coordinates[0] 
-    #     end   = self._garc_dict[garc_id].coordinates[-1]
-    #     size  = self._garc_dict[garc_id].size - 1
-    #     positions_all = np.linspace(start, end, len(data), endpoint=True)
-    #     if positions is None:
-    #         positions = positions_all
-    #     else:
-    #         new_positions = [] 
-    #         for p in positions:
-    #             new_positions.append(start + ((end-start) * p/size))
-    #         positions = new_positions
-        
-    #     if raxis_range is None:
-    #         raxis_range = raxis_range[0]   
-    #     bottom = raxis_range[0]
-    #     top    = raxis_range[1] 
-
-    #     if linecolor is None:
-    #         linecolor = Gcircle.colors[self.color_cycle % len(Gcircle.colors)] 
-    #         self.color_cycle += 1
-        
-    #     if rlim is None:
-    #         rlim = (min(data) - 0.05 * abs(min(data)), max(data) + 0.05 * abs(max(data))) 
-
-    #     min_value     = rlim[0]
-    #     max_value     = rlim[1] 
-    #     new_data      = [] 
-    #     new_positions = [] 
-    #     new_data_array      = [] 
-    #     new_positions_array = [] 
-    #     for p, v in zip(positions, data):
-    #         if v > rlim[1] or v < rlim[0]: 
-    #             new_data_array.append(new_data)
-    #             new_positions_array.append(new_positions) 
-    #             new_data      = [] 
-    #             new_positions = [] 
-    #         else: 
-    #             new_data.append(v) 
-    #             new_positions.append(p) 
-    #     new_data_array.append(new_data)
-    #     new_positions_array.append(new_positions) 
-    #     for data, positions in zip(new_data_array, new_positions_array): 
-    #         if len(positions) > 0: 
-    #             data = np.array(data) - min_value
-    #             data = bottom + np.array(data * ((top - bottom) / (max_value - min_value)))
-    #             self.ax.plot(positions, data, color=linecolor, linewidth=linewidth, linestyle=linestyle)
-        
-    #     if spine == True:
-    #         self.setspine(garc_id, raxis_range)
-
-    # def fillplot(self, garc_id, data, positions=None, raxis_range=(550, 600), rlim=None, base_value=None, facecolor=None, edgecolor="#303030", linewidth=0.0, spine=False):  
-    #     start = self._garc_dict[garc_id].coordinates[0] 
-    #     end   = self._garc_dict[garc_id].coordinates[-1]
-    #     size  = self._garc_dict[garc_id].size - 1
-    #     positions_all = np.linspace(start, end, len(data), endpoint=True)
-    #     if positions is None:
-    #         positions = positions_all
-    #     else:
-    #         new_positions = [] 
-    #         for p in positions:
-    #             new_positions.append(start + ((end-start) * p/size))
-    #         positions = new_positions
-
-    #     if raxis_range is None:
-    #         raxis_range = raxis_range[0]   
-    #     bottom = raxis_range[0]
-    #     top    = raxis_range[1] 
-
-    #     if facecolor is None:
-    #         facecolor = Gcircle.colors[self.color_cycle % len(Gcircle.colors)] 
-    #         self.color_cycle += 1
-        
-    #     if rlim is None:
-    #         rlim = (min(data) - 0.05 * abs(min(data)), max(data) + 0.05 * abs(max(data))) 
-        
-    #     min_value     = rlim[0]
-    #     max_value     = rlim[1] 
-    #     if base_value is None:
-    #         base_value = min_value
-    #     new_data      = [] 
-    #     new_positions = [] 
-    #     new_data_array      = [] 
-    #     new_positions_array = [] 
-    #     for p, v in zip(positions, data):
-    #         if v > rlim[1] or v < rlim[0]: 
-    #             new_data_array.append(new_data)
-    #             new_positions_array.append(new_positions) 
-    #             new_data = [] 
-    #             new_positions = [] 
-    #         else: 
-    #             new_data.append(v) 
-    #             new_positions.append(p) 
-    #     new_data_array.append(new_data)
-    #     new_positions_array.append(new_positions) 
-    #     for data, positions in zip(new_data_array, new_positions_array): 
-    #         if len(positions) > 0:  
-    #             base_value = base_value - min_value
-    #             base_value = bottom + base_value * ((top - bottom) / (max_value - min_value)) 
-    #             data = np.array(data) - min_value
-    #             data = bottom + np.array(data * ((top - bottom) / (max_value - min_value)))
-    #             self.ax.fill_between(positions, data, base_value, facecolor=facecolor, linewidth=linewidth, edgecolor=edgecolor)
-        
-    #     if spine == True:
-    #         self.setspine(garc_id, raxis_range)
-
-    # def scatterplot(self, garc_id, data, positions=None, raxis_range=(550, 600), rlim=None, markershape="o", markersize=5, facecolor=None, edgecolor="#303030", fadcecolors=None, linewidth=0.0, spine=False):
-    #     start = self._garc_dict[garc_id].coordinates[0] 
-    #     end   = self._garc_dict[garc_id].coordinates[-1]
-    #     size  = self._garc_dict[garc_id].size - 1
-    #     positions_all = np.linspace(start, end, len(data), endpoint=True)
-    #     if positions is None:
-    #         positions = positions_all
-    #     else:
-    #         new_positions = [] 
-    #         for p in positions:
-    #             new_positions.append(start + ((end-start) * p/size))
-    #         positions = new_positions
-        
-    #     if raxis_range is None:
-    #         raxis_range = raxis_range[0]   
-    #     bottom = raxis_range[0]
-    #     top    = raxis_range[1] 
-
-    #     if facecolor is None:
-    #         facecolor = Gcircle.colors[self.color_cycle % len(Gcircle.colors)] 
-    #         self.color_cycle += 1
-        
-    #     if rlim is None:
-    #         rlim = (min(data) - 0.05 * abs(min(data)), max(data) + 0.05 * abs(max(data))) 
-
-    #     min_value     = rlim[0]
-    #     max_value     = rlim[1] 
-    #     new_data      = [] 
-    #     new_positions = [] 
-    #     new_data_array      = [] 
-    #     new_positions_array = [] 
-    #     for p, v in zip(positions, data):
-    #         if v > rlim[1] or v < rlim[0]: 
-    #             new_data_array.append(new_data)
-    #             new_positions_array.append(new_positions)
-    #             new_data      = [] 
-    #             new_positions = [] 
-    #         else: 
-    #             new_data.append(v) 
-    #             new_positions.append(p) 
-        
-    #     new_data_array.append(new_data)
-    #     new_positions_array.append(new_positions) 
-    #     for positions, data in zip(new_positions_array, new_data_array): 
-    #         if len(positions) > 0:
-    #             data = np.array(data) - min_value
-    #             data = bottom + np.array(data * ((top - bottom) / (max_value - min_value)))
-    #             self.ax.scatter(positions, data, c=facecolor, s=markersize, linewidth=linewidth, edgecolor=edgecolor, marker=markershape)
-
-    #     if spine == True:
-    #         self.setspine(garc_id, raxis_range)
-    
-    # def barplot(self, garc_id, data, positions=None, width=None, raxis_range=(550, 600), rlim=None, base_value=None, facecolor=None, edgecolor="#303030", linewidth=0.0, spine=False):  
-    #     start = self._garc_dict[garc_id].coordinates[0] 
-    #     end   = self._garc_dict[garc_id].coordinates[-1]
-    #     size  = self._garc_dict[garc_id].size - 1
-    #     positions_all = np.linspace(start, end, len(data), endpoint=True)
-    #     if positions is None:
-    #         positions = positions_all
-    #     else:
-    #         new_positions = [] 
-    #         for p in positions:
-    #             new_positions.append(start + ((end-start) * p/size))
-    #         positions = new_positions
-        
-    #     if width is None:
-    #         width = [positions[1] - positions[0]] * len(data) 
-    #     elif type(width) == float or type(width) == int:
-    #         width = [(end-start) * width/size] * len(data)  
-    #     else:
-    #         new_width = [] 
-    #         for w in width:
-    #             new_w = (end-start) * w/size
-    #             new_width.append(new_w) 
-    #         width = new_width 
-
-    #     if raxis_range is None:
-    #         raxis_range = raxis_range[0]   
-    #     bottom = raxis_range[0]
-    #     top    = raxis_range[1] 
-
-    #     if facecolor is None:
-    #         facecolor = Gcircle.colors[self.color_cycle % len(Gcircle.colors)] 
-    #         self.color_cycle += 1
-        
-    #     if rlim is None:
-    #         if min(data) != max(data):
-    #             rlim = (min(data) - 0.05 * abs(min(data)), max(data) + 0.05 * abs(max(data))) 
-    #         else:
-    #             rlim = (min(data), max(data))
-        
-    #     min_value     = rlim[0] if rlim[0] is not None else min(data)
-    #     max_value     = rlim[1] if rlim[1] is not None else max(data)
-    #     if base_value is None:
-    #         base_value = min_value
-
-    #     new_data            = [] 
-    #     new_positions       = [] 
-    #     new_width           = [] 
-    #     new_data_array      = [] 
-    #     new_positions_array = [] 
-    #     new_width_array     = [] 
-    #     for p, v, w in zip(positions, data, width):
-    #         if v > rlim[1] or v < rlim[0]: 
-    #             new_data_array.append(new_data)
-    #             new_positions_array.append(new_positions)
-    #             new_width_array.append(new_width)
-    #             new_data      = [] 
-    #             new_width     = [] 
-    #             new_positions = [] 
-    #         else: 
-    #             new_data.append(v) 
-    #             new_positions.append(p)
-    #             new_width.append(w) 
-        
-    #     new_data_array.append(new_data)
-    #     new_positions_array.append(new_positions) 
-    #     new_width_array.append(new_width)
-    #     for data, positions, width in zip(new_data_array, new_positions_array, new_width_array): 
-    #         if len(positions) > 0: 
-    #             base_value = base_value - min_value
-    #             if min_value != max_value:
-    #                 base_value = bottom + base_value * ((top - bottom) / (max_value - min_value)) 
-    #             else:
-    #                 base_value = raxis_range[0] 
-                
-    #             data = np.array(data) - min_value
-    #             if min_value != max_value:
-    #                 data = np.array(data) * ((top - bottom) / (max_value - min_value))
-    #                 data = np.array(data) - (base_value - raxis_range[0])
-    #             else:
-    #                 data = [raxis_range[1]-raxis_range[0]] * len(data) 
-    #             self.ax.bar(positions, data, width=width, bottom=base_value, color=facecolor, linewidth=linewidth, edgecolor=edgecolor, align="edge") 
-    
-    #     if spine == True:
-    #         self.setspine(garc_id, raxis_range)
-    
-    # def heatmap(self, garc_id, data, positions=None, width=None, raxis_range=(550, 600), cmap=None, vmin=None, vmax=None, edgecolor="#303030", linewidth=0.0, spine=False):  
-    #     start = self._garc_dict[garc_id].coordinates[0] 
-    #     end   = self._garc_dict[garc_id].coordinates[-1]
-    #     size  = self._garc_dict[garc_id].size - 1
-    #     positions_all = np.linspace(start, end, len(data), endpoint=True)
-    #     if positions is None:
-    #         positions = positions_all
-    #     else:
-    #         new_positions = [] 
-    #         for p in positions:
-    #             new_positions.append(start + ((end-start) * p/size))
-    #         positions = new_positions
-        
-    #     if width is None:
-    #         width = [positions[1] - positions[0]] * len(data) 
-    #     elif type(width) == float or type(width) == int:
-    #         width = [(end-start) * width/size] * len(data)  
-    #     else:
-    #         new_width = [] 
-    #         for w in width:
-    #             new_w = (end-start) * w/size
-    #             new_width.append(new_w) 
-    #         width = new_width 
-
-    #     if raxis_range is None:
-    #         raxis_range = raxis_range[0]   
-    #     bottom = raxis_range[0]
-    #     top    = raxis_range[1] 
-    #     height = top - bottom
-
-    #     if cmap is None:
-    #         cmap = Gcircle.cmaps[self.cmap_cycle % len(Gcircle.cmaps)] 
-    #         self.cmap_cycle += 1
-
-    #     if vmax is None:
-    #         max_value = max(data)
-    #     else:
-    #         max_value = vmax
-        
-    #     if vmin is None:
-    #         min_value = min(data) 
-    #     else:
-    #         min_value = vmin
-        
-    #     facecolors = [] 
-    #     for d in data:
-    #         facecolors.append(cmap(d/(max_value-min_value)))
-    #     self.ax.bar(positions, height=[height] * len(positions), width=width, bottom=bottom, color=facecolors, edgecolor=edgecolor, linewidth=linewidth, align="edge")  
-
-    #     if spine == True:
-    #         self.setspine(garc_id, raxis_range)
-    
-    # def featureplot(self, garc_id, feature_type=None, source=None, raxis_range=(550, 600), facecolor=None, edgecolor="#303030", spine=False):  
-    #     start = self._garc_dict[garc_id].coordinates[0] 
-    #     end   = self._garc_dict[garc_id].coordinates[-1] 
-    #     size  = self._garc_dict[garc_id].size - 1
-
-    #     if source is None:
-    #         source = self.record.features
-
-    #     if feature_type is None:
-    #         feature_list = source
-    #     else:
-    #         feature_list = [feat for feat in source if feat.type == feature_type]
-        
-    #     positions = [] 
-    #     widths = [] 
-    #     for feat in feature_list:
-    #         if feat.location.strand >= 0:
-    #             s = int(feat.location.parts[0].start.position) 
-    #             e = int(feat.location.parts[-1].end.position)
-    #             pos   = start + ((end-start) * s/size)
-    #             width = start + ((end-start) * e/size) - pos    
-    #             positions.append(pos) 
-    #             widths.append(width)
-    #         else:
-    #             s = int(feat.location.parts[-1].start.position) 
-    #             e = int(feat.location.parts[0].end.position)
-    #             pos   = start + ((end-start) * s/size)
-    #             width = start + ((end-start) * e/size) - pos    
-    #             positions.append(pos) 
-    #             widths.append(width)
-
-    #     bottom = raxis_range[0]
-    #     top    = raxis_range[1] 
-        
-    #     if facecolor is None:
-    #         facecolor = Gcircle.colors[self.color_cycle % len(Gcircle.colors)] 
-    #         self.color_cycle += 1
-    #     self.ax.bar(positions, [abs(top-bottom)] * len(positions) , width=widths, bottom=bottom, color=facecolor, align="edge", linewidth=0)
-    #     if spine == True:
-    #         self.setspine(garc_id, raxis_range)
-    
-    # def chord_plot(self, start_list, end_list, facecolor=None, edgecolor=None, linewidth=0.0):
-    #     garc_id1 = start_list[0]
-    #     garc_id2 = end_list[0]
-    #     center = 0 
-
-    #     start1 = self._garc_dict[garc_id1].coordinates[0] 
-    #     end1   = self._garc_dict[garc_id1].coordinates[-1] 
-    #     size1  = self._garc_dict[garc_id1].size - 1
-    #     sstart = start1 + ((end1-start1) * start_list[1]/size1) 
-    #     send   = start1 + ((end1-start1) * start_list[2]/size1)
-    #     stop   = start_list[3] 
-        
-    #     start2 = self._garc_dict[garc_id2].coordinates[0] 
-    #     end2   = self._garc_dict[garc_id2].coordinates[-1] 
-    #     size2  = self._garc_dict[garc_id2].size - 1
-    #     ostart = start2 + ((end2-start2) * end_list[1]/size2) 
-    #     oend   = start2 + ((end2-start2) * end_list[2]/size2)
-    #     etop   = end_list[3] 
-
-    #     if facecolor is None:
-    #         facecolor = Gcircle.colors[self.color_cycle % len(Gcircle.colors)] + "80" 
-    #         self.color_cycle += 1
-        
-    #     z1 = stop - stop * math.cos(abs((send-sstart) * 0.5)) 
-    #     z2 = etop - etop * math.cos(abs((oend-ostart) * 0.5)) 
-    #     if sstart == ostart: 
-    #         pass 
-    #     else:
-    #         Path = mpath.Path
-    #         path_data = [(Path.MOVETO,  (sstart, stop)),
-    #                      (Path.CURVE3,  (sstart, center)),     
-    #                      (Path.CURVE3,  (oend,   etop)),
-    #                      (Path.CURVE3,  ((ostart+oend)*0.5, etop+z2)),
-    #                      (Path.CURVE3,  (ostart, etop)),
-    #                      (Path.CURVE3,  (ostart, center)),
-    #                      (Path.CURVE3,  (send,   stop)),
-    #                      (Path.CURVE3,  ((sstart+send)*0.5, stop+z1)),
-    #                      (Path.CURVE3,  (sstart, stop)),
-    #                     ]
-    #         codes, verts = list(zip(*path_data)) 
-    #         path  = mpath.Path(verts, codes)
-    #         patch = mpatches.PathPatch(path, facecolor=facecolor, linewidth=linewidth, zorder=0)
-    #         self.ax.add_patch(patch)
-
-    # def tickplot(self, garc_id, tick_interval=1000, length=5, width=1.0, direction="outer"):  
-    #     start = self.locus_dict[garc_id].coordinates[0] 
-    #     end   = self.locus_dict[garc_id].coordinates[-1] 
-    #     size  = self.locus_dict[garc_id].size-1
-    #     for i in range(0, size+1, tick_interval):
-    #         for tick in ticks:
-    #             if direction == "outer":
-    #                 self.ax.plot([start + ((end-start) * i/size), start + ((end-start) * i/size)], [bottom, bottom+length], color=color, linewidth=width)  
-    #             if direction == "inner":
-    #                 self.ax.plot([start + ((end-start) * i/size), start + ((end-start) * i/size)], [bottom, bottom-length], color=color, linewidth=width)
-   
-    
\ No newline at end of file
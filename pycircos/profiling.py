@@ -0,0 +1,194 @@
+import json
+import time
+import threading
+import functools
+import contextlib
+import tracemalloc
+from typing import Dict, List, Optional
+
+# Profiler that records the stages of each thread in its "profiler"
+# attribute. The hooks only check this attribute while no profiler is active,
+# and a profiler records only the stages of the thread that entered it.
+_active = threading.local()
+
+# tracemalloc.reset_peak() is new in Python 3.9. Without it the peak of a
+# stage is taken as the memory traced when it ends.
+_RESET_PEAK: bool = hasattr(tracemalloc, "reset_peak")
+
+
+class _Frame:
+    def __init__(self, name: str, artists: int) -> None:
+        self.name: str = name
+        self.artists: int = artists
+        self.start: float = time.perf_counter()
+        self.memory: int = 0
+        self.peak: int = 0
+
+
+def _traced_peak() -> int:
+    """Function that returns the peak traced memory since the last reset, or the traced memory without reset_peak()"""
+    current, peak = tracemalloc.get_traced_memory()
+    return peak if _RESET_PEAK == True else current
+
+
+def _count_artists(obj) -> int:
+    ax = getattr(obj, "ax", None) if obj is not None else None
+    if ax is None:
+        return 0
+    return len(ax.get_children())
+
+
+class Profiler:
+    """Class that records the time, calls, artists and memory of the rendering stages
+
+    While a Profiler is used as a context manager, the stages of pycircos
+    (e.g. "garc.parse", "calc_nnskew", "set_garcs", "barplot", "chord.plot",
+    "save") are recorded. Stages can be nested, and the time of a stage
+    includes the time of the stages run inside it. Only the stages of the
+    thread that entered the profiler are recorded, while the memory traced
+    by tracemalloc is that of the whole process.
+
+    Parameters
+    __________
+    memory : bool
+        If True, the peak memory allocated by Python in each stage is traced
+        with tracemalloc, which slows the stages down.
+
+    Examples
+    ________
+    >>> with Profiler() as profiler:
+    ...     circle.set_garcs()
+    ...     circle.save("plot")
+    >>> profiler.to_json("profile.json")
+    """
+
+    def __init__(self, memory: bool = True) -> None:
+        self.memory: bool = memory
+        self.stages: Dict[str, Dict] = {}
+        self.tracks: List[Dict] = []
+        self.wall_time: float = 0.0
+        self._stack: List[_Frame] = []
+        self._previous: Optional["Profiler"] = None
+        self._started_tracemalloc: bool = False
+        self._start: float = 0.0
+
+    def __enter__(self) -> "Profiler":
+        self._previous = getattr(_active, "profiler", None)
+        _active.profiler = self
+        if self.memory == True and tracemalloc.is_tracing() == False:
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.wall_time += time.perf_counter() - self._start
+        if self._started_tracemalloc == True:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        _active.profiler = self._previous
+        self._previous = None
+
+    def _enter_stage(self, name: str, obj=None) -> _Frame:
+        frame = _Frame(name, _count_artists(obj))
+        if self.memory == True and tracemalloc.is_tracing() == True:
+            current, peak = tracemalloc.get_traced_memory()[0], _traced_peak()
+            if len(self._stack) > 0:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+            if _RESET_PEAK == True:
+                tracemalloc.reset_peak()
+            frame.memory = current
+            frame.peak = current
+        self._stack.append(frame)
+        return frame
+
+    def _exit_stage(self, frame: _Frame, obj=None, garc_id: Optional[str] = None) -> None:
+        self._stack.remove(frame)
+        wall_time = time.perf_counter() - frame.start
+        artists = max(0, _count_artists(obj) - frame.artists)
+        peak_memory = 0
+        if self.memory == True and tracemalloc.is_tracing() == True:
+            peak = max(_traced_peak(), frame.peak)
+            peak_memory = peak - frame.memory
+            if len(self._stack) > 0:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+
+        stats = self.stages.setdefault(frame.name, {"calls": 0, "wall_time": 0.0, "artists": 0, "peak_memory": 0})
+        stats["calls"] += 1
+        stats["wall_time"] += wall_time
+        stats["artists"] += artists
+        stats["peak_memory"] = max(stats["peak_memory"], peak_memory)
+        if garc_id is not None:
+            self.tracks.append({"stage": frame.name, "garc_id": garc_id, "wall_time": wall_time, "artists": artists, "peak_memory": peak_memory})
+
+    def report(self) -> Dict:
+        """Function that returns the recorded stages as a dictionary
+
+        Returns
+        _______
+        dict
+            {"wall_time": total time in the profiler, "stages": {stage:
+            {"calls", "wall_time", "artists", "peak_memory"}}, "tracks": [one
+            dict per track with "stage", "garc_id", "wall_time", "artists"
+            and "peak_memory"]}. Times are in seconds and memory in bytes.
+        """
+        stages = dict(sorted(self.stages.items(), key=lambda item: -item[1]["wall_time"]))
+        return {"wall_time": self.wall_time, "stages": stages, "tracks": list(self.tracks)}
+
+    def to_json(self, path: Optional[str] = None, indent: Optional[int] = 2) -> str:
+        """Function that returns the report as JSON, and writes it to path if path is given"""
+        text = json.dumps(self.report(), indent=indent)
+        if path is not None:
+            with open(path, "w") as handle:
+                handle.write(text + "\n")
+        return text
+
+    def summary(self) -> str:
+        """Function that returns the stages as a table sorted by time"""
+        lines = ["{:<20} {:>8} {:>12} {:>10} {:>14}".format("stage", "calls", "time (s)", "artists", "peak memory")]
+        for name, stats in self.report()["stages"].items():
+            lines.append("{:<20} {:>8} {:>12.4f} {:>10} {:>14}".format(name, stats["calls"], stats["wall_time"], stats["artists"], stats["peak_memory"]))
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def stage(name: str, obj=None, garc_id: Optional[str] = None):
+    """Function that records the block as a stage of the active profiler
+
+    obj is the Gcircle object whose artists are counted, and garc_id records
+    the block as a track of the Garc object. Without an active profiler, the
+    block is run as is.
+    """
+    profiler = getattr(_active, "profiler", None)
+    if profiler is None:
+        yield
+        return
+    frame = profiler._enter_stage(name, obj)
+    try:
+        yield
+    finally:
+        profiler._exit_stage(frame, obj, garc_id)
+
+
+def profiled(name: str, track: bool = False):
+    """Function that returns a decorator recording a method as a stage
+
+    If track is True, the first argument of the method (or garc_id) is
+    recorded as the Garc id of a track.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = getattr(_active, "profiler", None)
+            if profiler is None:
+                return method(self, *args, **kwargs)
+            garc_id = None
+            if track == True:
+                garc_id = kwargs.get("garc_id", args[0] if len(args) > 0 else None)
+            frame = profiler._enter_stage(name, self)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                profiler._exit_stage(frame, self, garc_id)
+        return wrapper
+    return decorator
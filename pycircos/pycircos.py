@@ -1,88 +1,118 @@
 import os 
-import re
-import io 
 import sys
-import math
-import urllib
-import tempfile
-import requests
-import collections
 import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
-import matplotlib.path    as mpath
-import matplotlib.patches as mpatches
-from Bio import SeqIO
-import Bio
 from typing import List, Dict, Tuple
+from . import density
+from . import composition
+from . import seqstore
+from . import ncbi
+from . import intervals
+from . import features
+from . import profiling
+from . import trackstore
 
-matplotlib.rcParams["figure.max_open_warning"] = 0
-matplotlib.rcParams['ps.fonttype']       = 42
-matplotlib.rcParams['pdf.fonttype']      = 42
-matplotlib.rcParams['font.sans-serif']   = ["Arial","Lucida Sans","DejaVu Sans","Lucida Grande","Verdana"]
-matplotlib.rcParams['font.family']       = 'sans-serif'
-matplotlib.rcParams['font.size']         = 10.0
-matplotlib.rcParams["axes.labelcolor"]   = "#000000"
-matplotlib.rcParams["axes.linewidth"]    = 1.0
-matplotlib.rcParams["xtick.major.width"] = 1.0
-matplotlib.rcParams["ytick.major.width"] = 1.0
-matplotlib.rcParams['xtick.major.pad']   = 6
-matplotlib.rcParams['ytick.major.pad']   = 6
-matplotlib.rcParams['xtick.major.size']  = 6
-matplotlib.rcParams['ytick.major.size']  = 6
+
+def _is_seqrecord(record) -> bool:
+    # Bio is imported on first use, so a SeqRecord can only exist once
+    # Bio.SeqRecord has been imported.
+    module = sys.modules.get("Bio.SeqRecord")
+    return module is not None and type(record) == module.SeqRecord
 
 class Garc:
     #list100 = ["#ffcdd2","#f8bbd0","#e1bee7","#d1c4e9","#c5cae9","#bbdefb","#b3e5fc","#b2ebf2","#b2dfdb","#c8e6c9","#dcedc8","#f0f4c3","#fff9c4","#ffecb3","#ffe0b2","#ffccbc","#d7ccc8","#cfd8dc",
     colorlist = ["#ff8a80","#ff80ab","#ea80fc","#b388ff","#8c9eff","#82b1ff","#84ffff","#a7ffeb","#b9f6ca","#ccff90","#f4ff81","#ffff8d","#ffe57f","#ffd180","#ff9e80","#bcaaa4","#eeeeee","#b0bec5",
                  "#ff5252","#ff4081","#e040fb","#7c4dff","#536dfe","#448aff","#18ffff","#64ffda","#69f0ae","#b2ff59","#eeff41","#ffff00","#ffd740","#ffab40","#ff6e40","#a1887f","#e0e0e0","#90a4ae"]
     _arcnum = 0
+    # Attributes drawn by Gcircle.set_garcs(). Changing one of them marks the
+    # arc dirty in its Gcircle, and the layout attributes also move the arcs
+    # after it.
+    _layout_attributes = ("size", "interspace")
+    _style_attributes  = ("raxis_range", "facecolor", "edgecolor", "linewidth", "label", "labelposition", "labelsize", "label_visible")
+
+    # The attributes are slots, and values stored under other names, such as
+    # the results of calc_nnratio(), go to _values. The coordinates of an arc
+    # are read from the arc registry of its Gcircle.
+    __slots__ = ("_parental_gcircle", "_composition_index", "_interval_indexes", "_feature_table", "_checksum", "_values", "record_path", "arc_id", "sequence", "record",
+                 "size", "interspace", "raxis_range", "facecolor", "edgecolor", "linewidth", "label", "label_visible", "labelposition", "labelsize")
+
+    def __setattr__(self, key, item):
+        if hasattr(Garc, key):
+            object.__setattr__(self, key, item)
+        else:
+            self._values[key] = item
+        if key in Garc._layout_attributes or key in Garc._style_attributes:
+            gcircle = getattr(self, "_parental_gcircle", None)
+            if gcircle is not None:
+                gcircle._mark_dirty(self.arc_id, key in Garc._layout_attributes)
+
+    def __getattr__(self, key):
+        # Only called for names that are not slots or that were never set.
+        if key == "_values" or key not in getattr(self, "_values", {}):
+            raise AttributeError("{!r} object has no attribute {!r}".format(type(self).__name__, key))
+        return self._values[key]
+
     def __setitem__(self, key, item):
-        self.__dict__[key] = item
+        setattr(self, key, item)
 
     def __getitem__(self, key):
-        return self.__dict__[key] 
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    @property
+    def coordinates(self):
+        gcircle = getattr(self, "_parental_gcircle", None)
+        if gcircle is None:
+            return None
+        return gcircle._arc_span(self.arc_id)
 
-    def __init__(self, arc_id=None, record=None, size=1000, interspace=3, raxis_range=(500, 550), facecolor=None, edgecolor="#303030", linewidth=0.75, label=None, labelposition=0, labelsize=10, label_visible=False): 
+    @profiling.profiled("garc.init")
+    def __init__(self, arc_id=None, record=None, size=1000, interspace=3, raxis_range=(500, 550), facecolor=None, edgecolor="#303030", linewidth=0.75, label=None, labelposition=0, labelsize=10, label_visible=False, cache=None): 
+        self._values = {}
         self._parental_gcircle = None
+        self._composition_index = None
+        self._interval_indexes = {}
+        self._feature_table = None
+        self._checksum = None
+        self.record_path = None
         if arc_id == None:
             self.arc_id = str(Garc._arcnum) 
         else:
             self.arc_id = arc_id
 
+        self.sequence = None
         if record is None:
             self.record = None
             self.size = size
         
-        elif type(record) == Bio.SeqRecord.SeqRecord:
+        elif _is_seqrecord(record):
             self.record = record
-            self.size   = len(str(self.record.seq))
+            self.size   = len(self.record.seq)
+        
+        elif isinstance(record, seqstore.SequenceStore):
+            self.record   = None
+            self.sequence = record
+            self.size     = len(self.sequence)
+        
+        elif type(record) == str and record.endswith(seqstore.SUFFIX) and os.path.exists(record):
+            self.record   = None
+            self.sequence = seqstore.SequenceStore.open(record)
+            self.size     = len(self.sequence)
         
         elif type(record) == str:
-            match = re.fullmatch("[a-zA-Z]{1,2}_?[0-9]{5,6}", record)
             if os.path.exists(record) == True:
-                self.record = SeqIO.read(value, format="genbank")  
+                self.record_path = record
+            elif cache is not False:
+                self.record_path = (ncbi.default_cache() if cache is None else cache).get(record)
             
-            if match is None:
-                raise ValueError("Incorrect value for NCBI accession number.") 
-            else:
-                url = "https://www.ncbi.nlm.nih.gov/sviewer/viewer.cgi?tool=portal&save=file&log$=seqview&db=nuccore&report=gbwithparts&id={}&withparts=on".format(record) 
-            outb = io.BytesIO()
-            outs = io.StringIO()
-            headers = {"User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:47.0) Gecko/20100101 Firefox/47.0"} 
-            request = urllib.request.Request(url, headers=headers) 
-            
-            with urllib.request.urlopen(request) as u:
-                outb.write(u.read())
-            outs.write(outb.getvalue().decode())
-            
-            with tempfile.TemporaryFile(mode="w+") as o:
-                content = outs.getvalue()
-                o.write(content)
-                o.seek(0)  
-                record = SeqIO.parse(o,"genbank")
-                record = next(record)
-            self.record = record 
-            self.size = len(str(self.record.seq))
+            with profiling.stage("garc.parse"):
+                if self.record_path is None:
+                    self.record = ncbi.read_genbank(record, cache=False)
+                else:
+                    from Bio import SeqIO
+                    self.record = SeqIO.read(self.record_path, format="genbank")  
+            self.size = len(self.record.seq)
         else:
             self.record = None
             self.size = size
@@ -105,77 +135,112 @@ class Garc:
         self.labelsize = labelsize
         Garc._arcnum += 1
 
-    def calc_density(self, positions, window_size=1000):
-        densities = [] 
-        positions.sort()
-        for i in range(0, self.size, window_size): 
-            source = tuple(range(i, i+window_size))
-            amount = 0 
-            for pos in positions:
-                if type(pos) == int:
-                    if pos in source:
-                        amount += 1 
-                elif type(pos) == tuple:
-                    if pos[0] <= source[-1] and pos[1] >= source[0]:
-                        amount += 1
-                else:
-                    raise ValueError("List elements should be int type or tuple consiting of two int values")
-            densities.append(amount) 
-
-        source = tuple(range(i,self.size))
-        amount = 0 
-        for pos in positions:
-            if type(pos) == int:
-                if pos in source:
-                    amount += 1 
-            elif type(pos) == tuple:
-                if pos[0] <= source[-1] and pos[1] >= source[0]:
-                    amount += 1
-            else:
-                raise ValueError("List elements should be int type or tuple consiting of two int values")
-        densities.append(amount*((self.size-i)/window_size))     
+    @profiling.profiled("calc_density")
+    def calc_density(self, positions, window_size=1000, step_size=None, weights=None, store=None, key=None):
+        store = trackstore.resolve(store)
+        if store is None or key is None:
+            densities = density.calc_density(positions, self.size, window_size=window_size, step_size=step_size, weights=weights)
+        else:
+            # the positions are named by key and checked by their fingerprint,
+            # so they are not hashed on every call
+            step_size = window_size if step_size is None else step_size
+            source    = self.checksum() if self.record is not None or self.sequence is not None else trackstore.array_checksum(np.array([self.arc_id]), np.array([self.size]))
+            points, _, intervals, _ = density.split_positions(positions)
+            arrays    = (points, intervals) if weights is None else (points, intervals, np.asarray(weights, dtype=np.float64))
+            checksum  = trackstore.array_checksum(np.array([source, str(key)]), trackstore.fingerprint(*arrays))
+            compute   = lambda: density.calc_density(positions, self.size, window_size=window_size, step_size=step_size, weights=weights)
+            densities = store.cached(checksum, "density" if weights is None else "weighted_density", window_size, step_size, self.size, compute).values()
+        if weights is None:
+            densities = [int(d) for d in densities[:-1]] + [float(densities[-1])]
+        else:
+            densities = densities.tolist()
         return densities 
 
-    def calc_nnratio(self, n1="G", n2="C", window_size=1000, step_size=None):
-        if self.record is None:
+    @classmethod
+    def from_sequence_file(cls, path, store_path=None, format=None, record_id=None, **kwargs):
+        if store_path is None:
+            store_path = path + seqstore.SUFFIX
+        if os.path.exists(store_path) == False or os.path.getmtime(store_path) < os.path.getmtime(path):
+            seqstore.SequenceStore.build(path, store_path, format=format, record_id=record_id)
+        return cls(record=seqstore.SequenceStore.open(store_path), **kwargs)
+
+    def checksum(self):
+        """Function that returns the SHA-256 of the sequence, which keys the tracks of the record in a TrackStore
+
+        A record read from a file is keyed by its id, its length and the path,
+        size and modification time of the file, so the sequence is not
+        encoded before looking up a stored track.
+        """
+        if self._checksum is None:
+            if self.sequence is not None:
+                self._checksum = trackstore.array_checksum(np.array([len(self.sequence)]), self.sequence.packed, self.sequence.n_runs)
+            elif self.record is not None and self.record_path is not None:
+                stat = os.stat(self.record_path)
+                self._checksum = trackstore.array_checksum(np.array([str(self.record.id), os.path.abspath(self.record_path)]), np.array([len(self.record.seq), stat.st_size, stat.st_mtime_ns]))
+            elif self.record is not None:
+                self._checksum = trackstore.array_checksum(self._get_composition_index().codes)
+            else:
+                raise ValueError("self.record is None, please specify record value")
+        return self._checksum
+
+    def _stored(self, store, metric, window_size, step_size, compute):
+        store = trackstore.resolve(store)
+        if store is None:
+            return compute()
+        step_size = window_size if step_size is None else step_size
+        # a copy, so callers can edit the values in place as with computed ones
+        return np.array(store.cached(self.checksum(), metric, window_size, step_size, self.size, compute).values())
+
+    def _get_composition_index(self):
+        if self._composition_index is None:
+            if self.sequence is not None:
+                self._composition_index = composition.CompositionIndex(self.sequence)
+            elif self.record is not None:
+                self._composition_index = composition.CompositionIndex.from_sequence(self.record.seq)
+            else:
+                raise ValueError("self.record is None, please specify record value")
+        return self._composition_index
+
+    @profiling.profiled("feature_table")
+    def feature_table(self, qualifiers=features.QUALIFIERS):
+        if self._feature_table is None or all(key in self._feature_table.qualifiers for key in qualifiers) == False:
+            if self.record is None:
+                raise ValueError("self.record is None, please specify record value")
+            if self.record_path is not None:
+                self._feature_table = features.FeatureTable.cached(self.record_path, self.record.features, qualifiers)
+            else:
+                self._feature_table = features.FeatureTable.from_features(self.record.features, qualifiers)
+        return self._feature_table
+
+    def interval_index(self, feature_type=None, strand=None):
+        key = (tuple(feature_type) if isinstance(feature_type, (list, tuple)) else feature_type, strand)
+        if key not in self._interval_indexes:
+            self._interval_indexes[key] = self.feature_table().interval_index(feature_type, strand)
+        return self._interval_indexes[key]
+
+    def query_features(self, start, end, feature_type=None, strand=None):
+        return [self.record.features[i] for i in self.interval_index(feature_type, strand).query(start, end)]
+
+    @profiling.profiled("calc_nnratio")
+    def calc_nnratio(self, n1="G", n2="C", window_size=1000, step_size=None, store=None):
+        if self.record is None and self.sequence is None:
             raise ValueError("self.record is None, please specify record value")
         
-        if step_size is None:
-            step_size = window_size
-        
-        seq = str(self.record.seq)
-        gc_amounts = []
-        for i in range(0, len(seq), step_size):
-            if n2 is None:
-                gc_amount = seq[i:i+window_size].upper().count(n1) * 1.0 / window_size
-            else:
-                gc_amount = (seq[i:i+window_size].upper().count(n1) + seq[i:i+window_size].upper().count(n2)) * 1.0 / window_size
-            gc_amounts.append(gc_amount)
+        compute = lambda: self._get_composition_index().ratio(n1, n2, window_size=window_size, step_size=step_size)
+        gc_amounts = self._stored(store, "{}{}_ratio".format(n1.upper(), "" if n2 is None else n2.upper()), window_size, step_size, compute)
         if n2 is None:
-            gc_amounts.append(seq[i:].upper().count(n1) * 1.0 / (len(seq)-i))
+            self["{}_ratio".format(n1)] = gc_amounts
         else:
-            gc_amounts.append((seq[i:].upper().count(n1) + seq[i:i+window_size].upper().count(n2)) * 1.0 / (len(seq)-i))
-        
-        self["{}{}_ratio".foramt(n1,n2)] = gc_amounts
-        gc_amounts = np.array(gc_amounts)
+            self["{}{}_ratio".format(n1,n2)] = gc_amounts
         return gc_amounts
 
-    def calc_nnskew(self, n1="G", n2="C", window_size=1000, step_size=None):
+    @profiling.profiled("calc_nnskew")
+    def calc_nnskew(self, n1="G", n2="C", window_size=1000, step_size=None, cumulative=False, store=None):
         #(G-C)/(G+C) 
-        if self.record is None:
+        if self.record is None and self.sequence is None:
             raise ValueError("self.record is None, please specify record value")
         
-        if step_size is None:
-            step_size = window_size
-        
-        seq = str(self.record.seq) 
-        gc_skews = []
-        for i in range(0, len(seq), step_size):
-            gc_skew = (seq[i:i+window_size].upper().count(n1) - seq[i:i+window_size].upper().count(n2)) * 1.0 / (seq[i:i+window_size].upper().count(n1) + seq[i:i+window_size].upper().count(n2)) * 1.0
-            gc_skews.append(gc_skew)
-        
-        gc_skews.append((seq[i:].upper().count(n1) - seq[i:].upper().count(n2)) * 1.0 / (seq[i:].upper().count(n1) + seq[i:].upper().count(n2)) * 1.0)
+        compute = lambda: self._get_composition_index().skew(n1, n2, window_size=window_size, step_size=step_size, cumulative=cumulative)
+        gc_skews = self._stored(store, "{}{}_{}".format(n1.upper(), n2.upper(), "cumskew" if cumulative == True else "skew"), window_size, step_size, compute)
         self["{}{}_skew".format(n1,n2)] = gc_skews
-        gc_skews = np.array(gc_skews)
-        return gc_skews 
-  
+        return gc_skews
@@ -0,0 +1,276 @@
+import os
+import gzip
+import itertools
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Fields of each format. "U" fields are read as text, whose width is set by
+# the arc ids to keep or TEXT_WIDTH and is shrunk to the longest value read.
+FORMATS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "bed":      (("arc_id", "U"), ("start", "i8"), ("end", "i8")),
+    "bedgraph": (("arc_id", "U"), ("start", "i8"), ("end", "i8"), ("value", "f8")),
+    "bedpe":    (("arc1", "U"), ("start1", "i8"), ("end1", "i8"), ("arc2", "U"), ("start2", "i8"), ("end2", "i8")),
+    "links":    (("link_id", "U"), ("arc_id", "U"), ("start", "i8"), ("end", "i8")),
+}
+
+SUFFIXES: Dict[str, str] = {
+    ".bed": "bed",
+    ".bedgraph": "bedgraph",
+    ".bdg": "bedgraph",
+    ".bedpe": "bedpe",
+    ".csv": "csv",
+    ".tsv": "links",
+    ".txt": "links",
+}
+
+LINK_DTYPE: np.dtype = np.dtype([("link_id", "U64"), ("arc1", "U64"), ("start1", "i8"), ("end1", "i8"), ("arc2", "U64"), ("start2", "i8"), ("end2", "i8")])
+
+TEXT_WIDTH: int = 64
+SKIP_PREFIXES: Tuple[str, ...] = ("#", "track", "browser")
+
+
+def _open(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    return open(path)
+
+
+def _suffix(path: str) -> str:
+    if path.endswith(".gz"):
+        path = path[:-3]
+    return os.path.splitext(path)[1].lower()
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _first_rows(path: str, delimiter: str, n: int = 2) -> List[List[str]]:
+    rows = []
+    with _open(path) as handle:
+        for line in handle:
+            if line.strip() == "" or line.startswith(SKIP_PREFIXES):
+                continue
+            rows.append(line.rstrip("\r\n").split(delimiter))
+            if len(rows) == n:
+                break
+    return rows
+
+
+def _delimiter(path: str, delimiter: Optional[str]) -> str:
+    if delimiter is not None:
+        return delimiter
+    return "," if _suffix(path) == ".csv" else "\t"
+
+
+def detect_format(path: str) -> str:
+    """Function that guesses the format of a data file from its suffix and header
+
+    A .csv file whose fourth column is named like an arc (e.g. "chr2") is
+    taken as links in the BEDPE layout.
+    """
+    suffix = _suffix(path)
+    if suffix not in SUFFIXES:
+        raise ValueError("Unknown format of {}. format should be one of {}".format(path, ", ".join(list(FORMATS) + ["csv"])))
+    format = SUFFIXES[suffix]
+    if format == "csv":
+        rows = _first_rows(path, ",", 1)
+        if len(rows) > 0 and len(rows[0]) >= 6 and _is_number(rows[0][1]) == False and rows[0][3].lower().startswith("chr"):
+            return "bedpe"
+    return format
+
+
+def _layout(path: str, format: str, delimiter: str) -> Tuple[Tuple[Tuple[str, str], ...], int]:
+    """Function that returns the fields of the file and the number of header lines"""
+    rows = _first_rows(path, delimiter)
+    start = 2 if format == "links" else 1
+    header = 0
+    if len(rows) > 0 and len(rows[0]) > start and _is_number(rows[0][start]) == False:
+        header = 1
+
+    if format not in ("csv", "bedpe"):
+        return FORMATS[format], header
+
+    # chr,start,end,value... layout, and the columns after the six of BEDPE,
+    # such as a score: the value columns are named by the header and are read
+    # as numbers unless the first row has text in them.
+    fixed = FORMATS["bed"] if format == "csv" else FORMATS["bedpe"]
+    if len(rows) == 0:
+        return fixed, header
+    names = rows[0] if header == 1 else ["value{}".format(i) for i in range(1, len(rows[0]) - len(fixed) + 1)]
+    if header == 0:
+        names = [""] * len(fixed) + names
+    first = rows[header] if len(rows) > header else ["0"] * len(names)
+    fields = fixed + tuple((name, "f8" if _is_number(first[i]) else "U") for i, name in enumerate(names) if i >= len(fixed))
+    return fields, header
+
+
+def _dtype(fields: Sequence[Tuple[str, str]], arc_width: int) -> np.dtype:
+    arc_fields = ("arc_id", "arc1", "arc2")
+    return np.dtype([(name, "U{}".format(arc_width if name in arc_fields else TEXT_WIDTH) if kind == "U" else kind) for name, kind in fields])
+
+
+def _shrink(records: np.ndarray) -> np.ndarray:
+    """Function that narrows the text fields of records to their longest value"""
+    descr = []
+    for name in records.dtype.names:
+        if records.dtype[name].kind == "U":
+            width = int(np.max(np.char.str_len(records[name]))) if len(records) > 0 else 1
+            descr.append((name, "U{}".format(max(1, width))))
+        else:
+            descr.append((name, records.dtype[name]))
+    return records.astype(descr)
+
+
+def _pair_links(records: np.ndarray, pending: Dict[str, Tuple]) -> np.ndarray:
+    """Function that joins rows sharing a link id into links
+
+    The first row of an id waits in pending until the next row of the id
+    arrives, which may be in a later chunk.
+    """
+    links = []
+    for row in records:
+        link_id = str(row["link_id"])
+        first = pending.pop(link_id, None)
+        if first is None:
+            pending[link_id] = (str(row["arc_id"]), int(row["start"]), int(row["end"]))
+        else:
+            links.append((link_id,) + first + (str(row["arc_id"]), int(row["start"]), int(row["end"])))
+    return np.array(links, dtype=LINK_DTYPE)
+
+
+def iter_chunks(path: str, format: Optional[str] = None, arc_ids: Optional[Sequence[str]] = None, gcircle=None, chunk_size: int = 1 << 16, delimiter: Optional[str] = None, one_based: Optional[bool] = None) -> Iterator[np.ndarray]:
+    """Function that streams a data file as NumPy structured arrays
+
+    The file is read chunk_size lines at a time, each chunk is parsed with
+    numpy.loadtxt and the rows on arcs other than arc_ids are dropped before
+    the next chunk is read, so neither the text nor the dropped rows of a
+    large file are held in memory. Coordinates are converted into 0-based
+    half-open intervals.
+
+    Parameters
+    __________
+    path : str
+        Path of the data file, optionally gzip compressed (.gz).
+    format : str, optional
+        "bed" (chrom, start, end), "bedgraph" (chrom, start, end, value),
+        "bedpe" (chrom1, start1, end1, chrom2, start2, end2 and value
+        columns, such as a score), "csv" (chr, start, end and value columns
+        named by the header, as the tutorial data) or "links" (tab-separated link id, chrom, start, end, where two
+        rows sharing a link id make a link, as segdup.txt of the tutorial).
+        If format is not given, it is guessed with detect_format().
+    arc_ids : list of str, optional
+        Arc ids to keep. For links, both ends should be on these arcs.
+    gcircle : Gcircle, optional
+        If gcircle is given, the arc ids of its Garc objects are kept.
+    chunk_size : int
+        Number of lines parsed at a time.
+    delimiter : str, optional
+        Field delimiter. If delimiter is not given, comma is used for .csv
+        files and tab for the others.
+    one_based : bool, optional
+        If True, starts are 1-based inclusive and 1 is subtracted from them.
+        If one_based is not given, it is True for .csv files (the layout of
+        the tutorial data) and False for the others.
+
+    Yields
+    ______
+    numpy.ndarray
+        Structured array with the fields "arc_id", "start", "end" (and
+        "value" or the value columns), or "arc1", "start1", "end1", "arc2",
+        "start2", "end2" (and the value columns of BEDPE) for links. Value
+        columns are named by the header, or "value1", "value2", ... if the
+        file has no header.
+    """
+    if format is None:
+        format = detect_format(path)
+    if format not in FORMATS and format != "csv":
+        raise ValueError("format should be one of {}".format(", ".join(list(FORMATS) + ["csv"])))
+    delimiter = _delimiter(path, delimiter)
+    if one_based is None:
+        one_based = _suffix(path) == ".csv"
+    if gcircle is not None:
+        arc_ids = list(gcircle.garc_dict)
+
+    wanted = None if arc_ids is None else np.array([str(arc_id) for arc_id in arc_ids])
+    arc_width = TEXT_WIDTH if wanted is None or len(wanted) == 0 else int(np.max(np.char.str_len(wanted))) + 1
+    fields, header = _layout(path, format, delimiter)
+    dtype = _dtype(fields, arc_width)
+    offset = 1 if one_based == True else 0
+    pending: Dict[str, Tuple] = {}
+
+    with _open(path) as handle:
+        lines = (line for line in handle if line.startswith(SKIP_PREFIXES) == False and line.strip() != "")
+        for _ in range(header):
+            next(lines, None)
+        while True:
+            chunk = list(itertools.islice(lines, chunk_size))
+            if len(chunk) == 0:
+                break
+            records = np.loadtxt(chunk, dtype=dtype, delimiter=delimiter, usecols=range(len(fields)), ndmin=1)
+            del chunk
+
+            if format == "links":
+                records = _pair_links(records, pending)
+            for name in ("start", "start1", "start2"):
+                if name in records.dtype.names:
+                    records[name] -= offset
+            if wanted is not None:
+                if "arc1" in records.dtype.names:
+                    records = records[np.isin(records["arc1"], wanted) & np.isin(records["arc2"], wanted)]
+                else:
+                    records = records[np.isin(records["arc_id"], wanted)]
+            if len(records) > 0:
+                yield _shrink(records)
+
+
+def read(path: str, format: Optional[str] = None, arc_ids: Optional[Sequence[str]] = None, gcircle=None, chunk_size: int = 1 << 16, delimiter: Optional[str] = None, one_based: Optional[bool] = None) -> np.ndarray:
+    """Function that reads a data file into one NumPy structured array
+
+    The parameters are the same as iter_chunks(), and only the rows kept by
+    arc_ids or gcircle are held in memory.
+
+    Returns
+    _______
+    numpy.ndarray
+    """
+    chunks = list(iter_chunks(path, format, arc_ids, gcircle, chunk_size, delimiter, one_based))
+    if len(chunks) == 0:
+        if format is None:
+            format = detect_format(path)
+        if format == "links":
+            return np.zeros(0, dtype=LINK_DTYPE)
+        fields, _ = _layout(path, format, _delimiter(path, delimiter))
+        return np.zeros(0, dtype=_dtype(fields, 1))
+
+    dtype = []
+    for name in chunks[0].dtype.names:
+        if chunks[0].dtype[name].kind == "U":
+            dtype.append((name, "U{}".format(max(chunk.dtype[name].itemsize // 4 for chunk in chunks))))
+        else:
+            dtype.append((name, chunks[0].dtype[name]))
+    return np.concatenate([chunk.astype(dtype) for chunk in chunks])
+
+
+def read_bed(path: str, **kwargs) -> np.ndarray:
+    """Function that reads a BED file with read()"""
+    return read(path, "bed", **kwargs)
+
+
+def read_bedgraph(path: str, **kwargs) -> np.ndarray:
+    """Function that reads a bedGraph file with read()"""
+    return read(path, "bedgraph", **kwargs)
+
+
+def read_bedpe(path: str, **kwargs) -> np.ndarray:
+    """Function that reads a BEDPE file with read()"""
+    return read(path, "bedpe", **kwargs)
+
+
+def read_links(path: str, **kwargs) -> np.ndarray:
+    """Function that reads a tab-separated link file (link id, chrom, start, end) with read()"""
+    return read(path, "links", **kwargs)
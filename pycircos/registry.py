@@ -0,0 +1,107 @@
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+class ArcRegistry:
+    """Class for the columnar storage of the arcs of a Gcircle
+
+    The ids of the arcs are kept in a list in the order they were added, and
+    their sizes, interspaces, radial ranges and coordinates in NumPy arrays
+    with one row per arc. The arrays grow by doubling, so adding n arcs costs
+    O(n), and the layout of all arcs is computed from one cumulative sum.
+    Rows that were never laid out have NaN coordinates.
+    """
+
+    def __init__(self, capacity: int = 16) -> None:
+        self.ids: List[str] = []
+        self.lookup: Dict[str, int] = {}
+        self._size: np.ndarray       = np.zeros(capacity, dtype=np.float64)
+        self._interspace: np.ndarray = np.zeros(capacity, dtype=np.float64)
+        self._raxis: np.ndarray      = np.zeros((capacity, 2), dtype=np.float64)
+        self._start: np.ndarray      = np.full(capacity, np.nan)
+        self._end: np.ndarray        = np.full(capacity, np.nan)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, arc_id) -> bool:
+        return arc_id in self.lookup
+
+    @property
+    def size(self) -> np.ndarray:
+        return self._size[:len(self.ids)]
+
+    @property
+    def interspace(self) -> np.ndarray:
+        return self._interspace[:len(self.ids)]
+
+    @property
+    def raxis_range(self) -> np.ndarray:
+        return self._raxis[:len(self.ids)]
+
+    @property
+    def start(self) -> np.ndarray:
+        return self._start[:len(self.ids)]
+
+    @property
+    def end(self) -> np.ndarray:
+        return self._end[:len(self.ids)]
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._size)
+        for name, fill in (("_size", 0.0), ("_interspace", 0.0), ("_raxis", 0.0), ("_start", np.nan), ("_end", np.nan)):
+            old = getattr(self, name)
+            new = np.full((capacity,) + old.shape[1:], fill)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def set(self, arc_id: str, size: float, interspace: float, raxis_range: Tuple[float, float]) -> int:
+        """Function that adds an arc, or updates the row of an arc already in the registry
+
+        Returns
+        _______
+        int
+            Row of the arc.
+        """
+        i = self.lookup.get(arc_id)
+        if i is None:
+            i = len(self.ids)
+            if i == len(self._size):
+                self._grow()
+            self.ids.append(arc_id)
+            self.lookup[arc_id] = i
+        self._size[i]       = size
+        self._interspace[i] = interspace
+        self._raxis[i]      = raxis_range
+        return i
+
+    def layout(self) -> np.ndarray:
+        """Function that places the arcs on the circle from the angle 0
+
+        The sizes and the interspaces of the preceding arcs give the start of
+        each arc. Both are accumulated by a single cumsum over the two
+        columns, whose last row is also their total.
+
+        Returns
+        _______
+        numpy.ndarray
+            Rows whose coordinates have changed.
+        """
+        n = len(self.ids)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        columns = np.column_stack((self.size, self.interspace))
+        cumulative = np.cumsum(columns, axis=0)
+        sum_length, sum_interspace = cumulative[-1]
+        before = np.zeros_like(columns)
+        before[1:] = cumulative[:-1]
+
+        # This value is taking the total cirle in terms of radians (2*pi) and subtracting all of the interspace values
+        span = 2 * np.pi - sum_interspace
+        starts = before[:, 1] + span * before[:, 0] / sum_length
+        ends   = before[:, 1] + span * (before[:, 0] + columns[:, 0]) / sum_length
+
+        changed = np.flatnonzero((self.start != starts) | (self.end != ends))
+        self._start[:n] = starts
+        self._end[:n]   = ends
+        return changed
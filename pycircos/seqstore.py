@@ -0,0 +1,241 @@
+import os
+import gzip
+import struct
+import numpy as np
+from typing import Iterator, Optional, Tuple
+
+from . import composition
+
+MAGIC: bytes = b"PYCSEQ1\x00"
+SUFFIX: str = ".pcseq"
+
+# magic, sequence length, number of N runs, byte offset of the N runs
+_HEADER = struct.Struct("<8sQQQ")
+_N_CODE: int = composition.BASES.index("N")
+
+
+def _pack(codes: np.ndarray) -> np.ndarray:
+    """Function that packs 2-bit codes (length multiple of 4) into bytes"""
+    codes = codes.reshape(-1, 4)
+    return (codes[:, 0] << 6) | (codes[:, 1] << 4) | (codes[:, 2] << 2) | codes[:, 3]
+
+
+def _unpack(packed: np.ndarray) -> np.ndarray:
+    """Function that unpacks bytes into 2-bit codes"""
+    codes = np.empty((len(packed), 4), dtype=np.uint8)
+    codes[:, 0] = packed >> 6
+    codes[:, 1] = (packed >> 4) & 3
+    codes[:, 2] = (packed >> 2) & 3
+    codes[:, 3] = packed & 3
+    return codes.reshape(-1)
+
+
+def _runs(mask: np.ndarray, offset: int) -> np.ndarray:
+    """Function that converts a boolean mask into (start, end) runs"""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return np.column_stack((starts, ends)).astype(np.uint64) + offset
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    return open(path)
+
+
+def _guess_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    if os.path.splitext(name)[1].lower() in (".gb", ".gbk", ".gbff", ".genbank"):
+        return "genbank"
+    return "fasta"
+
+
+def _iter_fasta(path: str, record_id: Optional[str] = None) -> Iterator[bytes]:
+    """Function that yields the sequence lines of one FASTA record"""
+    selected = False
+    with _open_text(path) as handle:
+        for line in handle:
+            if line.startswith(">"):
+                if selected:
+                    return
+                name = line[1:].split(None, 1)[0] if len(line) > 1 else ""
+                selected = record_id is None or name == record_id
+            elif selected:
+                yield line.strip().encode("ascii")
+
+
+def _iter_genbank(path: str, record_id: Optional[str] = None, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    from Bio import SeqIO
+    with _open_text(path) as handle:
+        for record in SeqIO.parse(handle, "genbank"):
+            if record_id is None or record.id == record_id or record.name == record_id:
+                seq = record.seq
+                for i in range(0, len(seq), chunk_size):
+                    yield bytes(seq[i:i+chunk_size])
+                return
+
+
+class SequenceStore:
+    """Class for a 2-bit packed sequence file with an N mask
+
+    A, C, G and T are packed four to a byte and the runs of any other letter
+    are kept as (start, end) pairs. The packed bytes are memory-mapped on the
+    first access, so opening a store and asking for its length never reads
+    the sequence itself.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with open(path, "rb") as handle:
+            magic, length, n_runs, runs_offset = _HEADER.unpack(handle.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("{} is not a pycircos sequence store".format(path))
+            handle.seek(runs_offset)
+            runs = np.frombuffer(handle.read(16 * n_runs), dtype="<u8").reshape(-1, 2)
+        self._length: int = length
+        self._n_runs: np.ndarray = runs.astype(np.int64)
+        self._packed: Optional[np.ndarray] = None
+
+    @classmethod
+    def open(cls, path: str) -> "SequenceStore":
+        """Function that opens a sequence store file"""
+        return cls(path)
+
+    @classmethod
+    def build(cls, source, path: Optional[str] = None, format: Optional[str] = None, record_id: Optional[str] = None, chunk_size: int = 1 << 22) -> "SequenceStore":
+        """Function that builds a sequence store from a sequence file or sequence
+
+        Parameters
+        __________
+        source : str, Bio.SeqRecord or Bio.Seq
+            Path of a FASTA or GenBank file (optionally gzipped), or a
+            sequence object.
+        path : str, optional
+            Path of the store file. If path is not given, SUFFIX is appended
+            to the path of source.
+        format : str, optional
+            "fasta" or "genbank". If format is not given, it is guessed from
+            the file extension.
+        record_id : str, optional
+            ID of the record to be stored. If record_id is not given, the first
+            record of the file is stored.
+        chunk_size : int
+            Number of letters encoded at once.
+
+        Returns
+        _______
+        SequenceStore
+        """
+        if isinstance(source, str):
+            if path is None:
+                path = source + SUFFIX
+            if format is None:
+                format = _guess_format(source)
+            if format == "fasta":
+                lines = _iter_fasta(source, record_id)
+            elif format == "genbank":
+                lines = _iter_genbank(source, record_id)
+            else:
+                raise ValueError("format should be 'fasta' or 'genbank'")
+        else:
+            if path is None:
+                raise ValueError("path should be given to build a store from a sequence object")
+            seq = getattr(source, "seq", source)
+            lines = (bytes(seq[i:i+chunk_size]) for i in range(0, len(seq), chunk_size))
+
+        chunk_size -= chunk_size % 4
+        length = 0
+        runs = []
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as out:
+                out.write(_HEADER.pack(MAGIC, 0, 0, 0))
+                pending = []
+                pending_length = 0
+                for line in lines:
+                    pending.append(composition.encode(line))
+                    pending_length += len(pending[-1])
+                    if pending_length < chunk_size:
+                        continue
+                    codes = np.concatenate(pending)
+                    body = len(codes) - len(codes) % 4
+                    mask = codes[:body] == _N_CODE
+                    runs.append(_runs(mask, length))
+                    out.write(_pack(np.where(mask, 0, codes[:body]).astype(np.uint8)).tobytes())
+                    length += body
+                    pending = [codes[body:]]
+                    pending_length = len(pending[0])
+
+                codes = np.concatenate(pending) if len(pending) > 0 else np.empty(0, dtype=np.uint8)
+                mask = codes == _N_CODE
+                runs.append(_runs(mask, length))
+                tail = np.zeros(len(codes) + (-len(codes) % 4), dtype=np.uint8)
+                tail[:len(codes)] = np.where(mask, 0, codes)
+                out.write(_pack(tail).tobytes())
+                length += len(codes)
+
+                runs = np.concatenate(runs) if len(runs) > 0 else np.empty((0, 2), dtype=np.uint64)
+                if len(runs) > 1:
+                    # Merge the runs split at chunk boundaries.
+                    joined = np.flatnonzero(runs[1:, 0] == runs[:-1, 1]) + 1
+                    keep = np.ones(len(runs), dtype=bool)
+                    keep[joined] = False
+                    group = np.cumsum(keep) - 1
+                    merged = runs[keep].copy()
+                    np.maximum.at(merged[:, 1], group, runs[:, 1])
+                    runs = merged
+
+                runs_offset = out.tell()
+                out.write(runs.astype("<u8").tobytes())
+                out.seek(0)
+                out.write(_HEADER.pack(MAGIC, length, len(runs), runs_offset))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def packed(self) -> np.ndarray:
+        if self._packed is None:
+            self._packed = np.memmap(self.path, dtype=np.uint8, mode="r", offset=_HEADER.size, shape=((self._length + 3) // 4,))
+        return self._packed
+
+    @property
+    def n_runs(self) -> np.ndarray:
+        """(start, end) pairs of the runs of letters other than A, C, G and T"""
+        return self._n_runs
+
+    def codes(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """Function that returns the uint8 codes of the region start:end
+
+        The codes are the same as composition.encode().
+        """
+        if end is None or end > self._length:
+            end = self._length
+        start = max(0, start)
+        if start >= end:
+            return np.empty(0, dtype=np.uint8)
+        first = start // 4
+        codes = _unpack(np.asarray(self.packed[first:(end + 3) // 4]))
+        codes = codes[start - first * 4:end - first * 4]
+
+        runs = self._n_runs
+        lo = np.searchsorted(runs[:, 1], start, side="right")
+        hi = np.searchsorted(runs[:, 0], end, side="left")
+        for run_start, run_end in runs[lo:hi]:
+            codes[max(run_start, start) - start:min(run_end, end) - start] = _N_CODE
+        return codes
+
+    def iter_codes(self, chunk_size: int = 1 << 22) -> Iterator[Tuple[int, np.ndarray]]:
+        """Function that yields (start, codes) chunks of the whole sequence"""
+        for start in range(0, self._length, chunk_size):
+            yield start, self.codes(start, start + chunk_size)
+
+    def fetch(self, start: int = 0, end: Optional[int] = None) -> str:
+        """Function that returns the region start:end as a string"""
+        return np.frombuffer(b"ACGTN", dtype=np.uint8)[self.codes(start, end)].tobytes().decode("ascii")
@@ -0,0 +1,406 @@
+import os
+import json
+import inspect
+import functools
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from . import readers
+
+TRACK_TYPES: Dict[str, str] = {
+    "line": "lineplot",
+    "fill": "fillplot",
+    "scatter": "scatterplot",
+    "bar": "barplot",
+    "heatmap": "heatmap",
+    "feature": "featureplot",
+    "chord": "plot_many",
+}
+
+METRICS: Dict[str, str] = {
+    "density": "calc_density",
+    "nnratio": "calc_nnratio",
+    "nnskew": "calc_nnskew",
+}
+
+SPEC_KEYS: Tuple[str, ...] = ("name", "figsize", "arcs", "tracks", "chords", "output")
+
+# Options of the arcs, tracks and chords read from a data file, which are not
+# passed to Garc() or to the track methods. "value" is only used by tracks.
+FILE_OPTIONS: Tuple[str, ...] = ("file", "format", "delimiter", "one_based", "value")
+READ_OPTIONS: Tuple[str, ...] = ("file", "format", "delimiter", "one_based")
+
+
+class SpecError(ValueError):
+    """Exception raised for an invalid plot specification, listing all of its problems"""
+
+    def __init__(self, problems: List[str]) -> None:
+        super().__init__("Invalid plot specification:\n" + "\n".join("  " + problem for problem in problems))
+        self.problems: List[str] = problems
+
+
+def _parse(path: str):
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Reading {} requires PyYAML (pip install pyyaml)".format(path))
+        with open(path) as handle:
+            return yaml.safe_load(handle)
+
+    if suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ImportError("Reading {} requires Python 3.11 or tomli (pip install tomli)".format(path))
+        with open(path, "rb") as handle:
+            return tomllib.load(handle)
+
+    with open(path) as handle:
+        text = handle.read()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip() != ""]
+
+
+def _resolve_paths(spec: Dict, base: str) -> Dict:
+    """Function that makes the data files of the spec relative to the directory of the spec file"""
+    def resolve(item: Dict) -> Dict:
+        item = dict(item)
+        if isinstance(item.get("file"), str):
+            item["file"] = os.path.join(base, os.path.expanduser(item["file"]))
+        if isinstance(item.get("record"), str) and os.path.exists(os.path.join(base, item["record"])):
+            item["record"] = os.path.join(base, item["record"])
+        return item
+
+    spec = dict(spec)
+    for key in ("arcs", "tracks", "chords"):
+        if isinstance(spec.get(key), list):
+            spec[key] = [resolve(item) if isinstance(item, dict) else item for item in spec[key]]
+    return spec
+
+
+def load_specs(path: str, validate: bool = True) -> List[Dict]:
+    """Function that loads plot specifications from a YAML, TOML, JSON or JSON lines file
+
+    The file holds one specification, a list of specifications or a mapping
+    with a "specs" list (for TOML, which has no top-level lists). Data files
+    are taken relative to the directory of the file, but are not read until
+    the figure is rendered.
+
+    Parameters
+    __________
+    path : str
+        Path of the specification file.
+    validate : bool
+        If True, every specification is checked with validate_spec().
+
+    Returns
+    _______
+    list of dict
+    """
+    specs = _parse(path)
+    if isinstance(specs, dict) and "specs" in specs:
+        specs = specs["specs"]
+    if isinstance(specs, list) == False:
+        specs = [specs]
+
+    base = os.path.dirname(os.path.abspath(path))
+    default_name = os.path.splitext(os.path.basename(path))[0]
+    loaded = []
+    for i, spec in enumerate(specs):
+        if isinstance(spec, dict) == False:
+            raise SpecError(["specs[{}]: should be a mapping, not {}".format(i, type(spec).__name__)])
+        spec = _resolve_paths(spec, base)
+        spec.setdefault("name", default_name if len(specs) == 1 else "{}_{}".format(default_name, i))
+        if validate == True:
+            validate_spec(spec)
+        loaded.append(spec)
+    return loaded
+
+
+@functools.lru_cache(maxsize=None)
+def _parameters(name: str) -> Tuple[str, ...]:
+    from .pycircos import Garc
+    from .plot_classes import chord_plot
+    function = Garc.__init__ if name == "Garc" else getattr(chord_plot, name)
+    return tuple(parameter for parameter in inspect.signature(function).parameters if parameter != "self")
+
+
+def _check_keys(problems: List[str], where: str, item: Dict, allowed) -> None:
+    for key in item:
+        if key not in allowed:
+            problems.append("{}: unknown key {!r}".format(where, key))
+
+
+def _check_file(problems: List[str], where: str, item: Dict) -> None:
+    if "file" not in item:
+        return
+    if isinstance(item["file"], str) == False:
+        problems.append("{}.file: should be a path".format(where))
+    elif os.path.exists(item["file"]) == False:
+        problems.append("{}.file: {} does not exist".format(where, item["file"]))
+    elif "format" in item:
+        if item["format"] not in list(readers.FORMATS) + ["csv"]:
+            problems.append("{}.format: should be one of {}".format(where, ", ".join(list(readers.FORMATS) + ["csv"])))
+    else:
+        try:
+            readers.detect_format(item["file"])
+        except ValueError as e:
+            problems.append("{}.file: {}".format(where, e))
+
+
+def validate_spec(spec: Dict) -> None:
+    """Function that checks a plot specification before anything is loaded
+
+    Unknown keys, unknown track types and metrics, parameters that the Garc
+    class or the track methods do not take, references to undefined arcs and
+    missing data files are all collected and raised together.
+
+    Parameters
+    __________
+    spec : dict
+        Plot specification of pycircos.batch.render_spec().
+
+    Raises
+    ______
+    SpecError
+    """
+    problems: List[str] = []
+    _check_keys(problems, "spec", spec, SPEC_KEYS)
+
+    figsize = spec.get("figsize", (8, 8))
+    if isinstance(figsize, (list, tuple)) == False or len(figsize) != 2 or all(isinstance(value, (int, float)) for value in figsize) == False:
+        problems.append("figsize: should be a pair of numbers")
+
+    for key in ("arcs", "tracks", "chords"):
+        if isinstance(spec.get(key, []), list) == False:
+            problems.append("{}: should be a list".format(key))
+    arcs   = spec.get("arcs", []) if isinstance(spec.get("arcs", []), list) else []
+    tracks = spec.get("tracks", []) if isinstance(spec.get("tracks", []), list) else []
+    chords = spec.get("chords", []) if isinstance(spec.get("chords", []), list) else []
+
+    arc_ids = set()
+    from_files = False
+    for i, arc in enumerate(arcs):
+        where = "arcs[{}]".format(i)
+        if isinstance(arc, dict) == False:
+            problems.append("{}: should be a mapping".format(where))
+            continue
+        if "file" in arc:
+            from_files = True
+            _check_keys(problems, where, arc, READ_OPTIONS + _parameters("Garc"))
+            _check_file(problems, where, arc)
+            for key in ("arc_id", "record", "size"):
+                if key in arc:
+                    problems.append("{}: {!r} is taken from the file".format(where, key))
+        else:
+            _check_keys(problems, where, arc, _parameters("Garc"))
+            if "arc_id" not in arc:
+                problems.append("{}: arc_id is required".format(where))
+            elif arc["arc_id"] in arc_ids:
+                problems.append("{}: duplicate arc_id {!r}".format(where, arc["arc_id"]))
+            else:
+                arc_ids.add(arc["arc_id"])
+
+    for i, track in enumerate(tracks):
+        where = "tracks[{}]".format(i)
+        if isinstance(track, dict) == False:
+            problems.append("{}: should be a mapping".format(where))
+            continue
+        track_type = track.get("type")
+        if track_type not in TRACK_TYPES:
+            problems.append("{}.type: should be one of {}".format(where, ", ".join(TRACK_TYPES)))
+            continue
+        if track_type == "chord":
+            _check_keys(problems, where, track, ("type",) + _parameters("plot_many"))
+            continue
+
+        _check_keys(problems, where, track, ("type",) + FILE_OPTIONS + _parameters(TRACK_TYPES[track_type]))
+        _check_file(problems, where, track)
+        if "file" in track:
+            if track_type == "feature":
+                problems.append("{}: feature tracks cannot be read from a file".format(where))
+            if "data" in track or "positions" in track:
+                problems.append("{}: data and positions are taken from the file".format(where))
+        else:
+            for key in FILE_OPTIONS[1:]:
+                if key in track:
+                    problems.append("{}.{}: is only used with file".format(where, key))
+            if "garc_id" not in track:
+                problems.append("{}: garc_id is required".format(where))
+            if "data" not in track and track_type != "feature":
+                problems.append("{}: data or file is required".format(where))
+            data = track.get("data")
+            if isinstance(data, dict) and data.get("metric") not in METRICS:
+                problems.append("{}.data.metric: should be one of {}".format(where, ", ".join(METRICS)))
+
+        if "garc_id" in track and from_files == False and track["garc_id"] not in arc_ids:
+            problems.append("{}.garc_id: {!r} is not defined in arcs".format(where, track["garc_id"]))
+
+    for i, chord in enumerate(chords):
+        where = "chords[{}]".format(i)
+        if isinstance(chord, dict) == False:
+            problems.append("{}: should be a mapping".format(where))
+            continue
+        _check_keys(problems, where, chord, READ_OPTIONS + _parameters("plot_many"))
+        _check_file(problems, where, chord)
+        if "file" not in chord:
+            for key in ("arc1", "start1", "end1", "r1", "arc2", "start2", "end2", "r2"):
+                if key not in chord:
+                    problems.append("{}: {} or file is required".format(where, key))
+        else:
+            for key in ("r1", "r2"):
+                if key not in chord:
+                    problems.append("{}: {} is required".format(where, key))
+
+    output = spec.get("output", {})
+    if isinstance(output, dict) == False:
+        problems.append("output: should be a mapping")
+    else:
+        _check_keys(problems, "output", output, _parameters("save"))
+
+    if len(problems) > 0:
+        raise SpecError(problems)
+
+
+@functools.lru_cache(maxsize=16)
+def _read(path: str, mtime: int, size: int, format: Optional[str], delimiter: Optional[str], one_based: Optional[bool], arc_ids: Optional[Tuple[str, ...]]) -> np.ndarray:
+    return readers.read(path, format, arc_ids=arc_ids, delimiter=delimiter, one_based=one_based)
+
+
+def read_file(item: Dict, arc_ids: Optional[List[str]] = None) -> np.ndarray:
+    """Function that reads the data file of an arc, a track or a chord of a spec
+
+    The file is streamed with pycircos.readers.read(), keeping only the rows
+    on arc_ids, and is cached by path and modification time, so a file used
+    by many tracks or figures is read once per process.
+
+    Returns
+    _______
+    numpy.ndarray
+        Structured array of pycircos.readers.
+    """
+    stat = os.stat(item["file"])
+    return _read(os.path.abspath(item["file"]), stat.st_mtime_ns, stat.st_size, item.get("format"), item.get("delimiter"), item.get("one_based"), None if arc_ids is None else tuple(arc_ids))
+
+
+def arc_kwargs(arcs: List[Dict]) -> List[Dict]:
+    """Function that expands the arcs of a spec into keyword arguments of Garc()
+
+    An arc with a "file" is replaced with one arc per row of the file, whose
+    first three columns are the arc id, the start and the end.
+    """
+    expanded = []
+    for arc in arcs:
+        if "file" not in arc:
+            expanded.append(dict(arc))
+            continue
+        records = read_file(arc)
+        shared  = {key: value for key, value in arc.items() if key not in READ_OPTIONS}
+        for arc_id, start, end in zip(records["arc_id"], records["start"], records["end"]):
+            expanded.append(dict(shared, arc_id=str(arc_id), size=int(end - start)))
+    return expanded
+
+
+def _colors(facecolor, records: np.ndarray, rows: np.ndarray):
+    """Function that maps a {"column": name, "map": {value: color}} facecolor to the colors of the rows"""
+    if isinstance(facecolor, dict):
+        values = records[facecolor["column"]][rows].astype(str)
+        return [facecolor["map"].get(value, facecolor.get("default", "#FFFFFF00")) for value in values]
+    return facecolor
+
+
+def track_calls(circle, track: Dict) -> List[Tuple[str, Dict]]:
+    """Function that expands a track of a spec into calls of the track methods of circle
+
+    A track with a "file" is read with pycircos.readers, keeping only the
+    rows on the arcs of circle, or on garc_id if it is given, and is drawn on
+    every one of these arcs found in the file. rlim, or vmin and vmax of a heatmap, default to the range of
+    the values of all arcs, so the arcs share one scale, and the default color
+    or cmap is taken once for the track, so the arcs share one color.
+
+    Returns
+    _______
+    list of tuple
+        (method name, keyword arguments).
+    """
+    track_type = track["type"]
+    method = TRACK_TYPES[track_type]
+    kwargs = {key: value for key, value in track.items() if key not in FILE_OPTIONS and key != "type"}
+
+    if "file" not in track:
+        data = kwargs.get("data")
+        if isinstance(data, dict) and "metric" in data:
+            params = dict(data)
+            metric = METRICS[params.pop("metric")]
+            kwargs["data"] = getattr(circle.garc_dict[kwargs["garc_id"]], metric)(**params)
+        return [(method, kwargs)]
+
+    from .plot_classes import _default_rlim
+
+    targets = [kwargs.pop("garc_id")] if "garc_id" in kwargs else list(circle.garc_dict)
+    records = read_file(track, targets)
+    names   = list(records.dtype.names)
+    arcs    = records["arc_id"]
+    starts  = records["start"].astype(np.float64)
+    ends    = records["end"].astype(np.float64)
+    value   = track.get("value", names[3:] if track_type == "heatmap" else names[3:4])
+    value   = [value] if isinstance(value, str) else list(value)
+    values  = np.column_stack([records[name].astype(np.float64) for name in value]) if len(value) > 0 else np.ones((len(arcs), 1))
+    if len(records) > 0:
+        if track_type == "heatmap":
+            kwargs.setdefault("vmin", float(np.nanmin(values)))
+            kwargs.setdefault("vmax", float(np.nanmax(values)))
+        else:
+            kwargs.setdefault("rlim", tuple(float(limit) for limit in _default_rlim(values[:, 0])))
+        # the default color of the track is taken once, so that every arc shares it
+        if track_type == "line":
+            kwargs.setdefault("linecolor", circle._next_color())
+        elif track_type == "heatmap":
+            kwargs.setdefault("cmap", circle._next_cmap())
+        else:
+            kwargs.setdefault("facecolor", circle._next_color())
+
+    calls = []
+    for garc_id in targets:
+        rows = np.flatnonzero(arcs == garc_id)
+        if len(rows) == 0:
+            continue
+        rows = rows[np.argsort(starts[rows], kind="stable")]
+        call = dict(kwargs, garc_id=garc_id)
+        if track_type in ("bar", "heatmap"):
+            call["positions"] = starts[rows]
+            call["width"] = ends[rows] - starts[rows]
+        else:
+            call["positions"] = (starts[rows] + ends[rows]) * 0.5
+        call["data"] = values[rows].T if track_type == "heatmap" and values.shape[1] > 1 else values[rows, 0]
+        if "facecolor" in call:
+            call["facecolor"] = _colors(call["facecolor"], records, rows)
+        calls.append((method, call))
+    return calls
+
+
+def chord_kwargs(circle, chord: Dict) -> Dict:
+    """Function that expands chords of a spec into keyword arguments of chord_plot.plot_many()
+
+    A chord with a "file" of links (BEDPE or the link formats of
+    pycircos.readers) is read keeping only the links between the arcs of
+    circle. If facecolor is "arc", each link takes the face color of its
+    first arc.
+    """
+    kwargs = {key: value for key, value in chord.items() if key not in READ_OPTIONS}
+    if "file" not in chord:
+        return kwargs
+
+    records = read_file(chord, list(circle.garc_dict))
+    for name in ("arc1", "start1", "end1", "arc2", "start2", "end2"):
+        kwargs[name] = records[name]
+    if kwargs.get("facecolor") == "arc":
+        kwargs["facecolor"] = [circle.garc_dict[arc_id].facecolor for arc_id in kwargs["arc1"]]
+    return kwargs
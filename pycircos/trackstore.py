@@ -0,0 +1,218 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+from typing import Callable, Dict, Optional, Tuple
+
+FORMAT_VERSION: int = 1
+
+
+def array_checksum(*arrays) -> str:
+    """Function that returns the SHA-256 of the dtypes, shapes and contents of arrays"""
+    sha256 = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        sha256.update("{}{}".format(array.dtype.str, array.shape).encode("ascii"))
+        sha256.update(array.view(np.uint8).reshape(-1) if array.size > 0 else b"")
+    return sha256.hexdigest()
+
+
+def fingerprint(*arrays) -> np.ndarray:
+    """Function that returns the length, the first and last values and the sum of each array
+
+    The fingerprint is read in one pass without hashing, and tells apart data
+    stored under the same name that has changed.
+    """
+    values = []
+    for array in arrays:
+        array = np.asarray(array, dtype=np.float64).reshape(-1)
+        values.extend([len(array), array[0], array[-1], array.sum()] if len(array) > 0 else [0, 0, 0, 0])
+    return np.array(values, dtype=np.float64)
+
+
+def window_starts(size: int, step_size: int) -> np.ndarray:
+    """Function that returns the window starts of calc_density(), calc_nnratio() and calc_nnskew()
+
+    Windows start at every step_size and one more window from the last start
+    to the end of the sequence is appended.
+    """
+    starts = np.arange(0, size, step_size, dtype=np.int64)
+    if len(starts) == 0:
+        return starts
+    return np.append(starts, starts[-1])
+
+
+def _reduce(values: np.ndarray, reduce: Callable, factor: int) -> np.ndarray:
+    """Function that reduces each group of factor consecutive values, the last group may be shorter"""
+    return reduce(values, np.arange(0, len(values), factor))
+
+
+class Track:
+    """Class for the memory-mapped levels of a stored track
+
+    Level 0 holds the values of the windows as computed. Level k holds the
+    mean, the minimum and the maximum of each group of factor**k windows, with
+    the start of the first window of the group. The files are memory-mapped,
+    so slicing a region of a level reads only that region.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with open(os.path.join(path, "meta.json")) as handle:
+            meta = json.load(handle)
+        self.size: int        = meta["size"]
+        self.window_size: int = meta["window_size"]
+        self.step_size: int   = meta["step_size"]
+        self.factor: int      = meta["factor"]
+        self.n_levels: int    = meta["levels"]
+        self._arrays: Dict[Tuple[int, str], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.array(0, "values"))
+
+    def array(self, level: int, name: str) -> np.ndarray:
+        """Function that returns the memory-mapped "starts", "values", "min" or "max" array of a level"""
+        if level < 0 or level >= self.n_levels:
+            raise ValueError("level should be from 0 to {}".format(self.n_levels - 1))
+        key = (level, "values" if level == 0 and name in ("min", "max") else name)
+        if key not in self._arrays:
+            self._arrays[key] = np.load(os.path.join(self.path, "{}.{}.npy".format(*key)), mmap_mode="r")
+        return self._arrays[key]
+
+    def values(self, level: int = 0) -> np.ndarray:
+        return self.array(level, "values")
+
+    def level_for(self, n_points: int) -> int:
+        """Function that returns the finest level with at most n_points values"""
+        for level in range(self.n_levels):
+            if len(self.array(level, "values")) <= n_points:
+                return level
+        return self.n_levels - 1
+
+    def read(self, level: int = 0, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Function that returns the windows of a level starting in the region start:end
+
+        Returns
+        _______
+        tuple
+            (starts, values) arrays, slices of the memory-mapped files.
+        """
+        starts = self.array(level, "starts")
+        lo = 0 if start is None else int(np.searchsorted(starts, start, side="left"))
+        hi = len(starts) if end is None else int(np.searchsorted(starts, end, side="left"))
+        return starts[lo:hi], self.array(level, "values")[lo:hi]
+
+
+class TrackStore:
+    """Class for a directory of precomputed window statistics
+
+    A track is stored under the checksum of its source (the sequence of a
+    record, or the positions and weights given to calc_density()), the name
+    of the metric, the window size and the step size, as a pyramid of
+    memory-mappable .npy files (see Track). Tracks are written to a temporary
+    directory which is renamed into place, so concurrent writers of the same
+    track leave one complete copy.
+
+    Parameters
+    __________
+    directory : str, optional
+        Store directory. If directory is not given, $PYCIRCOS_TRACK_DIR or
+        ~/.cache/pycircos/tracks is used.
+    factor : int
+        Number of windows of a level merged into one value of the next level.
+    min_length : int
+        Levels are added until a level has at most min_length values.
+    """
+
+    def __init__(self, directory: Optional[str] = None, factor: int = 4, min_length: int = 256) -> None:
+        if directory is None:
+            directory = os.environ.get("PYCIRCOS_TRACK_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pycircos", "tracks"))
+        if factor < 2:
+            raise ValueError("factor should be 2 or more")
+        self.directory: str = directory
+        self.factor: int = factor
+        self.min_length: int = min_length
+
+    def _track_path(self, checksum: str, metric: str, window_size: int, step_size: int) -> str:
+        return os.path.join(self.directory, checksum[:2], checksum, "{}.w{}.s{}".format(metric, window_size, step_size))
+
+    def get(self, checksum: str, metric: str, window_size: int, step_size: int) -> Optional[Track]:
+        """Function that returns the stored track, or None if it is not stored"""
+        path = self._track_path(checksum, metric, window_size, step_size)
+        if os.path.exists(os.path.join(path, "meta.json")) == False:
+            return None
+        return Track(path)
+
+    def put(self, checksum: str, metric: str, window_size: int, step_size: int, size: int, values) -> Track:
+        """Function that stores the values of a track with its coarser levels"""
+        import tempfile
+        values = np.asarray(values, dtype=np.float64)
+        path   = self._track_path(checksum, metric, window_size, step_size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            starts = window_starts(size, step_size)
+            np.save(os.path.join(tmp_path, "0.starts.npy"), starts)
+            np.save(os.path.join(tmp_path, "0.values.npy"), values)
+            # sums and counts of the windows give the means of the groups
+            sums, counts, mins, maxs = values, np.ones(len(values)), values, values
+            levels = 1
+            while len(sums) > self.min_length:
+                starts = starts[::self.factor]
+                sums   = _reduce(sums, np.add.reduceat, self.factor)
+                counts = _reduce(counts, np.add.reduceat, self.factor)
+                mins   = _reduce(mins, np.minimum.reduceat, self.factor)
+                maxs   = _reduce(maxs, np.maximum.reduceat, self.factor)
+                for name, array in (("starts", starts), ("values", sums / counts), ("min", mins), ("max", maxs)):
+                    np.save(os.path.join(tmp_path, "{}.{}.npy".format(levels, name)), array)
+                levels += 1
+            meta = {"version": FORMAT_VERSION, "size": int(size), "window_size": int(window_size), "step_size": int(step_size), "factor": self.factor, "levels": levels}
+            with open(os.path.join(tmp_path, "meta.json"), "w") as handle:
+                json.dump(meta, handle)
+            try:
+                os.rename(tmp_path, path)
+            except OSError:
+                # another process has stored the same track
+                shutil.rmtree(tmp_path, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        return Track(path)
+
+    def cached(self, checksum: str, metric: str, window_size: int, step_size: int, size: int, compute: Callable[[], np.ndarray]) -> Track:
+        """Function that returns the stored track, computing and storing it with compute() if it is missing"""
+        track = self.get(checksum, metric, window_size, step_size)
+        if track is None:
+            track = self.put(checksum, metric, window_size, step_size, size, compute())
+        return track
+
+    def remove(self, checksum: str) -> None:
+        """Function that removes every track of a checksum"""
+        shutil.rmtree(os.path.join(self.directory, checksum[:2], checksum), ignore_errors=True)
+
+
+_default_store: Optional[TrackStore] = None
+
+
+def default_store() -> Optional[TrackStore]:
+    """Function that returns the store used by Garc, None unless set_default_store() was called or $PYCIRCOS_TRACK_DIR is set"""
+    global _default_store
+    if _default_store is None and "PYCIRCOS_TRACK_DIR" in os.environ:
+        _default_store = TrackStore()
+    return _default_store
+
+
+def set_default_store(store: Optional[TrackStore]) -> None:
+    """Function that replaces the store used by Garc"""
+    global _default_store
+    _default_store = store
+
+
+def resolve(store) -> Optional[TrackStore]:
+    """Function that converts the store argument of Garc methods: None is the default store and False no store"""
+    if store is False:
+        return None
+    if store is None:
+        return default_store()
+    return store
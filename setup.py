@@ -20,10 +20,21 @@ INSTALL_REQUIRES = [
 ]
 
 
+EXTRAS_REQUIRE = {
+    'yaml': ['pyyaml'],
+    'toml': ['tomli; python_version < "3.11"'],
+}
+
 PACKAGES = [
     'pycircos'
 ]
 
+ENTRY_POINTS = {
+    'console_scripts': [
+        'pycircos = pycircos.cli:main',
+    ],
+}
+
 CLASSIFIERS = [
     'Intended Audience :: Science/Research',
     'Programming Language :: Python :: 3.7',
@@ -55,6 +66,8 @@ if __name__ == "__main__":
         download_url=DOWNLOAD_URL,
         python_requires=PYTHON_REQUIRES,
         install_requires=INSTALL_REQUIRES,
+        extras_require=EXTRAS_REQUIRE,
         packages=PACKAGES,
+        entry_points=ENTRY_POINTS,
         classifiers=CLASSIFIERS
     )